@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import time
+import timeit
+
+from cache.codecs import CODECS, decode_value
+
+VALUE = {"is_violation": True, "probability": 0.8712345678901234, "delta": 0.0125, "expiry": 1790000000.123}
+
+
+def bench_codec(codec, number: int) -> dict:
+    data = codec.encode(VALUE)
+    encode = timeit.timeit(lambda: codec.encode(VALUE), number=number)
+    decode = timeit.timeit(lambda: decode_value(data), number=number)
+    return {
+        "value_bytes": len(data),
+        "encode_ns": encode / number * 1e9,
+        "decode_ns": decode / number * 1e9,
+    }
+
+
+async def redis_memory_per_key(redis_url: str, codec, keys: int) -> float:
+    import redis.asyncio as redis
+
+    client = redis.from_url(redis_url)
+    prefix = f"bench:{codec.name}:{time.time_ns()}:"
+    data = codec.encode(VALUE)
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(keys):
+                pipe.set(f"{prefix}{i}", data, ex=600)
+            await pipe.execute()
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(keys):
+                pipe.memory_usage(f"{prefix}{i}")
+            usages = await pipe.execute()
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(keys):
+                pipe.unlink(f"{prefix}{i}")
+            await pipe.execute()
+        return sum(usages) / keys
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare prediction cache codecs")
+    parser.add_argument("--number", type=int, default=200_000)
+    parser.add_argument("--redis-url", default=None, help="also measure MEMORY USAGE per key")
+    parser.add_argument("--keys", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'codec':<8} {'bytes':>6} {'encode ns':>10} {'decode ns':>10} {'redis B/key':>12}")
+    for name, codec in CODECS.items():
+        result = bench_codec(codec, args.number)
+        memory = "-"
+        if args.redis_url:
+            memory = f"{asyncio.run(redis_memory_per_key(args.redis_url, codec, args.keys)):.1f}"
+        print(
+            f"{name:<8} {result['value_bytes']:>6} {result['encode_ns']:>10.0f} "
+            f"{result['decode_ns']:>10.0f} {memory:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
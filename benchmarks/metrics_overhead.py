@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import time
+import timeit
+
+from metrics.registry import Registry, timed
+
+
+async def _noop():
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-call cost of metric primitives")
+    parser.add_argument("--number", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter("bench_total", "Counter").labels()
+    histogram = registry.histogram("bench_seconds", "Histogram").labels()
+    labeled = registry.histogram("bench_labeled_seconds", "Histogram", ("endpoint", "stage"))
+    timed_noop = timed(registry.histogram("bench_timed_seconds", "Timed", ("function",)))(_noop)
+
+    def timer():
+        started = time.perf_counter()
+        histogram.observe(time.perf_counter() - started)
+
+    async def plain_calls(n):
+        for _ in range(n):
+            await _noop()
+
+    async def timed_calls(n):
+        for _ in range(n):
+            await timed_noop()
+
+    cases = {
+        "counter.inc": lambda: counter.inc(),
+        "histogram.observe": lambda: histogram.observe(0.003),
+        "labels + observe": lambda: labeled.labels("simple_predict", "inference").observe(0.003),
+        "inline stage timer": timer,
+    }
+    print(f"{'operation':<22} {'ns/op':>8}")
+    for name, fn in cases.items():
+        print(f"{name:<22} {timeit.timeit(fn, number=args.number) / args.number * 1e9:>8.0f}")
+
+    loop = asyncio.new_event_loop()
+    n = args.number // 10
+    plain = timeit.timeit(lambda: loop.run_until_complete(plain_calls(n)), number=1)
+    decorated = timeit.timeit(lambda: loop.run_until_complete(timed_calls(n)), number=1)
+    loop.close()
+    print(f"{'@timed overhead':<22} {(decorated - plain) / n * 1e9:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
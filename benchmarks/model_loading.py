@@ -0,0 +1,41 @@
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ml.model import LinearScorer, export_model_artifact, load_model, save_model, train_model
+
+
+def bench_load(path: str, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        load_model(path)
+    return (time.perf_counter() - started) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pickled and memory-mapped model load times")
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--n-features", type=int, default=None, help="benchmark a synthetic model this wide")
+    args = parser.parse_args()
+
+    if args.n_features:
+        rng = np.random.default_rng(0)
+        model = LinearScorer(rng.random((1, args.n_features)), rng.random(1), np.array([0, 1]))
+    else:
+        model = train_model()
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, "model.pkl")
+        artifact_path = os.path.join(directory, "model_artifact")
+        save_model(model, pickle_path)
+        export_model_artifact(model, artifact_path)
+
+        print(f"{'format':<10} {'load us':>10}")
+        for name, path in (("pickle", pickle_path), ("npy-mmap", artifact_path)):
+            print(f"{name:<10} {bench_load(path, args.number) * 1e6:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
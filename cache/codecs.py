@@ -0,0 +1,65 @@
+import json
+import os
+import struct
+
+CACHE_CODEC = os.getenv("CACHE_CODEC", "binary").lower()
+
+BINARY_FORMAT_VERSION = 1
+
+
+class JsonCodec:
+    name = "json"
+
+    def encode(self, value: dict) -> bytes:
+        return json.dumps(value).encode("utf-8")
+
+    def decode(self, data: bytes | str) -> dict:
+        return json.loads(data)
+
+
+class BinaryCodec:
+    name = "binary"
+
+    _layout = struct.Struct("<B?dfd")
+
+    def encode(self, value: dict) -> bytes:
+        return self._layout.pack(
+            BINARY_FORMAT_VERSION,
+            value["is_violation"],
+            value["probability"],
+            value.get("delta", 0.0),
+            value.get("expiry", 0.0),
+        )
+
+    def decode(self, data: bytes) -> dict:
+        _, is_violation, probability, delta, expiry = self._layout.unpack(data)
+        return {
+            "is_violation": is_violation,
+            "probability": probability,
+            "delta": delta,
+            "expiry": expiry,
+        }
+
+    def matches(self, data: bytes | str) -> bool:
+        return (
+            isinstance(data, bytes)
+            and len(data) == self._layout.size
+            and data[0] == BINARY_FORMAT_VERSION
+        )
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), BinaryCodec())}
+
+
+def get_codec(name: str = CACHE_CODEC):
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"Unknown cache codec: {name}") from None
+
+
+def decode_value(data: bytes | str) -> dict:
+    binary = CODECS["binary"]
+    if binary.matches(data):
+        return binary.decode(data)
+    return CODECS["json"].decode(data)
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+
+from cache.predictions import item_id_from_key, namespace_pattern, set_cached_predictions
+from db.repositories.advertisements import get_advertisements
+from ml.features import extract_features_from_ads
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_NAMESPACE_KEY = "prediction-namespace:active"
+WARM_OVER_LIMIT = int(os.getenv("CACHE_WARM_OVER_LIMIT", "100000"))
+WARM_OVER_CHUNK_SIZE = int(os.getenv("CACHE_WARM_OVER_CHUNK_SIZE", "500"))
+RECLAIM_CHUNK_SIZE = 500
+RECLAIM_PAUSE_SECONDS = 0.01
+
+
+async def get_active_namespace(client: redis.Redis) -> str | None:
+    value = await client.get(ACTIVE_NAMESPACE_KEY)
+    if isinstance(value, bytes):
+        value = value.decode("utf-8")
+    return value
+
+
+async def set_active_namespace(client: redis.Redis, namespace: str) -> None:
+    await client.set(ACTIVE_NAMESPACE_KEY, namespace)
+
+
+async def warm_namespace(
+    client: redis.Redis,
+    pool,
+    model,
+    executor,
+    old_namespace: str,
+    new_namespace: str,
+    limit: int = WARM_OVER_LIMIT,
+    chunk_size: int = WARM_OVER_CHUNK_SIZE,
+) -> int:
+    warmed = 0
+    chunk: list[int] = []
+    async for key in client.scan_iter(match=namespace_pattern(old_namespace), count=chunk_size):
+        chunk.append(item_id_from_key(key))
+        if len(chunk) >= chunk_size:
+            warmed += await _warm_chunk(client, pool, model, executor, chunk, new_namespace)
+            chunk = []
+        if warmed + len(chunk) >= limit:
+            break
+    if chunk:
+        warmed += await _warm_chunk(client, pool, model, executor, chunk, new_namespace)
+    return warmed
+
+
+async def _warm_chunk(client, pool, model, executor, item_ids: list[int], namespace: str) -> int:
+    started = time.perf_counter()
+    ads = list((await get_advertisements(pool, item_ids)).values())
+    if not ads:
+        return 0
+    probabilities = await executor.predict_proba(model, extract_features_from_ads(ads))
+    delta = (time.perf_counter() - started) / len(ads)
+    await set_cached_predictions(
+        client,
+        [(ad["id"], p >= 0.5, p) for ad, p in zip(ads, probabilities.tolist())],
+        delta=delta,
+        namespace=namespace,
+    )
+    return len(ads)
+
+
+async def reclaim_namespace(
+    client: redis.Redis,
+    namespace: str,
+    chunk_size: int = RECLAIM_CHUNK_SIZE,
+    pause: float = RECLAIM_PAUSE_SECONDS,
+) -> int:
+    reclaimed = 0
+    chunk = []
+    async for key in client.scan_iter(match=namespace_pattern(namespace), count=chunk_size):
+        chunk.append(key)
+        if len(chunk) >= chunk_size:
+            reclaimed += await client.unlink(*chunk)
+            chunk = []
+            await asyncio.sleep(pause)
+    if chunk:
+        reclaimed += await client.unlink(*chunk)
+    return reclaimed
+
+
+async def switch_namespace(state, warm_over: bool = True, reclaim: bool = False) -> None:
+    client = state.redis_client
+    new_namespace = state.cache_namespace
+    try:
+        previous = await get_active_namespace(client)
+        if previous is not None and previous != new_namespace and warm_over and state.db_pool is not None:
+            state.fallback_namespace = previous
+            started = time.perf_counter()
+            warmed = await warm_namespace(
+                client, state.db_pool, state.model, state.executor, previous, new_namespace,
+            )
+            logger.info(
+                f"Warmed {warmed} predictions into namespace {new_namespace} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        await set_active_namespace(client, new_namespace)
+    except Exception as e:
+        logger.warning(f"Cache namespace warm-over failed: {e}")
+        return
+    finally:
+        state.fallback_namespace = None
+
+    if reclaim and previous is not None and previous != new_namespace:
+        reclaimed = await reclaim_namespace(client, previous)
+        logger.info(f"Reclaimed {reclaimed} keys from namespace {previous}")
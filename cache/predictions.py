@@ -1,19 +1,84 @@
-import json
+import asyncio
+import logging
+import math
+import os
+import random
+import time
 
 import redis.asyncio as redis
 
+from cache.codecs import decode_value, get_codec
+from cache.local import LocalCache
+from metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
 PREDICTION_TTL = 3600
+PREDICTION_TTL_JITTER = float(os.getenv("PREDICTION_TTL_JITTER", "0.1"))
+XFETCH_BETA = float(os.getenv("XFETCH_BETA", "1.0"))
+INVALIDATION_CHANNEL = "prediction_invalidations"
+RESUBSCRIBE_DELAY_SECONDS = 1
+MAX_RESUBSCRIBE_DELAY_SECONDS = 30
+
+redis_stats = {"hits": 0, "misses": 0}
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Cache lookups by cache, tier and outcome", ("cache", "tier", "result"),
+)
+_local_hits = CACHE_REQUESTS.labels("prediction", "local", "hit")
+_local_misses = CACHE_REQUESTS.labels("prediction", "local", "miss")
+_redis_hits = CACHE_REQUESTS.labels("prediction", "redis", "hit")
+_redis_misses = CACHE_REQUESTS.labels("prediction", "redis", "miss")
+
+codec = get_codec()
+
+
+def _cache_key(item_id: int, namespace: str | None = None) -> str:
+    if namespace is None:
+        return f"prediction:{item_id}"
+    return f"prediction:{namespace}:{item_id}"
+
+
+def namespace_pattern(namespace: str) -> str:
+    return f"prediction:{namespace}:*"
 
 
-def _cache_key(item_id: int) -> str:
-    return f"prediction:{item_id}"
+def item_id_from_key(key: bytes | str) -> int:
+    if isinstance(key, bytes):
+        key = key.decode("utf-8")
+    return int(key.rsplit(":", 1)[1])
 
 
-async def get_cached_prediction(client: redis.Redis, item_id: int) -> dict | None:
-    data = await client.get(_cache_key(item_id))
+def prediction_lock_key(item_id: int) -> str:
+    return f"prediction-lock:{item_id}"
+
+
+async def get_cached_prediction(
+    client: redis.Redis,
+    item_id: int,
+    local: LocalCache | None = None,
+    namespace: str | None = None,
+) -> dict | None:
+    key = _cache_key(item_id, namespace)
+    if local is not None:
+        cached = local.get(key)
+        if cached is not None:
+            _local_hits.inc()
+            return cached
+        _local_misses.inc()
+
+    data = await client.get(key)
     if data is None:
+        redis_stats["misses"] += 1
+        _redis_misses.inc()
         return None
-    return json.loads(data)
+
+    redis_stats["hits"] += 1
+    _redis_hits.inc()
+    cached = decode_value(data)
+    if local is not None:
+        local.set(key, cached)
+    return cached
 
 
 async def set_cached_prediction(
@@ -21,10 +86,98 @@ async def set_cached_prediction(
     item_id: int,
     is_violation: bool,
     probability: float,
+    local: LocalCache | None = None,
+    delta: float = 0.0,
+    namespace: str | None = None,
 ) -> None:
-    data = json.dumps({"is_violation": is_violation, "probability": probability})
-    await client.set(_cache_key(item_id), data, ex=PREDICTION_TTL)
+    ttl = _jittered_ttl()
+    value = _cache_value(is_violation, probability, delta, ttl)
+    key = _cache_key(item_id, namespace)
+    await client.set(key, codec.encode(value), ex=ttl)
+    if local is not None:
+        local.set(key, value)
+
+
+async def set_cached_predictions(
+    client: redis.Redis,
+    predictions: list[tuple[int, bool, float]],
+    delta: float = 0.0,
+    namespace: str | None = None,
+) -> None:
+    async with client.pipeline(transaction=False) as pipe:
+        for item_id, is_violation, probability in predictions:
+            ttl = _jittered_ttl()
+            value = _cache_value(is_violation, probability, delta, ttl)
+            pipe.set(_cache_key(item_id, namespace), codec.encode(value), ex=ttl)
+        await pipe.execute()
+
+
+def _cache_value(is_violation: bool, probability: float, delta: float, ttl: int) -> dict:
+    return {
+        "is_violation": is_violation,
+        "probability": probability,
+        "delta": delta,
+        "expiry": time.time() + ttl,
+    }
+
+
+def _jittered_ttl() -> int:
+    return max(1, round(PREDICTION_TTL * (1 - random.random() * PREDICTION_TTL_JITTER)))
+
+
+def should_refresh_early(cached: dict, beta: float = XFETCH_BETA) -> bool:
+    delta = cached.get("delta")
+    expiry = cached.get("expiry")
+    if not delta or expiry is None:
+        return False
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expiry
+
+
+async def delete_cached_prediction(
+    client: redis.Redis,
+    item_id: int,
+    local: LocalCache | None = None,
+    namespace: str | None = None,
+) -> None:
+    key = _cache_key(item_id, namespace)
+    await client.delete(key)
+    if local is not None:
+        local.delete(key)
+    await client.publish(INVALIDATION_CHANNEL, key)
+
+
+async def listen_for_invalidations(client: redis.Redis, local: LocalCache) -> None:
+    delay = RESUBSCRIBE_DELAY_SECONDS
+    while True:
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            local.clear()
+            delay = RESUBSCRIBE_DELAY_SECONDS
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    key = message["data"]
+                    local.delete(key.decode("utf-8") if isinstance(key, bytes) else key)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Invalidation subscription lost: {e}")
+        finally:
+            await pubsub.aclose()
+
+        local.clear()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, MAX_RESUBSCRIBE_DELAY_SECONDS)
 
 
-async def delete_cached_prediction(client: redis.Redis, item_id: int) -> None:
-    await client.delete(_cache_key(item_id))
+async def redis_cache_stats(client: redis.Redis) -> dict:
+    stats = dict(redis_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    try:
+        info = await client.info("stats")
+        stats["evicted_keys"] = info.get("evicted_keys")
+        stats["expired_keys"] = info.get("expired_keys")
+    except Exception as e:
+        logger.warning(f"Redis INFO failed: {e}")
+    return stats
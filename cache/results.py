@@ -0,0 +1,88 @@
+import json
+import os
+
+import redis.asyncio as redis
+
+from cache.local import LocalCache
+from cache.predictions import CACHE_REQUESTS, INVALIDATION_CHANNEL
+from db.repositories.moderation import TERMINAL_STATUSES
+
+RESULT_TTL = int(os.getenv("RESULT_CACHE_TTL", "86400"))
+
+_local_hits = CACHE_REQUESTS.labels("result", "local", "hit")
+_local_misses = CACHE_REQUESTS.labels("result", "local", "miss")
+_redis_hits = CACHE_REQUESTS.labels("result", "redis", "hit")
+_redis_misses = CACHE_REQUESTS.labels("result", "redis", "miss")
+
+
+def result_key(task_id: int) -> str:
+    return f"moderation_result:{task_id}"
+
+
+def _result_value(result: dict) -> dict:
+    return {
+        "id": result["id"],
+        "status": result["status"],
+        "is_violation": result["is_violation"],
+        "probability": result["probability"],
+    }
+
+
+async def get_cached_result(
+    client: redis.Redis,
+    task_id: int,
+    local: LocalCache | None = None,
+) -> dict | None:
+    key = result_key(task_id)
+    if local is not None:
+        cached = local.get(key)
+        if cached is not None:
+            _local_hits.inc()
+            return cached
+        _local_misses.inc()
+
+    data = await client.get(key)
+    if data is None:
+        _redis_misses.inc()
+        return None
+
+    _redis_hits.inc()
+    cached = json.loads(data)
+    if local is not None:
+        local.set(key, cached)
+    return cached
+
+
+async def set_cached_results(
+    client: redis.Redis,
+    results: list[dict],
+    local: LocalCache | None = None,
+) -> None:
+    results = [_result_value(result) for result in results if result["status"] in TERMINAL_STATUSES]
+    if not results:
+        return
+
+    async with client.pipeline(transaction=False) as pipe:
+        for value in results:
+            pipe.set(result_key(value["id"]), json.dumps(value), ex=RESULT_TTL)
+        await pipe.execute()
+
+    if local is not None:
+        for value in results:
+            local.set(result_key(value["id"]), value)
+
+
+async def delete_cached_results(
+    client: redis.Redis,
+    task_ids: list[int],
+    local: LocalCache | None = None,
+) -> None:
+    if not task_ids:
+        return
+
+    keys = [result_key(task_id) for task_id in task_ids]
+    await client.delete(*keys)
+    for key in keys:
+        if local is not None:
+            local.delete(key)
+        await client.publish(INVALIDATION_CHANNEL, key)
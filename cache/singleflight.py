@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_TTL_MS = int(os.getenv("SINGLEFLIGHT_LOCK_TTL_MS", "5000"))
+LOCK_POLL_INTERVAL_SECONDS = float(os.getenv("SINGLEFLIGHT_LOCK_POLL_SECONDS", "0.02"))
+
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = self.spawn(key, fn)
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def spawn(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+async def acquire_lock(client: redis.Redis, lock_key: str, lock_ttl_ms: int) -> str | None:
+    token = uuid.uuid4().hex
+    if await client.set(lock_key, token, nx=True, px=lock_ttl_ms):
+        return token
+    return None
+
+
+async def release_lock(client: redis.Redis, lock_key: str, token: str) -> None:
+    await client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+
+
+async def compute_with_lock(
+    client: redis.Redis,
+    lock_key: str,
+    fn: Callable[[], Awaitable[Any]],
+    get_cached: Callable[[], Awaitable[Any]],
+    lock_ttl_ms: int = LOCK_TTL_MS,
+    poll_interval: float = LOCK_POLL_INTERVAL_SECONDS,
+) -> Any:
+    deadline = time.monotonic() + lock_ttl_ms / 1000
+
+    while time.monotonic() < deadline:
+        token = await acquire_lock(client, lock_key, lock_ttl_ms)
+        if token is not None:
+            try:
+                return await fn()
+            finally:
+                await release_lock(client, lock_key, token)
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll_interval)
+            cached = await get_cached()
+            if cached is not None:
+                return cached
+            if not await client.exists(lock_key):
+                break
+
+    logger.warning(f"Lock {lock_key} not released in {lock_ttl_ms} ms, computing without it")
+    return await fn()
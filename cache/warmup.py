@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+import redis.asyncio as redis
+
+from cache.predictions import set_cached_predictions
+from cache.singleflight import acquire_lock, release_lock
+from db.repositories.advertisements import iter_open_advertisements
+from ml.features import extract_features_from_ads
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CHUNK_SIZE = int(os.getenv("WARMUP_CHUNK_SIZE", "1000"))
+WARMUP_LOG_EVERY_SECONDS = 5
+WARMUP_CHECKPOINT_TTL = int(os.getenv("WARMUP_CHECKPOINT_TTL", "86400"))
+WARMUP_LOCK_TTL_MS = int(os.getenv("WARMUP_LOCK_TTL_MS", "600000"))
+
+
+def checkpoint_key(namespace: str | None) -> str:
+    return f"prediction-warmup:last_item_id:{namespace or 'default'}"
+
+
+def warmup_lock_key(namespace: str | None) -> str:
+    return f"prediction-warmup:lock:{namespace or 'default'}"
+
+
+async def get_checkpoint(client: redis.Redis, namespace: str | None) -> int:
+    value = await client.get(checkpoint_key(namespace))
+    return int(value) if value is not None else 0
+
+
+async def warm_cache(
+    pool,
+    client: redis.Redis,
+    model,
+    executor,
+    namespace: str | None = None,
+    start_after: int | None = None,
+    chunk_size: int = WARMUP_CHUNK_SIZE,
+) -> dict:
+    if start_after is None:
+        start_after = await get_checkpoint(client, namespace)
+
+    started = time.perf_counter()
+    last_report = started
+    items = 0
+    last_item_id = start_after
+
+    async for ads in iter_open_advertisements(pool, start_after, chunk_size):
+        chunk_started = time.perf_counter()
+        probabilities = await executor.predict_proba(model, extract_features_from_ads(ads))
+        delta = (time.perf_counter() - chunk_started) / len(ads)
+
+        await set_cached_predictions(
+            client,
+            [(ad["id"], p >= 0.5, p) for ad, p in zip(ads, probabilities.tolist())],
+            delta=delta,
+            namespace=namespace,
+        )
+
+        items += len(ads)
+        last_item_id = ads[-1]["id"]
+        await client.set(checkpoint_key(namespace), last_item_id, ex=WARMUP_CHECKPOINT_TTL)
+
+        now = time.perf_counter()
+        if now - last_report >= WARMUP_LOG_EVERY_SECONDS:
+            logger.info(
+                f"Cache warm-up: {items} items, last_item_id={last_item_id}, "
+                f"{items / (now - started):.0f} items/s"
+            )
+            last_report = now
+
+    await client.delete(checkpoint_key(namespace))
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        "items": items,
+        "last_item_id": last_item_id,
+        "seconds": elapsed,
+        "items_per_second": items / elapsed if elapsed else 0.0,
+    }
+    logger.info(
+        f"Cache warm-up finished: {items} items in {elapsed:.1f}s "
+        f"({stats['items_per_second']:.0f} items/s), last_item_id={last_item_id}"
+    )
+    return stats
+
+
+async def warm_cache_once(
+    pool,
+    client: redis.Redis,
+    model,
+    executor,
+    namespace: str | None = None,
+    lock_ttl_ms: int = WARMUP_LOCK_TTL_MS,
+) -> dict | None:
+    lock_key = warmup_lock_key(namespace)
+    token = await acquire_lock(client, lock_key, lock_ttl_ms)
+    if token is None:
+        logger.info(f"Cache warm-up for namespace {namespace} already running or recently finished, skipping")
+        return None
+    try:
+        return await warm_cache(pool, client, model, executor, namespace=namespace)
+    except BaseException:
+        await release_lock(client, lock_key, token)
+        raise
+
+
+async def _main(args: argparse.Namespace) -> None:
+    from clients.redis import create_redis_client
+    from db.connection import close_pool, create_pool
+    from ml.executor import InferenceExecutor
+    from ml.model import load_model, model_fingerprint
+
+    model = load_model(args.model_path)
+    pool = await create_pool()
+    client = await create_redis_client()
+    try:
+        namespace = model_fingerprint(model)
+        if args.restart:
+            await client.delete(checkpoint_key(namespace))
+        await warm_cache(
+            pool, client, model, InferenceExecutor(),
+            namespace=namespace,
+            start_after=args.start_after,
+            chunk_size=args.chunk_size,
+        )
+    finally:
+        await client.aclose()
+        await close_pool(pool)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the prediction cache for all open advertisements")
+    parser.add_argument("--model-path", default="model.pkl")
+    parser.add_argument("--chunk-size", type=int, default=WARMUP_CHUNK_SIZE)
+    parser.add_argument("--start-after", type=int, default=None, help="resume after this item_id")
+    parser.add_argument("--restart", action="store_true", help="ignore the stored checkpoint")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,180 @@
+import asyncio
 import json
+import logging
 import os
+import time
+from collections import deque
 from datetime import datetime, timezone
 
 from aiokafka import AIOKafkaProducer
 
+from metrics.registry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
 KAFKA_BOOTSTRAP = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
 MODERATION_TOPIC = "moderation"
 DLQ_TOPIC = "moderation_dlq"
+RETRY_TOPIC_PREFIX = "moderation_retry"
+MESSAGE_SCHEMA_VERSION = 2
+SUPPORTED_SCHEMA_VERSIONS = (1, 2)
+
+KAFKA_SEND_MODE = os.getenv("KAFKA_SEND_MODE", "wait").lower()
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "5"))
+KAFKA_MAX_BATCH_SIZE = int(os.getenv("KAFKA_MAX_BATCH_SIZE", "65536"))
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION") or None
+MAX_FAILED_DELIVERIES = int(os.getenv("KAFKA_MAX_FAILED_DELIVERIES", "10000"))
+
+KAFKA_SEND_SECONDS = REGISTRY.histogram(
+    "kafka_send_seconds", "Time the caller waits on a Kafka send", ("topic", "mode"),
+)
+KAFKA_DELIVERY_SECONDS = REGISTRY.histogram(
+    "kafka_delivery_seconds", "Time from enqueue to broker acknowledgement for tracked sends", ("topic",),
+)
+KAFKA_DELIVERY_FAILURES = REGISTRY.counter(
+    "kafka_delivery_failures_total", "Tracked sends that failed delivery", ("topic",),
+)
+KAFKA_DELIVERY_DROPPED = REGISTRY.counter(
+    "kafka_delivery_dropped_total", "Failed sends evicted from a full resend queue", ("topic",),
+)
 
 
-async def create_kafka_producer() -> AIOKafkaProducer:
+async def create_kafka_producer(linger_ms: int = 0) -> AIOKafkaProducer:
     producer = AIOKafkaProducer(
         bootstrap_servers=KAFKA_BOOTSTRAP,
         value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+        linger_ms=linger_ms,
+        max_batch_size=KAFKA_MAX_BATCH_SIZE,
+        compression_type=KAFKA_COMPRESSION,
     )
-    await producer.start()
+    try:
+        await producer.start()
+    except BaseException:
+        await producer.stop()
+        raise
     return producer
 
 
-async def send_moderation_request(producer: AIOKafkaProducer, item_id: int) -> None:
-    message = {
+class DeliveryTracker:
+    def __init__(self, max_failed: int = MAX_FAILED_DELIVERIES):
+        self._pending: set[asyncio.Future] = set()
+        self.failed: deque[tuple[str, dict, str]] = deque(maxlen=max_failed)
+
+        self.sent = 0
+        self.delivered = 0
+        self.failures = 0
+        self.resent = 0
+        self.dropped = 0
+
+    def track(self, future: asyncio.Future, topic: str, message: dict) -> None:
+        self.sent += 1
+        self._pending.add(future)
+        started = time.perf_counter()
+        future.add_done_callback(lambda f: self._on_done(f, topic, message, started))
+
+    def _on_done(self, future: asyncio.Future, topic: str, message: dict, started: float) -> None:
+        self._pending.discard(future)
+        if future.cancelled():
+            error = "cancelled"
+        elif future.exception() is not None:
+            error = str(future.exception())
+        else:
+            self.delivered += 1
+            KAFKA_DELIVERY_SECONDS.labels(topic).observe(time.perf_counter() - started)
+            return
+
+        self.failures += 1
+        KAFKA_DELIVERY_FAILURES.labels(topic).inc()
+        logger.error(f"Kafka delivery to {topic} failed: {error}")
+        self._park((topic, message, error))
+
+    def _park(self, entry: tuple[str, dict, str], front: bool = False) -> None:
+        if len(self.failed) == self.failed.maxlen:
+            evicted = self.failed.pop() if front else self.failed.popleft()
+            self.dropped += 1
+            KAFKA_DELIVERY_DROPPED.labels(evicted[0]).inc()
+            logger.error(f"Resend queue full, dropping failed delivery to {evicted[0]}: {evicted[1]}")
+        if front:
+            self.failed.appendleft(entry)
+        else:
+            self.failed.append(entry)
+
+    async def send(self, producer: AIOKafkaProducer, topic: str, message: dict) -> None:
+        self.track(await producer.send(topic, message), topic, message)
+
+    async def resend_failed(self, producer: AIOKafkaProducer) -> int:
+        resent = 0
+        while self.failed:
+            topic, message, _ = self.failed.popleft()
+            try:
+                await self.send(producer, topic, message)
+            except Exception as e:
+                self._park((topic, message, str(e)), front=True)
+                logger.warning(f"Kafka resend failed: {e}")
+                break
+            resent += 1
+        self.resent += resent
+        return resent
+
+    async def resend_failed_periodically(self, producer: AIOKafkaProducer, interval: float = 5) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            if self.failed:
+                resent = await self.resend_failed(producer)
+                logger.info(f"Re-sent {resent} failed Kafka deliveries")
+
+    async def drain(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def take_failed(self) -> list[tuple[str, dict, str]]:
+        failed = list(self.failed)
+        self.failed.clear()
+        return failed
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "delivered": self.delivered,
+            "in_flight": len(self._pending),
+            "failures": self.failures,
+            "awaiting_resend": len(self.failed),
+            "resent": self.resent,
+            "dropped": self.dropped,
+        }
+
+
+async def _send(
+    producer: AIOKafkaProducer,
+    topic: str,
+    message: dict,
+    tracker: DeliveryTracker | None,
+) -> None:
+    started = time.perf_counter()
+    if tracker is None:
+        await producer.send_and_wait(topic, message)
+        KAFKA_SEND_SECONDS.labels(topic, "wait").observe(time.perf_counter() - started)
+    else:
+        await tracker.send(producer, topic, message)
+        KAFKA_SEND_SECONDS.labels(topic, "enqueue").observe(time.perf_counter() - started)
+
+
+def moderation_message(item_id: int, task_id: int | None = None) -> dict:
+    return {
+        "schema_version": MESSAGE_SCHEMA_VERSION,
         "item_id": item_id,
+        "task_id": task_id,
         "timestamp": datetime.now(timezone.utc).isoformat(),
     }
-    await producer.send_and_wait(MODERATION_TOPIC, message)
+
+
+async def send_moderation_request(
+    producer: AIOKafkaProducer,
+    item_id: int,
+    task_id: int | None = None,
+    tracker: DeliveryTracker | None = None,
+) -> None:
+    await _send(producer, MODERATION_TOPIC, moderation_message(item_id, task_id), tracker)
 
 
 async def send_to_dlq(
@@ -31,6 +182,7 @@ async def send_to_dlq(
     original_message: dict,
     error: str,
     retry_count: int = 1,
+    tracker: DeliveryTracker | None = None,
 ) -> None:
     dlq_message = {
         "original_message": original_message,
@@ -38,4 +190,13 @@ async def send_to_dlq(
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "retry_count": retry_count,
     }
-    await producer.send_and_wait(DLQ_TOPIC, dlq_message)
+    await _send(producer, DLQ_TOPIC, dlq_message, tracker)
+
+
+async def send_to_retry(
+    producer: AIOKafkaProducer,
+    topic: str,
+    message: dict,
+    headers: list[tuple[str, bytes]],
+) -> None:
+    await producer.send_and_wait(topic, message, headers=headers)
@@ -1,16 +1,71 @@
 import os
+import time
 
 import asyncpg
 
+from metrics.registry import REGISTRY, timed
 
-async def create_pool() -> asyncpg.Pool:
-    return await asyncpg.create_pool(
+DB_QUERY_SECONDS = REGISTRY.histogram(
+    "db_query_seconds", "Repository function latency, including pool acquire", ("function",),
+)
+DB_POOL_ACQUIRE_SECONDS = REGISTRY.histogram(
+    "db_pool_acquire_seconds", "Time spent waiting for a pooled connection",
+)
+DB_POOL_SIZE = REGISTRY.gauge("db_pool_connections", "Connections in the pool", ("state",))
+
+_pool_acquire = DB_POOL_ACQUIRE_SECONDS.labels()
+
+timed_query = timed(DB_QUERY_SECONDS)
+
+
+class _TimedAcquire:
+    def __init__(self, context):
+        self._context = context
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        started = time.perf_counter()
+        conn = await self._context.__aenter__()
+        _pool_acquire.observe(time.perf_counter() - started)
+        return conn
+
+    async def __aexit__(self, *exc):
+        return await self._context.__aexit__(*exc)
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def _acquire(self) -> asyncpg.Connection:
+        started = time.perf_counter()
+        conn = await self._context
+        _pool_acquire.observe(time.perf_counter() - started)
+        return conn
+
+
+class InstrumentedPool:
+    def __init__(self, pool: asyncpg.Pool):
+        self._pool = pool
+
+    def acquire(self, *args, **kwargs) -> _TimedAcquire:
+        return _TimedAcquire(self._pool.acquire(*args, **kwargs))
+
+    def __getattr__(self, name: str):
+        return getattr(self._pool, name)
+
+
+def update_pool_gauges(pool) -> None:
+    DB_POOL_SIZE.labels("total").set(pool.get_size())
+    DB_POOL_SIZE.labels("idle").set(pool.get_idle_size())
+
+
+async def create_pool() -> InstrumentedPool:
+    pool = await asyncpg.create_pool(
         host=os.getenv("PG_HOST", "localhost"),
         port=int(os.getenv("PG_PORT", "5432")),
         user=os.getenv("PG_USER", "postgres"),
         password=os.getenv("PG_PASSWORD", "postgres"),
         database=os.getenv("PG_DATABASE", "backend"),
     )
+    return InstrumentedPool(pool)
 
 
 async def close_pool(pool: asyncpg.Pool) -> None:
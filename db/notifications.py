@@ -0,0 +1,141 @@
+import asyncio
+import json
+import logging
+
+import asyncpg
+
+from db.repositories.moderation import RESULT_CHANNEL, TERMINAL_STATUSES
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_INITIAL_BACKOFF_SECONDS = 0.5
+RECONNECT_MAX_BACKOFF_SECONDS = 30
+
+
+class ResultNotifier:
+    def __init__(self, pool: asyncpg.Pool, channel: str = RESULT_CHANNEL):
+        self._pool = pool
+        self._channel = channel
+        self._conn: asyncpg.Connection | None = None
+        self._waiters: dict[int, set[asyncio.Future]] = {}
+        self._reconnect_task: asyncio.Task | None = None
+        self._stopping = False
+
+        self.notifications = 0
+        self.delivered = 0
+        self.reconnects = 0
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._listen()
+
+    async def _listen(self) -> None:
+        conn = await self._pool.acquire()
+        try:
+            await conn.add_listener(self._channel, self._on_notify)
+            conn.add_termination_listener(self._on_terminate)
+        except BaseException:
+            await self._pool.release(conn)
+            raise
+        self._conn = conn
+
+    def _on_terminate(self, connection) -> None:
+        if self._stopping or connection is not self._conn:
+            return
+        logger.warning("Moderation result listener connection lost, reconnecting")
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await self._pool.release(conn)
+            except Exception as e:
+                logger.warning(f"Releasing lost listener connection failed: {e}")
+
+        backoff = RECONNECT_INITIAL_BACKOFF_SECONDS
+        while not self._stopping:
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.warning(f"Moderation result listener reconnect failed, retrying in {backoff:.1f}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_BACKOFF_SECONDS)
+                continue
+            self.reconnects += 1
+            logger.info("Moderation result listener reconnected")
+            await self._resolve_missed()
+            return
+
+    async def _resolve_missed(self) -> None:
+        if not self._waiters:
+            return
+        try:
+            rows = await self._conn.fetch(
+                "SELECT id, status, is_violation, probability FROM moderation_results "
+                "WHERE id = ANY($1::int[]) AND status = ANY($2::text[])",
+                list(self._waiters), list(TERMINAL_STATUSES),
+            )
+        except Exception as e:
+            logger.warning(f"Checking waiters for results missed while disconnected failed: {e}")
+            return
+        for row in rows:
+            self._resolve(dict(row))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            await asyncio.gather(self._reconnect_task, return_exceptions=True)
+            self._reconnect_task = None
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            try:
+                conn.remove_termination_listener(self._on_terminate)
+                await conn.remove_listener(self._channel, self._on_notify)
+            finally:
+                await self._pool.release(conn)
+        for futures in self._waiters.values():
+            for future in futures:
+                future.cancel()
+        self._waiters.clear()
+
+    def register(self, task_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(task_id, set()).add(future)
+        return future
+
+    def unregister(self, task_id: int, future: asyncio.Future) -> None:
+        futures = self._waiters.get(task_id)
+        if futures is None:
+            return
+        futures.discard(future)
+        if not futures:
+            del self._waiters[task_id]
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.notifications += 1
+        try:
+            result = json.loads(payload)
+        except ValueError:
+            logger.warning(f"Malformed moderation notification: {payload!r}")
+            return
+
+        self._resolve(result)
+
+    def _resolve(self, result: dict) -> None:
+        for future in self._waiters.pop(result["id"], ()):
+            if not future.done():
+                future.set_result(result)
+                self.delivered += 1
+
+    def stats(self) -> dict:
+        return {
+            "listening": self._conn is not None and not self._conn.is_closed(),
+            "waiting_tasks": len(self._waiters),
+            "waiters": sum(len(futures) for futures in self._waiters.values()),
+            "notifications": self.notifications,
+            "delivered": self.delivered,
+            "reconnects": self.reconnects,
+        }
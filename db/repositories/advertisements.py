@@ -1,6 +1,13 @@
+from collections.abc import AsyncIterator
+
 import asyncpg
 
+from db.connection import timed_query
+
+BULK_INSERT_CHUNK_SIZE = 5000
 
+
+@timed_query
 async def create_advertisement(
     pool: asyncpg.Pool,
     seller_id: int,
@@ -18,6 +25,37 @@ async def create_advertisement(
         return dict(row)
 
 
+@timed_query
+async def create_advertisements_bulk(
+    pool: asyncpg.Pool,
+    ads: list[tuple[int, str, str, int, int]],
+) -> list[int]:
+    ids = []
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            for start in range(0, len(ads), BULK_INSERT_CHUNK_SIZE):
+                seller_ids, names, descriptions, categories, images_qty = zip(
+                    *ads[start:start + BULK_INSERT_CHUNK_SIZE]
+                )
+                rows = await conn.fetch(
+                    "WITH input AS ("
+                    "SELECT nextval(pg_get_serial_sequence('advertisements', 'id')) AS id, "
+                    "seller_id, name, description, category, images_qty, n "
+                    "FROM unnest($1::int[], $2::text[], $3::text[], $4::int[], $5::int[]) "
+                    "WITH ORDINALITY AS t(seller_id, name, description, category, images_qty, n)), "
+                    "inserted AS ("
+                    "INSERT INTO advertisements (id, seller_id, name, description, category, images_qty) "
+                    "SELECT id, seller_id, name, description, category, images_qty FROM input "
+                    "RETURNING id) "
+                    "SELECT input.id, input.n FROM inserted JOIN input USING (id)",
+                    list(seller_ids), list(names), list(descriptions),
+                    list(categories), list(images_qty),
+                )
+                ids.extend(row["id"] for row in sorted(rows, key=lambda row: row["n"]))
+    return ids
+
+
+@timed_query
 async def get_advertisement(pool: asyncpg.Pool, item_id: int) -> dict | None:
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -30,6 +68,74 @@ async def get_advertisement(pool: asyncpg.Pool, item_id: int) -> dict | None:
         return dict(row) if row else None
 
 
+@timed_query
+async def get_advertisements(pool: asyncpg.Pool, item_ids: list[int]) -> dict[int, dict]:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT a.*, u.is_verified_seller "
+            "FROM advertisements a "
+            "JOIN users u ON a.seller_id = u.id "
+            "WHERE a.id = ANY($1::int[])",
+            item_ids,
+        )
+        return {row["id"]: dict(row) for row in rows}
+
+
+@timed_query
+async def get_advertisements_page(
+    pool: asyncpg.Pool,
+    after_id: int,
+    end_id: int,
+    limit: int,
+) -> list[dict]:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT a.id, a.description, a.category, a.images_qty, u.is_verified_seller "
+            "FROM advertisements a "
+            "JOIN users u ON a.seller_id = u.id "
+            "WHERE a.id > $1 AND a.id <= $2 "
+            "ORDER BY a.id "
+            "LIMIT $3",
+            after_id, end_id, limit,
+        )
+        return [dict(row) for row in rows]
+
+
+@timed_query
+async def get_advertisement_id_range(pool: asyncpg.Pool) -> tuple[int, int] | None:
+    async with pool.acquire() as conn:
+        row = await conn.fetchrow("SELECT MIN(id) AS min_id, MAX(id) AS max_id FROM advertisements")
+        if row is None or row["min_id"] is None:
+            return None
+        return row["min_id"], row["max_id"]
+
+
+async def iter_open_advertisements(
+    pool: asyncpg.Pool,
+    start_after: int = 0,
+    chunk_size: int = 1000,
+) -> AsyncIterator[list[dict]]:
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            chunk = []
+            async for row in conn.cursor(
+                "SELECT a.id, a.description, a.category, a.images_qty, u.is_verified_seller "
+                "FROM advertisements a "
+                "JOIN users u ON a.seller_id = u.id "
+                "WHERE a.id > $1 AND NOT a.is_closed "
+                "ORDER BY a.id",
+                start_after,
+                prefetch=chunk_size,
+            ):
+                chunk.append(dict(row))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+
+@timed_query
 async def close_advertisement(pool: asyncpg.Pool, item_id: int) -> bool:
     async with pool.acquire() as conn:
         result = await conn.execute(
@@ -39,9 +145,11 @@ async def close_advertisement(pool: asyncpg.Pool, item_id: int) -> bool:
         return result == "DELETE 1"
 
 
-async def delete_moderation_results_for_item(pool: asyncpg.Pool, item_id: int) -> None:
+@timed_query
+async def delete_moderation_results_for_item(pool: asyncpg.Pool, item_id: int) -> list[int]:
     async with pool.acquire() as conn:
-        await conn.execute(
-            "DELETE FROM moderation_results WHERE item_id = $1",
+        rows = await conn.fetch(
+            "DELETE FROM moderation_results WHERE item_id = $1 RETURNING id",
             item_id,
         )
+        return [row["id"] for row in rows]
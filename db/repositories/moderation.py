@@ -1,7 +1,19 @@
 import asyncpg
 from datetime import datetime, timezone
 
+from db.connection import timed_query
 
+RESULT_CHANNEL = "moderation_results"
+TERMINAL_STATUSES = ("completed", "failed")
+
+_NOTIFY_TERMINAL = (
+    "SELECT id, CASE WHEN status IN ('completed', 'failed') THEN pg_notify('" + RESULT_CHANNEL + "', "
+    "json_build_object('id', id, 'status', status, 'is_violation', is_violation, 'probability', probability)"
+    "::text) END FROM updated"
+)
+
+
+@timed_query
 async def create_moderation_task(pool: asyncpg.Pool, item_id: int) -> dict:
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -12,6 +24,7 @@ async def create_moderation_task(pool: asyncpg.Pool, item_id: int) -> dict:
         return dict(row)
 
 
+@timed_query
 async def get_moderation_result(pool: asyncpg.Pool, task_id: int) -> dict | None:
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -21,6 +34,7 @@ async def get_moderation_result(pool: asyncpg.Pool, task_id: int) -> dict | None
         return dict(row) if row else None
 
 
+@timed_query
 async def update_moderation_result(
     pool: asyncpg.Pool,
     task_id: int,
@@ -28,13 +42,71 @@ async def update_moderation_result(
     is_violation: bool | None = None,
     probability: float | None = None,
     error_message: str | None = None,
-) -> None:
+) -> list[int]:
     async with pool.acquire() as conn:
-        await conn.execute(
+        rows = await conn.fetch(
+            "WITH updated AS ("
             "UPDATE moderation_results "
             "SET status = $1, is_violation = $2, probability = $3, "
             "error_message = $4, processed_at = $5 "
-            "WHERE id = $6",
+            "WHERE id = $6 "
+            "RETURNING id, status, is_violation, probability) "
+            + _NOTIFY_TERMINAL,
             status, is_violation, probability,
-            error_message, datetime.now(timezone.utc), task_id,
+            error_message, datetime.now(timezone.utc).replace(tzinfo=None), task_id,
+        )
+        return [row["id"] for row in rows]
+
+
+@timed_query
+async def get_pending_tasks(pool: asyncpg.Pool, item_ids: list[int]) -> dict[int, list[int]]:
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "SELECT item_id, id FROM moderation_results "
+            "WHERE item_id = ANY($1::int[]) AND status = 'pending' "
+            "ORDER BY item_id, id DESC",
+            item_ids,
+        )
+        pending: dict[int, list[int]] = {}
+        for row in rows:
+            pending.setdefault(row["item_id"], []).append(row["id"])
+        return pending
+
+
+@timed_query
+async def update_moderation_results(
+    pool: asyncpg.Pool,
+    results: list[tuple[int, str, bool | None, float | None, str | None]],
+) -> list[int]:
+    if not results:
+        return []
+    task_ids, statuses, is_violations, probabilities, error_messages = map(list, zip(*results))
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "WITH updated AS ("
+            "UPDATE moderation_results AS m "
+            "SET status = u.status, is_violation = u.is_violation, "
+            "probability = u.probability, error_message = u.error_message, "
+            "processed_at = $6 "
+            "FROM unnest($1::int[], $2::text[], $3::bool[], $4::float8[], $5::text[]) "
+            "AS u(id, status, is_violation, probability, error_message) "
+            "WHERE m.id = u.id "
+            "RETURNING m.id, m.status, m.is_violation, m.probability) "
+            + _NOTIFY_TERMINAL,
+            task_ids, statuses, is_violations, probabilities, error_messages,
+            datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+        return [row["id"] for row in rows]
+
+
+@timed_query
+async def copy_moderation_results(
+    pool: asyncpg.Pool,
+    records: list[tuple[int, str, bool | None, float | None, datetime]],
+) -> None:
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table(
+            "moderation_results",
+            records=records,
+            columns=["item_id", "status", "is_violation", "probability", "processed_at"],
         )
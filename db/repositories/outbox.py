@@ -0,0 +1,61 @@
+from collections.abc import Awaitable, Callable
+
+import asyncpg
+
+from db.connection import timed_query
+
+
+@timed_query
+async def create_moderation_task_with_outbox(pool: asyncpg.Pool, item_id: int) -> dict:
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                "INSERT INTO moderation_results (item_id, status) "
+                "VALUES ($1, 'pending') RETURNING *",
+                item_id,
+            )
+            await conn.execute(
+                "INSERT INTO moderation_outbox (task_id, item_id) VALUES ($1, $2)",
+                row["id"], item_id,
+            )
+            return dict(row)
+
+
+@timed_query
+async def enqueue_outbox(pool: asyncpg.Pool, tasks: list[tuple[int, int]]) -> int:
+    if not tasks:
+        return 0
+    task_ids, item_ids = map(list, zip(*tasks))
+    async with pool.acquire() as conn:
+        rows = await conn.fetch(
+            "INSERT INTO moderation_outbox (task_id, item_id) "
+            "SELECT t.task_id, t.item_id FROM unnest($1::int[], $2::int[]) AS t(task_id, item_id) "
+            "JOIN moderation_results m ON m.id = t.task_id "
+            "RETURNING id",
+            task_ids, item_ids,
+        )
+        return len(rows)
+
+
+@timed_query
+async def drain_outbox_batch(
+    pool: asyncpg.Pool,
+    publish: Callable[[list[dict]], Awaitable[None]],
+    limit: int,
+) -> int:
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            rows = await conn.fetch(
+                "SELECT id, task_id, item_id FROM moderation_outbox "
+                "ORDER BY id LIMIT $1 FOR UPDATE SKIP LOCKED",
+                limit,
+            )
+            if not rows:
+                return 0
+
+            await publish([dict(row) for row in rows])
+            await conn.execute(
+                "DELETE FROM moderation_outbox WHERE id = ANY($1::bigint[])",
+                [row["id"] for row in rows],
+            )
+            return len(rows)
@@ -1,6 +1,11 @@
 import asyncpg
 
+from db.connection import timed_query
 
+BULK_INSERT_CHUNK_SIZE = 5000
+
+
+@timed_query
 async def create_user(pool: asyncpg.Pool, name: str, is_verified_seller: bool = False) -> dict:
     async with pool.acquire() as conn:
         row = await conn.fetchrow(
@@ -10,7 +15,30 @@ async def create_user(pool: asyncpg.Pool, name: str, is_verified_seller: bool =
         return dict(row)
 
 
+@timed_query
 async def get_user(pool: asyncpg.Pool, user_id: int) -> dict | None:
     async with pool.acquire() as conn:
         row = await conn.fetchrow("SELECT * FROM users WHERE id = $1", user_id)
         return dict(row) if row else None
+
+
+@timed_query
+async def create_users_bulk(pool: asyncpg.Pool, users: list[tuple[str, bool]]) -> list[int]:
+    ids = []
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            for start in range(0, len(users), BULK_INSERT_CHUNK_SIZE):
+                names, is_verified = zip(*users[start:start + BULK_INSERT_CHUNK_SIZE])
+                rows = await conn.fetch(
+                    "WITH input AS ("
+                    "SELECT nextval(pg_get_serial_sequence('users', 'id')) AS id, name, is_verified_seller, n "
+                    "FROM unnest($1::text[], $2::bool[]) WITH ORDINALITY AS t(name, is_verified_seller, n)), "
+                    "inserted AS ("
+                    "INSERT INTO users (id, name, is_verified_seller) "
+                    "SELECT id, name, is_verified_seller FROM input "
+                    "RETURNING id) "
+                    "SELECT input.id, input.n FROM inserted JOIN input USING (id)",
+                    list(names), list(is_verified),
+                )
+                ids.extend(row["id"] for row in sorted(rows, key=lambda row: row["n"]))
+    return ids
@@ -1,21 +1,29 @@
+import asyncio
 import logging
 import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from clients.kafka import create_kafka_producer
+from cache.local import LocalCache
+from cache.namespaces import switch_namespace
+from cache.warmup import warm_cache_once
+from cache.predictions import listen_for_invalidations
+from cache.singleflight import SingleFlight
+from clients.kafka import KAFKA_LINGER_MS, KAFKA_SEND_MODE, MODERATION_TOPIC, DeliveryTracker, create_kafka_producer
 from clients.redis import create_redis_client
 from db.connection import create_pool, close_pool
-from ml.model import (
-    train_model,
-    save_model,
-    load_model,
-    register_model,
-    promote_to_production,
-    load_from_mlflow,
-)
+from db.notifications import ResultNotifier
+from db.repositories.outbox import enqueue_outbox
+from ml.batching import MicroBatcher
+from ml.executor import INFERENCE_MODE, InferenceExecutor
+from ml.model import load_model, load_from_mlflow, model_fingerprint, registry_model_version, LinearScorer
+from ml.reload import MODEL_RELOAD_INTERVAL, ModelWatcher, local_model_version
+from routers.ingest import router as ingest_router
+from routers.metrics import router as metrics_router
+from routers.stats import router as stats_router
 from routers.users import router as user_router
+from startup import KAFKA_STARTUP_TIMEOUT, PG_STARTUP_TIMEOUT, REDIS_STARTUP_TIMEOUT, StartupReport
 
 logging.basicConfig(
     level=logging.INFO,
@@ -23,50 +31,224 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = "model.pkl"
+MODEL_PATH = os.getenv("MODEL_PATH", "model.pkl")
 USE_MLFLOW = os.getenv("USE_MLFLOW", "false").lower() == "true"
+MODEL_SCORER = os.getenv("MODEL_SCORER", "sklearn").lower()
+WARM_CACHE_ON_STARTUP = os.getenv("WARM_CACHE_ON_STARTUP", "false").lower() == "true"
+CACHE_WARM_OVER = os.getenv("CACHE_WARM_OVER", "false").lower() == "true"
+CACHE_RECLAIM_OLD_NAMESPACE = os.getenv("CACHE_RECLAIM_OLD_NAMESPACE", "false").lower() == "true"
+USE_BATCHING = os.getenv("USE_BATCHING", "true").lower() == "true"
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    if not os.path.exists(MODEL_PATH):
-        logger.info("Training new model")
-        model = train_model()
-        save_model(model, MODEL_PATH)
-        register_model(model)
-        promote_to_production()
-        logger.info("Model registered in MLflow")
-
+def _load_serving_model():
     if USE_MLFLOW:
-        app.state.model = load_from_mlflow()
+        model = load_from_mlflow()
         logger.info("Model loaded from MLflow")
     else:
-        app.state.model = load_model(MODEL_PATH)
-        logger.info("Model loaded from pickle")
+        model = load_model(MODEL_PATH)
+        logger.info(f"Model loaded from {MODEL_PATH}")
 
-    try:
-        app.state.db_pool = await create_pool()
-        logger.info("Database pool created")
-    except Exception as e:
-        logger.warning(f"Database pool creation failed: {e}")
-        app.state.db_pool = None
+    if MODEL_SCORER == "numpy":
+        model = LinearScorer.from_model(model)
+        logger.info("Using NumPy linear scorer")
+    return model
 
-    try:
-        app.state.kafka_producer = await create_kafka_producer()
-        logger.info("Kafka producer created")
-    except Exception as e:
-        logger.warning(f"Kafka producer creation failed: {e}")
-        app.state.kafka_producer = None
+
+def _current_model_version() -> str | None:
+    if USE_MLFLOW:
+        return registry_model_version()
+    return local_model_version(MODEL_PATH)
+
+
+def _load_versioned_model():
+    version = _current_model_version()
+    return _load_serving_model(), version
+
+
+def _swap_model(app: FastAPI, model, version: str) -> None:
+    app.state.executor.reload(model)
+    app.state.model = model
+    app.state.model_version = version
+
+    namespace = model_fingerprint(model)
+    if namespace == app.state.cache_namespace:
+        return
+    app.state.cache_namespace = namespace
+    if app.state.redis_client is not None:
+        if app.state.namespace_task is not None:
+            app.state.namespace_task.cancel()
+        app.state.namespace_task = asyncio.create_task(
+            switch_namespace(app.state, warm_over=CACHE_WARM_OVER, reclaim=CACHE_RECLAIM_OLD_NAMESPACE)
+        )
+
+
+async def _save_failed_deliveries(tracker: DeliveryTracker, pool) -> None:
+    failed = tracker.take_failed()
+    if not failed:
+        return
+
+    tasks = []
+    for topic, message, error in failed:
+        if topic == MODERATION_TOPIC and message.get("task_id") is not None and pool is not None:
+            tasks.append((message["task_id"], message["item_id"]))
+        else:
+            logger.error(f"Undelivered Kafka message to {topic} lost at shutdown ({error}): {message}")
 
     try:
-        app.state.redis_client = await create_redis_client()
-        logger.info("Redis client created")
+        saved = await enqueue_outbox(pool, tasks) if tasks else 0
     except Exception as e:
-        logger.warning(f"Redis client creation failed: {e}")
-        app.state.redis_client = None
+        logger.error(f"Saving {len(tasks)} undelivered moderation requests to the outbox failed: {e}: {tasks}")
+        return
+    logger.info(f"Saved {saved} undelivered moderation requests to the outbox")
+
+
+async def _create_redis_client(report: StartupReport):
+    client = await create_redis_client()
+    await report.run("redis", client.ping(), REDIS_STARTUP_TIMEOUT)
+    return client
+
+
+async def _close_clients(pool, producer, redis_client) -> None:
+    for name, resource, close in (
+        ("postgres", pool, close_pool),
+        ("kafka", producer, lambda p: p.stop()),
+        ("redis", redis_client, lambda c: c.aclose()),
+    ):
+        if resource is None or isinstance(resource, BaseException):
+            continue
+        try:
+            await close(resource)
+        except Exception as e:
+            logger.warning(f"Closing {name} after failed startup failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    report = StartupReport()
+    app.state.startup_report = report
+
+    if not USE_MLFLOW and not os.path.exists(MODEL_PATH):
+        raise RuntimeError(f"Model artifact {MODEL_PATH} not found, run `python -m ml.train` first")
+
+    results = await asyncio.gather(
+        report.run("model", asyncio.to_thread(_load_versioned_model), required=True),
+        report.run("postgres", create_pool(), PG_STARTUP_TIMEOUT),
+        report.run(
+            "kafka",
+            create_kafka_producer(KAFKA_LINGER_MS if KAFKA_SEND_MODE == "async" else 0),
+            KAFKA_STARTUP_TIMEOUT,
+        ),
+        _create_redis_client(report),
+        return_exceptions=True,
+    )
+    failure = next((result for result in results if isinstance(result, BaseException)), None)
+    if failure is not None:
+        await _close_clients(*results[1:])
+        raise failure
+    loaded, app.state.db_pool, app.state.kafka_producer, app.state.redis_client = results
+    app.state.model, app.state.model_version = loaded
+
+    with report.phase("executor"):
+        app.state.executor = InferenceExecutor(
+            INFERENCE_MODE,
+            model_path=None if USE_MLFLOW else MODEL_PATH,
+            scorer=MODEL_SCORER,
+            model=app.state.model,
+        )
+        logger.info(f"Inference executor mode={INFERENCE_MODE}")
+
+        if USE_BATCHING:
+            app.state.batcher = MicroBatcher(
+                lambda features: app.state.executor.predict_proba(app.state.model, features)
+            )
+            app.state.batcher.start()
+            logger.info("Prediction micro-batching enabled")
+        else:
+            app.state.batcher = None
+
+    app.state.result_notifier = None
+    if app.state.db_pool is not None:
+        notifier = ResultNotifier(app.state.db_pool)
+        await report.run("result_listener", notifier.start(), PG_STARTUP_TIMEOUT)
+        if report.succeeded("result_listener"):
+            app.state.result_notifier = notifier
+            logger.info("Listening for moderation result notifications")
+
+    app.state.delivery_tracker = None
+    app.state.resend_task = None
+    if KAFKA_SEND_MODE == "async" and app.state.kafka_producer is not None:
+        app.state.delivery_tracker = DeliveryTracker()
+        app.state.resend_task = asyncio.create_task(
+            app.state.delivery_tracker.resend_failed_periodically(app.state.kafka_producer)
+        )
+        logger.info("Kafka producer in async send mode")
+
+    app.state.local_cache = LocalCache()
+    app.state.singleflight = SingleFlight()
+    app.state.cache_namespace = model_fingerprint(app.state.model)
+    app.state.fallback_namespace = None
+    app.state.invalidation_task = None
+    app.state.namespace_task = None
+    app.state.warmup_task = None
+    if app.state.redis_client is not None:
+        app.state.invalidation_task = asyncio.create_task(
+            listen_for_invalidations(app.state.redis_client, app.state.local_cache)
+        )
+        app.state.namespace_task = asyncio.create_task(
+            switch_namespace(app.state, warm_over=CACHE_WARM_OVER, reclaim=CACHE_RECLAIM_OLD_NAMESPACE)
+        )
+        if WARM_CACHE_ON_STARTUP and app.state.db_pool is not None:
+            app.state.warmup_task = asyncio.create_task(
+                warm_cache_once(
+                    app.state.db_pool,
+                    app.state.redis_client,
+                    app.state.model,
+                    app.state.executor,
+                    namespace=app.state.cache_namespace,
+                )
+            )
+    logger.info(f"Prediction cache namespace {app.state.cache_namespace}")
+
+    app.state.model_watcher = None
+    app.state.reload_task = None
+    if MODEL_RELOAD_INTERVAL > 0:
+        app.state.model_watcher = ModelWatcher(
+            _current_model_version,
+            _load_serving_model,
+            lambda model, version: _swap_model(app, model, version),
+            version=app.state.model_version,
+        )
+        app.state.reload_task = asyncio.create_task(app.state.model_watcher.run())
+        logger.info(f"Watching for new model versions every {MODEL_RELOAD_INTERVAL}s")
+    report.finish()
 
     yield
 
+    background_tasks = (
+        app.state.invalidation_task,
+        app.state.namespace_task,
+        app.state.warmup_task,
+        app.state.resend_task,
+        app.state.reload_task,
+    )
+    for task in background_tasks:
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.warning(f"Background task failed: {e}")
+
+    if app.state.batcher is not None:
+        await app.state.batcher.stop()
+    app.state.executor.shutdown()
+
+    if app.state.delivery_tracker is not None:
+        await app.state.delivery_tracker.drain()
+        await _save_failed_deliveries(app.state.delivery_tracker, app.state.db_pool)
+
     if app.state.kafka_producer is not None:
         try:
             await app.state.kafka_producer.stop()
@@ -79,6 +261,12 @@ async def lifespan(app: FastAPI):
         except Exception:
             pass
 
+    if app.state.result_notifier is not None:
+        try:
+            await app.state.result_notifier.stop()
+        except Exception:
+            pass
+
     if app.state.db_pool is not None:
         await close_pool(app.state.db_pool)
     app.state.model = None
@@ -87,6 +275,9 @@ async def lifespan(app: FastAPI):
 app = FastAPI(lifespan=lifespan)
 
 app.include_router(user_router)
+app.include_router(ingest_router)
+app.include_router(stats_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
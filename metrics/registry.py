@@ -0,0 +1,162 @@
+import functools
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    def __init__(self, name: str, help: str, kind: str, labelnames: tuple[str, ...], factory: Callable):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lookup: dict[tuple, object] = {}
+
+    def labels(self, *values) -> Counter | Gauge | Histogram:
+        child = self._lookup.get(values)
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._factory()
+        self._lookup[values] = child
+        return child
+
+    def remove(self, *values) -> None:
+        child = self._children.pop(tuple(str(value) for value in values), None)
+        if child is not None:
+            self._lookup = {key: value for key, value in self._lookup.items() if value is not child}
+
+    def children(self) -> dict[tuple[str, ...], object]:
+        return dict(self._children)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in self._children.items():
+            labels = list(zip(self.labelnames, key))
+            if self.kind == "histogram":
+                cumulative = 0
+                for bound, count in zip(child.buckets, child.counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_labels(labels + [('le', _number(bound))])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(labels + [('le', '+Inf')])} {child.count}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {_number(child.sum)}")
+                lines.append(f"{self.name}_count{_labels(labels)} {child.count}")
+            else:
+                lines.append(f"{self.name}{_labels(labels)} {_number(child.value)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: list[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self):
+        self._families: dict[str, MetricFamily] = {}
+
+    def _register(self, family: MetricFamily) -> MetricFamily:
+        if family.name in self._families:
+            raise ValueError(f"Metric {family.name} already registered")
+        self._families[family.name] = family
+        return family
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "counter", labelnames, Counter))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "gauge", labelnames, Gauge))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> MetricFamily:
+        return self._register(MetricFamily(name, help, "histogram", labelnames, lambda: Histogram(buckets)))
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families.values():
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def timed(family: MetricFamily) -> Callable:
+    def decorator(fn: Callable) -> Callable:
+        histogram = family.labels(fn.__name__)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
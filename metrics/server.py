@@ -0,0 +1,38 @@
+import asyncio
+import logging
+
+from metrics.registry import REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _response(status: str, body: bytes, content_type: str = "text/plain; charset=utf-8") -> bytes:
+    headers = (
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return headers.encode("ascii") + body
+
+
+async def start_metrics_server(host: str, port: int, registry: Registry = REGISTRY) -> asyncio.Server:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                writer.write(_response("200 OK", registry.render().encode("utf-8"), PROMETHEUS_CONTENT_TYPE))
+            else:
+                writer.write(_response("404 Not Found", b"Not Found\n"))
+            await writer.drain()
+        except Exception as e:
+            logger.warning(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"Serving metrics on {host}:{port}/metrics")
+    return server
@@ -0,0 +1 @@
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_moderation_results_item_id ON moderation_results (item_id);
@@ -0,0 +1,6 @@
+CREATE TABLE moderation_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    task_id INTEGER NOT NULL REFERENCES moderation_results(id) ON DELETE CASCADE,
+    item_id INTEGER NOT NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], Awaitable[np.ndarray]],
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+    ):
+        self._predict_fn = predict_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._pending: list[tuple[np.ndarray, asyncio.Future, float]] = []
+        self._nonempty = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Batcher stopped"))
+        self._pending.clear()
+
+    async def predict(self, features: np.ndarray) -> float:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((features, future, time.perf_counter()))
+        self._nonempty.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._nonempty.wait()
+            if len(self._pending) < self.max_batch_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if len(self._pending) < self.max_batch_size:
+                self._full.clear()
+            if not self._pending:
+                self._nonempty.clear()
+
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: list[tuple[np.ndarray, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            wait = started - enqueued
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        try:
+            probabilities = await self._predict_fn(np.vstack([features for features, _, _ in batch]))
+        except Exception as e:
+            logger.error(f"Batch prediction failed for {len(batch)} items: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), probability in zip(batch, probabilities.tolist()):
+            if not future.done():
+                future.set_result(probability)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "items": self.items,
+            "pending": len(self._pending),
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_seen,
+            "avg_queue_wait_ms": self.total_wait / self.items * 1000 if self.items else 0.0,
+            "max_queue_wait_ms": self.max_wait * 1000,
+        }
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+
+from ml.model import LinearScorer, load_from_mlflow, load_model
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "inline").lower()
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "4"))
+
+INFERENCE_MODES = ("inline", "thread", "process")
+
+_process_model = None
+
+
+def _init_process(model_path: str | None, scorer: str, model=None) -> None:
+    global _process_model
+    if model is None:
+        model = load_model(model_path) if model_path is not None else load_from_mlflow()
+    if scorer == "numpy":
+        model = LinearScorer.from_model(model)
+    _process_model = model
+
+
+def _process_initargs(model_path: str | None, scorer: str, model=None) -> tuple:
+    if model is None:
+        return model_path, scorer, None
+    source = getattr(model, "source", None)
+    if source is not None:
+        return source, scorer, None
+    return model_path, scorer, model
+
+
+def _predict_positive(model, features: np.ndarray) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    probabilities = model.predict_proba(features)[:, 1]
+    return probabilities, time.perf_counter() - start
+
+
+def _process_predict_positive(features: np.ndarray) -> tuple[np.ndarray, float]:
+    return _predict_positive(_process_model, features)
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        mode: str = "inline",
+        max_workers: int = INFERENCE_WORKERS,
+        model_path: str | None = "model.pkl",
+        scorer: str = "sklearn",
+        model=None,
+    ):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+
+        self._model_path = model_path
+        self._scorer = scorer
+        self._initargs = _process_initargs(model_path, scorer, model)
+        self._pool: Executor | None = None
+        if mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix="inference")
+        elif mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers,
+                initializer=_init_process,
+                initargs=self._initargs,
+                mp_context=get_context("spawn"),
+            )
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.rows = 0
+        self.total_exec_time = 0.0
+        self.max_exec_time = 0.0
+        self.total_wait_time = 0.0
+
+    async def predict_proba(self, model, features: np.ndarray) -> np.ndarray:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        start = time.perf_counter()
+        try:
+            if self._pool is None:
+                probabilities, exec_time = _predict_positive(model, features)
+            elif self.mode == "process":
+                probabilities, exec_time = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, _process_predict_positive, features,
+                )
+            else:
+                probabilities, exec_time = await asyncio.get_running_loop().run_in_executor(
+                    self._pool, _predict_positive, model, features,
+                )
+        finally:
+            self.in_flight -= 1
+
+        self.calls += 1
+        self.rows += features.shape[0]
+        self.total_exec_time += exec_time
+        self.max_exec_time = max(self.max_exec_time, exec_time)
+        self.total_wait_time += max(time.perf_counter() - start - exec_time, 0.0)
+        return probabilities
+
+    def reload(self, model=None) -> None:
+        if self.mode != "process" or self._pool is None:
+            return
+        self._initargs = _process_initargs(self._model_path, self._scorer, model)
+        previous = self._pool
+        self._pool = ProcessPoolExecutor(
+            self.max_workers,
+            initializer=_init_process,
+            initargs=self._initargs,
+            mp_context=get_context("spawn"),
+        )
+        previous.shutdown(wait=False)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "max_workers": self.max_workers if self._pool is not None else 0,
+            "queue_depth": self.in_flight,
+            "max_queue_depth": self.max_in_flight,
+            "calls": self.calls,
+            "rows": self.rows,
+            "avg_exec_ms": self.total_exec_time / self.calls * 1000 if self.calls else 0.0,
+            "max_exec_ms": self.max_exec_time * 1000,
+            "avg_wait_ms": self.total_wait_time / self.calls * 1000 if self.calls else 0.0,
+        }
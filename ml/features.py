@@ -1,5 +1,9 @@
+from collections.abc import Mapping, Sequence
+
 import numpy as np
 
+N_FEATURES = 4
+
 
 def extract_features(
     is_verified_seller: bool,
@@ -13,3 +17,31 @@ def extract_features(
         len(description) / 1000,
         category / 100,
     ]])
+
+
+def extract_features_batch(
+    is_verified_seller: Sequence[bool],
+    images_qty: Sequence[int],
+    descriptions: Sequence[str],
+    categories: Sequence[int],
+) -> np.ndarray:
+    n = len(descriptions)
+    features = np.empty((n, N_FEATURES), dtype=np.float64)
+
+    features[:, 0] = np.fromiter(is_verified_seller, dtype=np.float64, count=n)
+    features[:, 1] = np.fromiter(images_qty, dtype=np.float64, count=n)
+    features[:, 1] /= 10
+    features[:, 2] = np.fromiter(map(len, descriptions), dtype=np.float64, count=n)
+    features[:, 2] /= 1000
+    features[:, 3] = np.fromiter(categories, dtype=np.float64, count=n)
+    features[:, 3] /= 100
+    return features
+
+
+def extract_features_from_ads(ads: Sequence[Mapping]) -> np.ndarray:
+    return extract_features_batch(
+        [ad["is_verified_seller"] for ad in ads],
+        [ad["images_qty"] for ad in ads],
+        [ad["description"] for ad in ads],
+        [ad["category"] for ad in ads],
+    )
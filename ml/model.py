@@ -1,10 +1,18 @@
+import hashlib
+import json
 import numpy as np
+import os
 import pickle
-import mlflow
-from mlflow.sklearn import log_model, load_model as mlflow_load_model
+import re
+import shutil
+from scipy.special import expit
 from sklearn.linear_model import LogisticRegression
 
 MODEL_NAME = "moderation-model"
+ARTIFACT_FORMAT = "linear-npy"
+ARTIFACT_VERSION = 1
+ARTIFACT_HEADER = "model.json"
+ARTIFACT_ARRAYS = ("coef", "intercept", "classes")
 
 
 def train_model() -> LogisticRegression:
@@ -38,22 +46,107 @@ def train_model() -> LogisticRegression:
 
 
 def save_model(model: LogisticRegression, path: str = "model.pkl") -> None:
-    with open(path, "wb") as f:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
         pickle.dump(model, f)
+    os.replace(tmp_path, path)
 
 
 def load_model(path: str = "model.pkl") -> LogisticRegression:
+    if os.path.isdir(path):
+        return load_model_artifact(path)
     with open(path, "rb") as f:
         return pickle.load(f)
 
 
+def export_model_artifact(model, directory: str) -> None:
+    scorer = model if isinstance(model, LinearScorer) else LinearScorer.from_model(model)
+    fingerprint = model_fingerprint(scorer)
+    version_directory = f"{directory}.{fingerprint}"
+
+    if not os.path.isdir(version_directory):
+        tmp_directory = f"{version_directory}.tmp"
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+        os.makedirs(tmp_directory)
+
+        arrays = {"coef": scorer.coef_, "intercept": scorer.intercept_, "classes": np.asarray(scorer.classes_)}
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp_directory, f"{name}.npy"), np.ascontiguousarray(array))
+
+        header = {
+            "format": ARTIFACT_FORMAT,
+            "version": ARTIFACT_VERSION,
+            "n_features": scorer.coef_.shape[1],
+            "fingerprint": fingerprint,
+        }
+        with open(os.path.join(tmp_directory, ARTIFACT_HEADER), "w") as f:
+            json.dump(header, f)
+        os.rename(tmp_directory, version_directory)
+
+    previous = os.readlink(directory) if os.path.islink(directory) else None
+    if os.path.isdir(directory) and previous is None:
+        shutil.rmtree(directory)
+
+    tmp_link = f"{directory}.link.tmp"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(os.path.basename(version_directory), tmp_link)
+    os.replace(tmp_link, directory)
+    _remove_stale_artifacts(directory, keep={os.path.basename(version_directory), previous})
+
+
+def _remove_stale_artifacts(directory: str, keep: set[str | None]) -> None:
+    parent, name = os.path.split(os.path.abspath(directory))
+    for entry in os.listdir(parent):
+        path = os.path.join(parent, entry)
+        if not entry.startswith(f"{name}.") or entry in keep:
+            continue
+        if not re.fullmatch(r"[0-9a-f]{12}(\.tmp)?", entry[len(name) + 1:]):
+            continue
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_model_artifact(directory: str) -> "LinearScorer":
+    directory = os.path.realpath(directory)
+    with open(os.path.join(directory, ARTIFACT_HEADER)) as f:
+        header = json.load(f)
+    if header.get("format") != ARTIFACT_FORMAT or header.get("version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact {header.get('format')} v{header.get('version')}")
+
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in ARTIFACT_ARRAYS
+    }
+    if arrays["coef"].shape[1] != header["n_features"]:
+        raise ValueError(f"Model artifact expects {header['n_features']} features, weights have {arrays['coef'].shape[1]}")
+    scorer = LinearScorer(arrays["coef"], arrays["intercept"], np.asarray(arrays["classes"]))
+    scorer.source = directory
+    return scorer
+
+
+def model_fingerprint(model) -> str:
+    digest = hashlib.sha256()
+    if hasattr(model, "coef_") and hasattr(model, "intercept_"):
+        digest.update(np.ascontiguousarray(model.coef_, dtype=np.float64).tobytes())
+        digest.update(np.ascontiguousarray(model.intercept_, dtype=np.float64).tobytes())
+    else:
+        digest.update(pickle.dumps(model))
+    return digest.hexdigest()[:12]
+
+
 def register_model(model: LogisticRegression) -> None:
+    import mlflow
+    from mlflow.sklearn import log_model
+
     mlflow.set_tracking_uri("./mlruns")
     with mlflow.start_run():
         log_model(model, "model", registered_model_name=MODEL_NAME)
 
 
 def promote_to_production() -> None:
+    import mlflow
+
     mlflow.set_tracking_uri("./mlruns")
     client = mlflow.MlflowClient()
     latest = client.get_latest_versions(MODEL_NAME, stages=["None"])
@@ -65,7 +158,44 @@ def promote_to_production() -> None:
         )
 
 
+def registry_model_version(stage: str = "Production") -> str | None:
+    import mlflow
+
+    mlflow.set_tracking_uri("./mlruns")
+    client = mlflow.MlflowClient()
+    latest = client.get_latest_versions(MODEL_NAME, stages=[stage])
+    return str(latest[0].version) if latest else None
+
+
 def load_from_mlflow(stage: str = "Production") -> LogisticRegression:
+    import mlflow
+    from mlflow.sklearn import load_model as mlflow_load_model
+
     mlflow.set_tracking_uri("./mlruns")
     model_uri = f"models:/{MODEL_NAME}/{stage}"
     return mlflow_load_model(model_uri)
+
+
+class LinearScorer:
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray):
+        if coef.ndim != 2 or coef.shape[0] != 1:
+            raise ValueError("LinearScorer supports binary models only")
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept_ = np.ascontiguousarray(intercept, dtype=np.float64)
+        self.classes_ = classes
+        self._coef_t = self.coef_.T
+        self.source: str | None = None
+
+    @classmethod
+    def from_model(cls, model: LogisticRegression) -> "LinearScorer":
+        return cls(model.coef_, model.intercept_, model.classes_)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        scores = features @ self._coef_t
+        scores += self.intercept_
+        prob = expit(scores.reshape(-1), out=scores.reshape(-1))
+
+        result = np.empty((prob.shape[0], 2), dtype=np.float64)
+        np.subtract(1, prob, out=result[:, 0])
+        result[:, 1] = prob
+        return result
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Callable
+
+import numpy as np
+
+from ml.features import extract_features_batch
+from ml.model import ARTIFACT_HEADER
+
+logger = logging.getLogger(__name__)
+
+MODEL_RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "0"))
+MODEL_VERSION_FILE = os.getenv("MODEL_VERSION_FILE") or None
+
+CANARY_FEATURES = extract_features_batch(
+    [False, True, False, True],
+    [0, 10, 2, 5],
+    ["x" * 50, "x" * 1000, "x" * 150, "x" * 400],
+    [0, 99, 5, 50],
+)
+
+
+def local_model_version(path: str, version_file: str | None = MODEL_VERSION_FILE) -> str | None:
+    if version_file is not None:
+        try:
+            with open(version_file) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    target = os.path.join(path, ARTIFACT_HEADER) if os.path.isdir(path) else path
+    try:
+        stat = os.stat(target)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def validate_model(model, features: np.ndarray = CANARY_FEATURES) -> None:
+    probabilities = np.asarray(model.predict_proba(features))
+    if probabilities.shape != (features.shape[0], 2):
+        raise ValueError(f"Canary batch returned shape {probabilities.shape}")
+    if not np.all(np.isfinite(probabilities)):
+        raise ValueError("Canary batch returned non-finite probabilities")
+    if np.any(probabilities < 0) or np.any(probabilities > 1):
+        raise ValueError("Canary batch returned probabilities outside [0, 1]")
+    if not np.allclose(probabilities.sum(axis=1), 1.0):
+        raise ValueError("Canary batch probabilities do not sum to 1")
+
+
+class ModelHandle:
+    def __init__(self, model, version: str | None = None):
+        self.current = model
+        self.version = version
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        return self.current.predict_proba(features)
+
+    def swap(self, model, version: str | None) -> None:
+        self.current = model
+        self.version = version
+
+
+class ModelWatcher:
+    def __init__(
+        self,
+        get_version: Callable[[], str | None],
+        load: Callable[[], object],
+        on_swap: Callable[[object, str], None],
+        version: str | None = None,
+        interval: float = MODEL_RELOAD_INTERVAL,
+    ):
+        self.get_version = get_version
+        self.load = load
+        self.on_swap = on_swap
+        self.version = version
+        self.interval = interval
+
+        self._rejected: str | None = None
+        self.checks = 0
+        self.swaps = 0
+        self.failures = 0
+        self.last_swap_ms: float | None = None
+        self.last_swapped_at: float | None = None
+        self.last_error: str | None = None
+
+    async def check(self) -> bool:
+        self.checks += 1
+        version = await asyncio.to_thread(self.get_version)
+        if version is None or version == self.version or version == self._rejected:
+            return False
+
+        started = time.perf_counter()
+        try:
+            model = await asyncio.to_thread(self.load)
+            await asyncio.to_thread(validate_model, model)
+        except Exception as e:
+            self._rejected = version
+            self.failures += 1
+            self.last_error = str(e)
+            logger.error(f"Model version {version} rejected: {e}")
+            return False
+
+        previous = self.version
+        self.on_swap(model, version)
+        self.version = version
+        self.swaps += 1
+        self.last_swap_ms = (time.perf_counter() - started) * 1000
+        self.last_swapped_at = time.time()
+        logger.info(f"Swapped model {previous} -> {version} in {self.last_swap_ms:.0f}ms")
+        return True
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Model version check failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "interval_seconds": self.interval,
+            "checks": self.checks,
+            "swaps": self.swaps,
+            "failures": self.failures,
+            "last_swap_ms": self.last_swap_ms,
+            "last_swapped_at": self.last_swapped_at,
+            "last_error": self.last_error,
+        }
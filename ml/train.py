@@ -0,0 +1,35 @@
+import argparse
+import logging
+import time
+
+from ml.model import export_model_artifact, promote_to_production, register_model, save_model, train_model
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the moderation model and write the serving artifact")
+    parser.add_argument("--output", default="model.pkl")
+    parser.add_argument("--artifact", default=None, help="also export memory-mappable weights to this directory")
+    parser.add_argument("--register", action="store_true", help="also register and promote the model in MLflow")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    started = time.perf_counter()
+    model = train_model()
+    save_model(model, args.output)
+    logger.info(f"Model trained and saved to {args.output} in {time.perf_counter() - started:.2f}s")
+
+    if args.artifact:
+        export_model_artifact(model, args.artifact)
+        logger.info(f"Model weights exported to {args.artifact}")
+
+    if args.register:
+        register_model(model)
+        promote_to_production()
+        logger.info("Model registered in MLflow and promoted to Production")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import logging
+import os
+
+import asyncpg
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from db.repositories.advertisements import create_advertisements_bulk
+from db.repositories.users import create_users_bulk
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MAX_BULK_ROWS = int(os.getenv("MAX_BULK_ROWS", "50000"))
+
+
+class UserCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=255)
+    is_verified_seller: bool = False
+
+
+class AdvertisementCreate(BaseModel):
+    seller_id: int = Field(..., ge=0)
+    name: str = Field(..., min_length=1, max_length=255)
+    description: str = Field(..., min_length=1)
+    category: int = Field(..., ge=0)
+    images_qty: int = Field(0, ge=0)
+
+
+class BulkCreateResponse(BaseModel):
+    ids: list[int]
+
+
+def _check_bulk_request(req: Request, rows: list):
+    db_pool = req.app.state.db_pool
+    if db_pool is None:
+        raise HTTPException(status_code=503, detail="Database not available")
+    if len(rows) > MAX_BULK_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ROWS} rows per request")
+    return db_pool
+
+
+@router.post("/users/bulk", response_model=BulkCreateResponse)
+async def create_users(users: list[UserCreate], req: Request):
+    db_pool = _check_bulk_request(req, users)
+    if not users:
+        return BulkCreateResponse(ids=[])
+
+    ids = await create_users_bulk(db_pool, [(u.name, u.is_verified_seller) for u in users])
+    logger.info(f"Ingested {len(ids)} users")
+    return BulkCreateResponse(ids=ids)
+
+
+@router.post("/advertisements/bulk", response_model=BulkCreateResponse)
+async def create_advertisements(ads: list[AdvertisementCreate], req: Request):
+    db_pool = _check_bulk_request(req, ads)
+    if not ads:
+        return BulkCreateResponse(ids=[])
+
+    try:
+        ids = await create_advertisements_bulk(
+            db_pool,
+            [(a.seller_id, a.name, a.description, a.category, a.images_qty) for a in ads],
+        )
+    except asyncpg.ForeignKeyViolationError:
+        raise HTTPException(status_code=422, detail="Unknown seller_id")
+    logger.info(f"Ingested {len(ids)} advertisements")
+    return BulkCreateResponse(ids=ids)
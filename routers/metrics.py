@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from db.connection import InstrumentedPool, update_pool_gauges
+from metrics.registry import REGISTRY
+from metrics.server import PROMETHEUS_CONTENT_TYPE
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(req: Request):
+    db_pool = req.app.state.db_pool
+    if isinstance(db_pool, InstrumentedPool):
+        update_pool_gauges(db_pool)
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
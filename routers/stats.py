@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from cache.predictions import redis_cache_stats
+
+router = APIRouter(prefix="/stats")
+
+
+@router.get("/batcher")
+async def batcher_stats(req: Request):
+    batcher = req.app.state.batcher
+    if batcher is None:
+        raise HTTPException(status_code=404, detail="Batching disabled")
+    return batcher.stats()
+
+
+@router.get("/executor")
+async def executor_stats(req: Request):
+    return req.app.state.executor.stats()
+
+
+@router.get("/cache")
+async def cache_stats(req: Request):
+    stats = {
+        "local": req.app.state.local_cache.stats(),
+        "singleflight": req.app.state.singleflight.stats(),
+    }
+    redis_client = req.app.state.redis_client
+    if redis_client is not None:
+        stats["redis"] = await redis_cache_stats(redis_client)
+    return stats
+
+
+@router.get("/kafka")
+async def kafka_stats(req: Request):
+    tracker = req.app.state.delivery_tracker
+    if tracker is None:
+        raise HTTPException(status_code=404, detail="Async Kafka sends disabled")
+    return tracker.stats()
+
+
+@router.get("/results")
+async def result_notifier_stats(req: Request):
+    notifier = req.app.state.result_notifier
+    if notifier is None:
+        raise HTTPException(status_code=404, detail="Result notifications disabled")
+    return notifier.stats()
+
+
+@router.get("/startup")
+async def startup_stats(req: Request):
+    return req.app.state.startup_report.as_dict()
+
+
+@router.get("/model")
+async def model_stats(req: Request):
+    watcher = req.app.state.model_watcher
+    return {
+        "version": req.app.state.model_version,
+        "fingerprint": req.app.state.cache_namespace,
+        "reload": watcher.stats() if watcher is not None else None,
+    }
@@ -1,18 +1,50 @@
+import asyncio
 import logging
+import os
+import time
 
 from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from cache.predictions import get_cached_prediction, set_cached_prediction, delete_cached_prediction
+from cache.predictions import (
+    get_cached_prediction,
+    set_cached_prediction,
+    delete_cached_prediction,
+    prediction_lock_key,
+    should_refresh_early,
+)
+from cache.results import delete_cached_results, get_cached_result, set_cached_results
+from cache.singleflight import compute_with_lock
 from clients.kafka import send_moderation_request
 from db.repositories.advertisements import get_advertisement, close_advertisement, delete_moderation_results_for_item
-from db.repositories.moderation import create_moderation_task, get_moderation_result
-from ml.features import extract_features
+from db.repositories.moderation import TERMINAL_STATUSES, create_moderation_task, get_moderation_result
+from db.repositories.outbox import create_moderation_task_with_outbox
+from metrics.registry import REGISTRY
+from ml.features import extract_features, extract_features_batch
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+USE_PREDICTION_LOCK = os.getenv("USE_PREDICTION_LOCK", "false").lower() == "true"
+USE_OUTBOX = os.getenv("USE_OUTBOX", "true").lower() == "true"
+MAX_RESULT_WAIT_SECONDS = float(os.getenv("MAX_RESULT_WAIT_SECONDS", "30"))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+API_STAGE_SECONDS = REGISTRY.histogram(
+    "api_stage_seconds", "Latency of each stage of the prediction endpoints", ("endpoint", "stage"),
+)
+_predict_features = API_STAGE_SECONDS.labels("predict", "features")
+_predict_inference = API_STAGE_SECONDS.labels("predict", "inference")
+_batch_features = API_STAGE_SECONDS.labels("predict_batch", "features")
+_batch_inference = API_STAGE_SECONDS.labels("predict_batch", "inference")
+_simple_cache_lookup = API_STAGE_SECONDS.labels("simple_predict", "cache_lookup")
+_simple_ad_fetch = API_STAGE_SECONDS.labels("simple_predict", "ad_fetch")
+_simple_features = API_STAGE_SECONDS.labels("simple_predict", "features")
+_simple_inference = API_STAGE_SECONDS.labels("simple_predict", "inference")
+_simple_cache_write = API_STAGE_SECONDS.labels("simple_predict", "cache_write")
+
 
 class PredictionRequest(BaseModel):
     seller_id: int = Field(..., ge=0)
@@ -46,6 +78,14 @@ class CloseResponse(BaseModel):
     message: str
 
 
+async def _predict_probability(req: Request, model, features) -> float:
+    batcher = req.app.state.batcher
+    if batcher is None:
+        probabilities = await req.app.state.executor.predict_proba(model, features)
+        return float(probabilities[0])
+    return await batcher.predict(features)
+
+
 @router.post("/predict", response_model=PredictionResponse)
 async def predict(request: PredictionRequest, req: Request):
     model = req.app.state.model
@@ -53,19 +93,23 @@ async def predict(request: PredictionRequest, req: Request):
         logger.error("Model not available")
         raise HTTPException(status_code=503, detail="Model not available")
 
+    started = time.perf_counter()
     features = extract_features(
         request.is_verified_seller,
         request.images_qty,
         request.description,
         request.category,
     )
+    _predict_features.observe(time.perf_counter() - started)
 
     logger.info(
         f"predict request seller_id={request.seller_id} "
         f"item_id={request.item_id} features={features[0].tolist()}"
     )
 
-    probability = model.predict_proba(features)[0][1]
+    started = time.perf_counter()
+    probability = await _predict_probability(req, model, features)
+    _predict_inference.observe(time.perf_counter() - started)
     is_violation = probability >= 0.5
 
     logger.info(
@@ -77,6 +121,37 @@ async def predict(request: PredictionRequest, req: Request):
     return PredictionResponse(is_violation=is_violation, probability=probability)
 
 
+@router.post("/predict_batch", response_model=list[PredictionResponse])
+async def predict_batch(requests: list[PredictionRequest], req: Request):
+    model = req.app.state.model
+    if model is None:
+        logger.error("Model not available")
+        raise HTTPException(status_code=503, detail="Model not available")
+
+    if not requests:
+        return []
+
+    started = time.perf_counter()
+    features = extract_features_batch(
+        [r.is_verified_seller for r in requests],
+        [r.images_qty for r in requests],
+        [r.description for r in requests],
+        [r.category for r in requests],
+    )
+    extracted = time.perf_counter()
+    _batch_features.observe(extracted - started)
+
+    probabilities = await req.app.state.executor.predict_proba(model, features)
+    _batch_inference.observe(time.perf_counter() - extracted)
+
+    logger.info(f"predict_batch scored {len(requests)} items")
+
+    return [
+        PredictionResponse(is_violation=probability >= 0.5, probability=probability)
+        for probability in probabilities.tolist()
+    ]
+
+
 @router.post("/simple_predict", response_model=PredictionResponse)
 async def simple_predict(req: Request, item_id: int = Query(..., ge=0)):
     model = req.app.state.model
@@ -88,29 +163,76 @@ async def simple_predict(req: Request, item_id: int = Query(..., ge=0)):
         raise HTTPException(status_code=503, detail="Database not available")
 
     redis_client = req.app.state.redis_client
-    if redis_client is not None:
-        cached = await get_cached_prediction(redis_client, item_id)
-        if cached is not None:
-            return PredictionResponse(**cached)
-
-    ad = await get_advertisement(db_pool, item_id)
-    if ad is None:
-        raise HTTPException(status_code=404, detail="Advertisement not found")
-
-    features = extract_features(
-        ad["is_verified_seller"],
-        ad["images_qty"],
-        ad["description"],
-        ad["category"],
-    )
-
-    probability = model.predict_proba(features)[0][1]
-    is_violation = probability >= 0.5
+    local_cache = req.app.state.local_cache
+    namespace = req.app.state.cache_namespace
+    singleflight = req.app.state.singleflight
+
+    async def compute() -> dict:
+        started = time.perf_counter()
+        ad = await get_advertisement(db_pool, item_id)
+        fetched = time.perf_counter()
+        _simple_ad_fetch.observe(fetched - started)
+        if ad is None:
+            raise HTTPException(status_code=404, detail="Advertisement not found")
+
+        features = extract_features(
+            ad["is_verified_seller"],
+            ad["images_qty"],
+            ad["description"],
+            ad["category"],
+        )
+        extracted = time.perf_counter()
+        _simple_features.observe(extracted - fetched)
+
+        probability = await _predict_probability(req, model, features)
+        scored = time.perf_counter()
+        _simple_inference.observe(scored - extracted)
+        is_violation = probability >= 0.5
+
+        if redis_client is not None:
+            await set_cached_prediction(
+                redis_client, item_id, is_violation, probability, local_cache,
+                delta=scored - started,
+                namespace=namespace,
+            )
+            _simple_cache_write.observe(time.perf_counter() - scored)
+
+        return {"is_violation": is_violation, "probability": probability}
 
     if redis_client is not None:
-        await set_cached_prediction(redis_client, item_id, is_violation, float(probability))
-
-    return PredictionResponse(is_violation=is_violation, probability=probability)
+        started = time.perf_counter()
+        cached = await get_cached_prediction(redis_client, item_id, local_cache, namespace)
+        fallback_namespace = req.app.state.fallback_namespace
+        if cached is None and fallback_namespace is not None:
+            cached = await get_cached_prediction(redis_client, item_id, local_cache, fallback_namespace)
+        _simple_cache_lookup.observe(time.perf_counter() - started)
+        if cached is not None:
+            if should_refresh_early(cached):
+                singleflight.spawn(item_id, compute).add_done_callback(_log_refresh_failure)
+            return PredictionResponse(
+                is_violation=cached["is_violation"],
+                probability=cached["probability"],
+            )
+
+    if redis_client is not None and USE_PREDICTION_LOCK:
+        result = await singleflight.do(
+            item_id,
+            lambda: compute_with_lock(
+                redis_client,
+                prediction_lock_key(item_id),
+                compute,
+                lambda: get_cached_prediction(redis_client, item_id, local_cache, namespace),
+            ),
+        )
+    else:
+        result = await singleflight.do(item_id, compute)
+
+    return PredictionResponse(**result)
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Early cache refresh failed: {task.exception()}")
 
 
 @router.post("/async_predict", response_model=AsyncPredictResponse)
@@ -123,11 +245,21 @@ async def async_predict(req: Request, item_id: int = Query(..., ge=0)):
     if ad is None:
         raise HTTPException(status_code=404, detail="Advertisement not found")
 
+    if USE_OUTBOX:
+        task = await create_moderation_task_with_outbox(db_pool, item_id)
+        return AsyncPredictResponse(
+            task_id=task["id"],
+            status="pending",
+            message="Moderation request accepted",
+        )
+
     task = await create_moderation_task(db_pool, item_id)
 
     kafka_producer = req.app.state.kafka_producer
     if kafka_producer is not None:
-        await send_moderation_request(kafka_producer, item_id)
+        await send_moderation_request(
+            kafka_producer, item_id, task["id"], req.app.state.delivery_tracker,
+        )
 
     return AsyncPredictResponse(
         task_id=task["id"],
@@ -136,22 +268,101 @@ async def async_predict(req: Request, item_id: int = Query(..., ge=0)):
     )
 
 
+def _result_response(result: dict) -> ModerationResultResponse:
+    return ModerationResultResponse(
+        task_id=result["id"],
+        status=result["status"],
+        is_violation=result["is_violation"],
+        probability=result["probability"],
+    )
+
+
 @router.get("/moderation_result/{task_id}", response_model=ModerationResultResponse)
-async def moderation_result(task_id: int, req: Request):
+async def moderation_result(
+    task_id: int,
+    req: Request,
+    wait: float = Query(0, ge=0, le=MAX_RESULT_WAIT_SECONDS),
+):
     db_pool = req.app.state.db_pool
     if db_pool is None:
         raise HTTPException(status_code=503, detail="Database not available")
 
-    result = await get_moderation_result(db_pool, task_id)
+    redis_client = req.app.state.redis_client
+    local_cache = req.app.state.local_cache
+    if redis_client is not None:
+        cached = await get_cached_result(redis_client, task_id, local_cache)
+        if cached is not None:
+            return _result_response(cached)
+
+    async def fetch() -> dict:
+        result = await get_moderation_result(db_pool, task_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        if redis_client is not None and result["status"] in TERMINAL_STATUSES:
+            await set_cached_results(redis_client, [result], local_cache)
+        return result
+
+    notifier = req.app.state.result_notifier
+    if not wait or notifier is None:
+        return _result_response(await fetch())
+
+    waiter = notifier.register(task_id)
+    try:
+        result = await fetch()
+        if result["status"] in TERMINAL_STATUSES:
+            return _result_response(result)
+
+        await asyncio.wait({waiter}, timeout=wait)
+        if waiter.done() and not waiter.cancelled():
+            return _result_response(waiter.result())
+        return _result_response(result)
+    finally:
+        notifier.unregister(task_id, waiter)
+
+
+def _sse_event(event: str, result: dict) -> str:
+    return f"event: {event}\ndata: {_result_response(result).model_dump_json()}\n\n"
+
+
+@router.get("/moderation_result/{task_id}/stream")
+async def moderation_result_stream(task_id: int, req: Request):
+    db_pool = req.app.state.db_pool
+    if db_pool is None:
+        raise HTTPException(status_code=503, detail="Database not available")
+
+    notifier = req.app.state.result_notifier
+    if notifier is None:
+        raise HTTPException(status_code=503, detail="Result notifications not available")
+
+    waiter = notifier.register(task_id)
+    try:
+        result = await get_moderation_result(db_pool, task_id)
+    except Exception:
+        notifier.unregister(task_id, waiter)
+        raise
     if result is None:
+        notifier.unregister(task_id, waiter)
         raise HTTPException(status_code=404, detail="Task not found")
 
-    return ModerationResultResponse(
-        task_id=result["id"],
-        status=result["status"],
-        is_violation=result["is_violation"],
-        probability=result["probability"],
-    )
+    async def events():
+        try:
+            if result["status"] in TERMINAL_STATUSES:
+                yield _sse_event("result", result)
+                return
+
+            yield _sse_event("status", result)
+            while True:
+                await asyncio.wait({waiter}, timeout=SSE_HEARTBEAT_SECONDS)
+                if waiter.cancelled():
+                    return
+                if waiter.done():
+                    yield _sse_event("result", waiter.result())
+                    return
+                yield ": keepalive\n\n"
+        finally:
+            notifier.unregister(task_id, waiter)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 
 @router.post("/close", response_model=CloseResponse)
@@ -164,11 +375,14 @@ async def close(req: Request, item_id: int = Query(..., ge=0)):
     if ad is None:
         raise HTTPException(status_code=404, detail="Advertisement not found")
 
-    await delete_moderation_results_for_item(db_pool, item_id)
+    task_ids = await delete_moderation_results_for_item(db_pool, item_id)
     await close_advertisement(db_pool, item_id)
 
     redis_client = req.app.state.redis_client
     if redis_client is not None:
-        await delete_cached_prediction(redis_client, item_id)
+        await delete_cached_results(redis_client, task_ids, req.app.state.local_cache)
+        for namespace in (req.app.state.cache_namespace, req.app.state.fallback_namespace):
+            if namespace is not None:
+                await delete_cached_prediction(redis_client, item_id, req.app.state.local_cache, namespace)
 
     return CloseResponse(message="Advertisement closed")
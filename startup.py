@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+STARTUP_TIMEOUT_SECONDS = float(os.getenv("STARTUP_TIMEOUT_SECONDS", "5"))
+PG_STARTUP_TIMEOUT = float(os.getenv("PG_STARTUP_TIMEOUT", STARTUP_TIMEOUT_SECONDS))
+KAFKA_STARTUP_TIMEOUT = float(os.getenv("KAFKA_STARTUP_TIMEOUT", STARTUP_TIMEOUT_SECONDS))
+REDIS_STARTUP_TIMEOUT = float(os.getenv("REDIS_STARTUP_TIMEOUT", STARTUP_TIMEOUT_SECONDS))
+
+
+class StartupReport:
+    def __init__(self):
+        self.phases: dict[str, dict] = {}
+        self._started = time.perf_counter()
+        self.total_ms: float | None = None
+
+    def _record(self, name: str, started: float, status: str, error: str | None = None) -> None:
+        self.phases[name] = {
+            "status": status,
+            "ms": (time.perf_counter() - started) * 1000,
+            "error": error,
+        }
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self._record(name, started, "failed", str(e))
+            raise
+        self._record(name, started, "ok")
+
+    async def run(
+        self,
+        name: str,
+        awaitable: Awaitable,
+        timeout: float | None = None,
+        required: bool = False,
+    ):
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            self._record(name, started, "timeout", f"no response within {timeout}s")
+            if required:
+                raise
+            logger.warning(f"Startup phase {name} timed out after {timeout}s")
+            return None
+        except Exception as e:
+            self._record(name, started, "failed", str(e))
+            if required:
+                raise
+            logger.warning(f"Startup phase {name} failed: {e}")
+            return None
+
+        self._record(name, started, "ok")
+        return result
+
+    def succeeded(self, name: str) -> bool:
+        return self.phases.get(name, {}).get("status") == "ok"
+
+    def finish(self) -> None:
+        self.total_ms = (time.perf_counter() - self._started) * 1000
+        summary = ", ".join(f"{name}={phase['ms']:.0f}ms/{phase['status']}" for name, phase in self.phases.items())
+        logger.info(f"Startup finished in {self.total_ms:.0f}ms ({summary})")
+
+    def as_dict(self) -> dict:
+        return {"total_ms": self.total_ms, "phases": self.phases}
@@ -1,7 +1,16 @@
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 
-from main import app
+from main import MODEL_PATH, app
+from ml.model import save_model, train_model
+
+
+@pytest.fixture(scope="session", autouse=True)
+def model_artifact():
+    if not os.path.exists(MODEL_PATH):
+        save_model(train_model(), MODEL_PATH)
 
 
 @pytest.fixture
@@ -1,11 +1,14 @@
+import pytest
 from unittest.mock import AsyncMock, patch
 
+from clients.kafka import MESSAGE_SCHEMA_VERSION, MODERATION_TOPIC, send_moderation_request
 from main import app
 
 
 def _setup_mocks():
     app.state.db_pool = AsyncMock()
     app.state.kafka_producer = AsyncMock()
+    app.state.redis_client = None
 
 
 def test_async_predict_success(client):
@@ -18,6 +21,7 @@ def test_async_predict_success(client):
     mock_task = {"id": 42, "item_id": 1, "status": "pending"}
 
     with (
+        patch("routers.users.USE_OUTBOX", False),
         patch("routers.users.get_advertisement", new_callable=AsyncMock, return_value=mock_ad),
         patch("routers.users.create_moderation_task", new_callable=AsyncMock, return_value=mock_task),
         patch("routers.users.send_moderation_request", new_callable=AsyncMock) as mock_send,
@@ -29,7 +33,7 @@ def test_async_predict_success(client):
     assert data["task_id"] == 42
     assert data["status"] == "pending"
     assert data["message"] == "Moderation request accepted"
-    mock_send.assert_called_once()
+    mock_send.assert_called_once_with(app.state.kafka_producer, 1, 42, app.state.delivery_tracker)
 
 
 def test_async_predict_not_found(client):
@@ -85,3 +89,16 @@ def test_moderation_result_not_found(client):
         response = client.get("/moderation_result/999")
 
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_send_moderation_request_carries_task_id():
+    producer = AsyncMock()
+
+    await send_moderation_request(producer, 1, 42)
+
+    topic, message = producer.send_and_wait.call_args[0]
+    assert topic == MODERATION_TOPIC
+    assert message["schema_version"] == MESSAGE_SCHEMA_VERSION
+    assert message["item_id"] == 1
+    assert message["task_id"] == 42
@@ -0,0 +1,88 @@
+import asyncio
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from ml.batching import MicroBatcher
+
+
+def _row(value):
+    return np.array([[value, 0.0, 0.0, 0.0]])
+
+
+@pytest.fixture
+def predict_fn():
+    return AsyncMock(side_effect=lambda features: features[:, 0] / 10)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call(predict_fn):
+    batcher = MicroBatcher(predict_fn, window_ms=20, max_batch_size=64)
+    batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.predict(_row(i)) for i in range(5)))
+    finally:
+        await batcher.stop()
+
+    assert results == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.4])
+    predict_fn.assert_called_once()
+    assert predict_fn.call_args[0][0].shape == (5, 4)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_window(predict_fn):
+    batcher = MicroBatcher(predict_fn, window_ms=10_000, max_batch_size=3)
+    batcher.start()
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.predict(_row(i)) for i in range(6))),
+            timeout=1,
+        )
+    finally:
+        await batcher.stop()
+
+    assert len(results) == 6
+    assert predict_fn.call_count == 2
+    stats = batcher.stats()
+    assert stats["batches"] == 2
+    assert stats["items"] == 6
+    assert stats["max_batch_size_seen"] == 3
+    assert stats["avg_batch_size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_prediction_error_propagates_to_every_waiter():
+    batcher = MicroBatcher(AsyncMock(side_effect=ValueError("boom")), window_ms=5)
+    batcher.start()
+    try:
+        results = await asyncio.gather(
+            batcher.predict(_row(1)), batcher.predict(_row(2)),
+            return_exceptions=True,
+        )
+    finally:
+        await batcher.stop()
+
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_batcher_stats_endpoint(client):
+    client.post(
+        "/predict",
+        json={
+            "seller_id": 1,
+            "is_verified_seller": False,
+            "item_id": 100,
+            "name": "Test Item",
+            "description": "Short",
+            "category": 5,
+            "images_qty": 0,
+        },
+    )
+
+    response = client.get("/stats/batcher")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"] >= 1
+    assert data["max_queue_wait_ms"] >= 0
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from workers.bulk_scoring import score_range, split_id_range
+
+
+def test_split_id_range_covers_range_without_overlap():
+    ranges = split_id_range(1, 10, 3)
+
+    assert ranges == [(0, 4), (4, 7), (7, 10)]
+
+
+def test_split_id_range_caps_parts_at_range_size():
+    assert split_id_range(5, 6, 4) == [(4, 5), (5, 6)]
+
+
+@pytest.mark.asyncio
+async def test_score_range_pages_by_keyset_and_copies_results():
+    pages = [
+        [
+            {"id": 3, "is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5},
+            {"id": 7, "is_verified_seller": True, "images_qty": 10, "description": "Long " * 50, "category": 1},
+        ],
+        [
+            {"id": 9, "is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5},
+        ],
+        [],
+    ]
+    model = MagicMock()
+    model.predict_proba.side_effect = [np.array([[0.2, 0.8], [0.9, 0.1]]), np.array([[0.4, 0.6]])]
+
+    with (
+        patch("workers.bulk_scoring.get_advertisements_page", new_callable=AsyncMock, side_effect=pages) as mock_page,
+        patch("workers.bulk_scoring.copy_moderation_results", new_callable=AsyncMock) as mock_copy,
+    ):
+        stats = await score_range(None, model, 0, 10, chunk_size=2)
+
+    assert [call[0][1:] for call in mock_page.call_args_list] == [(0, 10, 2), (7, 10, 2), (9, 10, 2)]
+    assert stats["items"] == 3
+    assert stats["last_id"] == 9
+
+    records = mock_copy.call_args_list[0][0][1]
+    assert [r[:4] for r in records] == [
+        (3, "completed", True, pytest.approx(0.8)),
+        (7, "completed", False, pytest.approx(0.1)),
+    ]
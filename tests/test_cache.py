@@ -1,12 +1,21 @@
+import asyncio
+import time
+
 import pytest
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
+from cache.codecs import decode_value
+from cache.local import LocalCache
 from cache.predictions import (
     get_cached_prediction,
     set_cached_prediction,
     delete_cached_prediction,
+    listen_for_invalidations,
     _cache_key,
+    INVALIDATION_CHANNEL,
     PREDICTION_TTL,
+    PREDICTION_TTL_JITTER,
+    should_refresh_early,
 )
 
 
@@ -46,7 +55,7 @@ async def test_set_cached_prediction(mock_redis):
     mock_redis.set.assert_called_once()
     call_args = mock_redis.set.call_args
     assert call_args[0][0] == "prediction:1"
-    assert call_args[1]["ex"] == PREDICTION_TTL
+    assert PREDICTION_TTL * (1 - PREDICTION_TTL_JITTER) <= call_args[1]["ex"] <= PREDICTION_TTL
 
 
 @pytest.mark.asyncio
@@ -56,13 +65,109 @@ async def test_delete_cached_prediction(mock_redis):
     mock_redis.delete.assert_called_once_with("prediction:1")
 
 
+@pytest.mark.asyncio
+async def test_set_cached_prediction_stores_cost_and_expiry(mock_redis):
+    before = time.time()
+
+    await set_cached_prediction(mock_redis, 1, True, 0.9, delta=0.02)
+
+    stored = decode_value(mock_redis.set.call_args[0][1])
+    assert stored["delta"] == pytest.approx(0.02)
+    assert before + mock_redis.set.call_args[1]["ex"] <= stored["expiry"] <= time.time() + PREDICTION_TTL
+
+
+def test_should_refresh_early_ignores_entries_without_metadata():
+    assert should_refresh_early({"is_violation": True, "probability": 0.9}) is False
+
+
+def test_should_refresh_early_near_expiry():
+    cached = {"is_violation": True, "probability": 0.9, "delta": 0.05}
+
+    cached["expiry"] = time.time() + 3600
+    assert should_refresh_early(cached) is False
+
+    cached["expiry"] = time.time() - 1
+    assert should_refresh_early(cached) is True
+
+    cached["expiry"] = time.time() + 0.05
+    with patch("cache.predictions.random.random", return_value=0.9):
+        assert should_refresh_early(cached) is True
+    with patch("cache.predictions.random.random", return_value=0.0):
+        assert should_refresh_early(cached) is False
+
+
+@pytest.mark.asyncio
+async def test_delete_cached_prediction_publishes_invalidation(mock_redis):
+    await delete_cached_prediction(mock_redis, 1)
+
+    mock_redis.publish.assert_called_once_with(INVALIDATION_CHANNEL, "prediction:1")
+
+
+@pytest.mark.asyncio
+async def test_local_tier_hit_skips_redis(mock_redis):
+    local = LocalCache()
+    mock_redis.get.return_value = '{"is_violation": true, "probability": 0.9}'
+
+    first = await get_cached_prediction(mock_redis, 1, local)
+    second = await get_cached_prediction(mock_redis, 1, local)
+
+    assert first == second
+    mock_redis.get.assert_called_once_with("prediction:1")
+    assert local.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_set_and_delete_update_local_tier(mock_redis):
+    local = LocalCache()
+
+    await set_cached_prediction(mock_redis, 1, True, 0.9, local)
+    cached = await get_cached_prediction(mock_redis, 1, local)
+    assert cached["is_violation"] is True
+    assert cached["probability"] == 0.9
+    mock_redis.get.assert_not_called()
+
+    await delete_cached_prediction(mock_redis, 1, local)
+    mock_redis.get.return_value = None
+    assert await get_cached_prediction(mock_redis, 1, local) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidation_listener_drops_local_entries():
+    local = LocalCache()
+    received = asyncio.Event()
+
+    class FakePubSub:
+        async def subscribe(self, channel):
+            assert channel == INVALIDATION_CHANNEL
+
+        async def listen(self):
+            yield {"type": "subscribe", "data": 1}
+            local.set("prediction:1", {"is_violation": True, "probability": 0.9})
+            yield {"type": "message", "data": b"prediction:1"}
+            received.set()
+            await asyncio.Event().wait()
+
+        async def aclose(self):
+            pass
+
+    client = MagicMock()
+    client.pubsub.return_value = FakePubSub()
+
+    task = asyncio.create_task(listen_for_invalidations(client, local))
+    await asyncio.wait_for(received.wait(), timeout=1)
+    task.cancel()
+
+    assert local.get("prediction:1") is None
+    assert local.stats()["invalidations"] == 1
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_cache_roundtrip_integration():
     import redis.asyncio as redis
 
     try:
-        client = redis.from_url("redis://localhost:6379/0", decode_responses=True)
+        client = redis.from_url("redis://localhost:6379/0")
         await client.ping()
     except Exception:
         pytest.skip("Redis not available")
@@ -87,7 +192,7 @@ async def test_cache_ttl_is_set_integration():
     import redis.asyncio as redis
 
     try:
-        client = redis.from_url("redis://localhost:6379/0", decode_responses=True)
+        client = redis.from_url("redis://localhost:6379/0")
         await client.ping()
     except Exception:
         pytest.skip("Redis not available")
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from cache.codecs import BinaryCodec, JsonCodec, decode_value, get_codec
+
+VALUE = {"is_violation": True, "probability": 0.8712345678901234, "delta": 0.0125, "expiry": 1790000000.123}
+
+
+def test_binary_roundtrip():
+    codec = BinaryCodec()
+
+    data = codec.encode(VALUE)
+    decoded = codec.decode(data)
+
+    assert len(data) == 22
+    assert decoded["is_violation"] is True
+    assert decoded["probability"] == VALUE["probability"]
+    assert decoded["expiry"] == VALUE["expiry"]
+    assert decoded["delta"] == pytest.approx(VALUE["delta"])
+
+
+def test_binary_is_smaller_than_json():
+    assert len(BinaryCodec().encode(VALUE)) < len(JsonCodec().encode(VALUE))
+
+
+def test_binary_defaults_missing_metadata():
+    decoded = BinaryCodec().decode(BinaryCodec().encode({"is_violation": False, "probability": 0.25}))
+
+    assert decoded == {"is_violation": False, "probability": 0.25, "delta": 0.0, "expiry": 0.0}
+
+
+@pytest.mark.parametrize("data", [
+    '{"is_violation": true, "probability": 0.9}',
+    b'{"is_violation": true, "probability": 0.9}',
+])
+def test_decode_value_reads_legacy_json(data):
+    assert decode_value(data) == {"is_violation": True, "probability": 0.9}
+
+
+def test_decode_value_detects_binary():
+    assert decode_value(BinaryCodec().encode(VALUE))["probability"] == VALUE["probability"]
+
+
+def test_decode_value_reads_json_codec_output():
+    assert decode_value(JsonCodec().encode(VALUE)) == json.loads(json.dumps(VALUE))
+
+
+def test_get_codec_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_codec("msgpack")
@@ -2,8 +2,13 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from contextlib import asynccontextmanager
 
-from db.repositories.users import create_user, get_user
-from db.repositories.advertisements import create_advertisement, get_advertisement
+from db.repositories.users import create_user, create_users_bulk, get_user
+from db.repositories.advertisements import (
+    create_advertisement,
+    create_advertisements_bulk,
+    get_advertisement,
+    get_advertisements,
+)
 
 
 @pytest.fixture
@@ -15,7 +20,12 @@ def mock_pool():
     async def acquire():
         yield conn
 
+    @asynccontextmanager
+    async def transaction():
+        yield
+
     pool.acquire = acquire
+    conn.transaction = transaction
     return pool, conn
 
 
@@ -114,3 +124,48 @@ async def test_get_advertisement_not_found(mock_pool):
     result = await get_advertisement(pool, 999)
 
     assert result is None
+
+
+@pytest.mark.asyncio
+async def test_get_advertisements(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [
+        {"id": 1, "seller_id": 1, "is_verified_seller": False},
+        {"id": 2, "seller_id": 1, "is_verified_seller": False},
+    ]
+
+    result = await get_advertisements(pool, [1, 2, 3])
+
+    assert set(result) == {1, 2}
+    assert result[2]["id"] == 2
+    conn.fetch.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_create_users_bulk(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [{"id": 6, "n": 2}, {"id": 5, "n": 1}]
+
+    result = await create_users_bulk(pool, [("Alice", True), ("Bob", False)])
+
+    assert result == [5, 6]
+    args = conn.fetch.call_args[0]
+    assert args[1] == ["Alice", "Bob"]
+    assert args[2] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_create_advertisements_bulk_chunks_in_one_transaction(mock_pool, monkeypatch):
+    pool, conn = mock_pool
+    monkeypatch.setattr("db.repositories.advertisements.BULK_INSERT_CHUNK_SIZE", 2)
+    conn.fetch.side_effect = [[{"id": 2, "n": 2}, {"id": 1, "n": 1}], [{"id": 3, "n": 1}]]
+
+    result = await create_advertisements_bulk(pool, [
+        (1, "Ad 1", "Desc", 1, 0),
+        (1, "Ad 2", "Desc", 2, 1),
+        (2, "Ad 3", "Desc", 3, 2),
+    ])
+
+    assert result == [1, 2, 3]
+    assert conn.fetch.call_count == 2
+    assert conn.fetch.call_args_list[1][0][1] == [2]
@@ -1,8 +1,17 @@
+import numpy as np
 import pytest
 import asyncpg
+from unittest.mock import MagicMock
 
-from db.repositories.users import create_user, get_user
-from db.repositories.advertisements import create_advertisement, get_advertisement, close_advertisement
+from db.repositories.users import create_user, create_users_bulk, get_user
+from db.repositories.advertisements import (
+    create_advertisement,
+    create_advertisements_bulk,
+    get_advertisement,
+    close_advertisement,
+)
+from db.repositories.moderation import update_moderation_results
+from workers.bulk_scoring import score_range
 
 
 @pytest.fixture
@@ -54,3 +63,53 @@ async def test_advertisement_create_and_close(db_pool):
 
     async with db_pool.acquire() as conn:
         await conn.execute("DELETE FROM users WHERE id = $1", user["id"])
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bulk_ingestion_returns_ids_in_input_order(db_pool):
+    user_ids = await create_users_bulk(db_pool, [("BulkUser1", True), ("BulkUser2", False)])
+    assert len(user_ids) == 2
+
+    ad_ids = await create_advertisements_bulk(db_pool, [
+        (user_ids[0], "BulkAd1", "Desc", 1, 0),
+        (user_ids[1], "BulkAd2", "Desc", 2, 3),
+    ])
+    assert len(ad_ids) == 2
+
+    second = await get_advertisement(db_pool, ad_ids[1])
+    assert second["name"] == "BulkAd2"
+    assert second["is_verified_seller"] is False
+
+    async with db_pool.acquire() as conn:
+        await conn.execute("DELETE FROM advertisements WHERE id = ANY($1::int[])", ad_ids)
+        await conn.execute("DELETE FROM users WHERE id = ANY($1::int[])", user_ids)
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_bulk_scoring_copies_results(db_pool):
+    user = await create_user(db_pool, "BulkScoringUser", True)
+    ad = await create_advertisement(db_pool, user["id"], "BulkScoringAd", "Desc", 1, 2)
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.3, 0.7]])
+
+    stats = await score_range(db_pool, model, ad["id"] - 1, ad["id"])
+    assert stats["items"] == 1
+
+    async with db_pool.acquire() as conn:
+        row = await conn.fetchrow(
+            "SELECT id, status, is_violation, processed_at FROM moderation_results WHERE item_id = $1",
+            ad["id"],
+        )
+    assert row["status"] == "completed"
+    assert row["is_violation"] is True
+    assert row["processed_at"] is not None
+
+    updated = await update_moderation_results(db_pool, [(row["id"], "failed", None, None, "rescored")])
+    assert updated == [row["id"]]
+
+    async with db_pool.acquire() as conn:
+        await conn.execute("DELETE FROM moderation_results WHERE item_id = $1", ad["id"])
+        await conn.execute("DELETE FROM advertisements WHERE id = $1", ad["id"])
+        await conn.execute("DELETE FROM users WHERE id = $1", user["id"])
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from ml.executor import InferenceExecutor
+from ml.features import extract_features_batch
+from ml.model import save_model, train_model
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+@pytest.fixture
+def features():
+    return extract_features_batch(
+        [False, True, False],
+        [0, 10, 5],
+        ["Short", "Long description " * 30, "Medium"],
+        [5, 3, 50],
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["inline", "thread"])
+async def test_executor_matches_model(mode, model, features):
+    executor = InferenceExecutor(mode, max_workers=2)
+    try:
+        probabilities = await executor.predict_proba(model, features)
+    finally:
+        executor.shutdown()
+
+    np.testing.assert_array_equal(probabilities, model.predict_proba(features)[:, 1])
+    stats = executor.stats()
+    assert stats["calls"] == 1
+    assert stats["rows"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["max_queue_depth"] == 1
+
+
+@pytest.mark.asyncio
+async def test_process_executor_uses_preloaded_model(model, features, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_model(model, path)
+
+    executor = InferenceExecutor("process", max_workers=1, model_path=path, scorer="numpy")
+    try:
+        probabilities = await executor.predict_proba(None, features)
+        start_method = executor._pool._mp_context.get_start_method()
+    finally:
+        executor.shutdown()
+
+    np.testing.assert_array_equal(probabilities, model.predict_proba(features)[:, 1])
+    assert start_method == "spawn"
+
+
+def test_executor_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        InferenceExecutor("gpu")
+
+
+def test_executor_stats_endpoint(client):
+    response = client.get("/stats/executor")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["mode"] in ("inline", "thread", "process")
+    assert data["queue_depth"] == 0
@@ -0,0 +1,73 @@
+import asyncpg
+from unittest.mock import AsyncMock, patch
+
+from main import app
+
+
+def _setup_mocks():
+    app.state.db_pool = AsyncMock()
+
+
+def test_bulk_create_users(client):
+    _setup_mocks()
+    users = [{"name": "Alice", "is_verified_seller": True}, {"name": "Bob"}]
+
+    with patch("routers.ingest.create_users_bulk", new_callable=AsyncMock, return_value=[7, 8]) as mock_create:
+        response = client.post("/users/bulk", json=users)
+
+    assert response.status_code == 200
+    assert response.json() == {"ids": [7, 8]}
+    assert mock_create.call_args[0][1] == [("Alice", True), ("Bob", False)]
+
+
+def test_bulk_create_advertisements(client):
+    _setup_mocks()
+    ads = [
+        {"seller_id": 1, "name": "Ad 1", "description": "Desc", "category": 2, "images_qty": 3},
+        {"seller_id": 1, "name": "Ad 2", "description": "Desc", "category": 4},
+    ]
+
+    with patch("routers.ingest.create_advertisements_bulk", new_callable=AsyncMock, return_value=[10, 11]) as mock_create:
+        response = client.post("/advertisements/bulk", json=ads)
+
+    assert response.status_code == 200
+    assert response.json() == {"ids": [10, 11]}
+    assert mock_create.call_args[0][1] == [(1, "Ad 1", "Desc", 2, 3), (1, "Ad 2", "Desc", 4, 0)]
+
+
+def test_bulk_create_advertisements_unknown_seller(client):
+    _setup_mocks()
+    ads = [{"seller_id": 999, "name": "Ad", "description": "Desc", "category": 2}]
+
+    with patch(
+        "routers.ingest.create_advertisements_bulk",
+        new_callable=AsyncMock,
+        side_effect=asyncpg.ForeignKeyViolationError("fk"),
+    ):
+        response = client.post("/advertisements/bulk", json=ads)
+
+    assert response.status_code == 422
+
+
+def test_bulk_create_empty(client):
+    _setup_mocks()
+    with patch("routers.ingest.create_users_bulk", new_callable=AsyncMock) as mock_create:
+        response = client.post("/users/bulk", json=[])
+
+    assert response.json() == {"ids": []}
+    mock_create.assert_not_called()
+
+
+def test_bulk_create_too_many_rows(client):
+    _setup_mocks()
+    with patch("routers.ingest.MAX_BULK_ROWS", 1):
+        response = client.post("/users/bulk", json=[{"name": "A"}, {"name": "B"}])
+
+    assert response.status_code == 413
+
+
+def test_bulk_create_validation_error(client):
+    _setup_mocks()
+    response = client.post("/advertisements/bulk", json=[{"seller_id": -1, "name": "Ad", "description": "D", "category": 1}])
+
+    assert response.status_code == 422
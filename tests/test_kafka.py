@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from clients.kafka import DLQ_TOPIC, MODERATION_TOPIC, DeliveryTracker, create_kafka_producer, send_moderation_request
+from main import _save_failed_deliveries
+
+
+def _producer(*results):
+    producer = MagicMock()
+    futures = []
+    for result in results:
+        future = asyncio.get_running_loop().create_future()
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        futures.append(future)
+    producer.send = AsyncMock(side_effect=futures)
+    producer.send_and_wait = AsyncMock()
+    return producer
+
+
+@pytest.mark.asyncio
+async def test_send_without_tracker_waits_for_delivery():
+    producer = _producer()
+
+    await send_moderation_request(producer, 1, 42)
+
+    producer.send_and_wait.assert_called_once()
+    producer.send.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_tracked_send_does_not_wait_for_delivery():
+    producer = MagicMock()
+    future = asyncio.get_running_loop().create_future()
+    producer.send = AsyncMock(return_value=future)
+    tracker = DeliveryTracker()
+
+    await send_moderation_request(producer, 1, 42, tracker)
+
+    assert tracker.stats()["in_flight"] == 1
+    future.set_result(None)
+    await tracker.drain()
+    assert tracker.stats()["delivered"] == 1
+    assert tracker.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_delivery_is_queued_and_resent():
+    producer = _producer(RuntimeError("broker down"), None)
+    tracker = DeliveryTracker()
+
+    await send_moderation_request(producer, 1, 42, tracker)
+    await tracker.drain()
+    await asyncio.sleep(0)
+
+    stats = tracker.stats()
+    assert stats["failures"] == 1
+    assert stats["awaiting_resend"] == 1
+
+    assert await tracker.resend_failed(producer) == 1
+    await tracker.drain()
+    await asyncio.sleep(0)
+
+    stats = tracker.stats()
+    assert stats["awaiting_resend"] == 0
+    assert stats["delivered"] == 1
+    assert stats["resent"] == 1
+    topic, message = producer.send.call_args[0]
+    assert topic == MODERATION_TOPIC
+    assert message["task_id"] == 42
+
+
+@pytest.mark.asyncio
+async def test_full_resend_queue_counts_evictions():
+    producer = _producer(*[RuntimeError("broker down")] * 3)
+    tracker = DeliveryTracker(max_failed=2)
+
+    for task_id in (1, 2, 3):
+        await send_moderation_request(producer, task_id, task_id, tracker)
+    await tracker.drain()
+    await asyncio.sleep(0)
+
+    stats = tracker.stats()
+    assert stats["failures"] == 3
+    assert stats["awaiting_resend"] == 2
+    assert stats["dropped"] == 1
+    assert [message["task_id"] for _, message, _ in tracker.take_failed()] == [2, 3]
+    assert tracker.stats()["awaiting_resend"] == 0
+
+
+@pytest.mark.asyncio
+async def test_undelivered_moderation_requests_saved_to_outbox_at_shutdown():
+    tracker = DeliveryTracker()
+    tracker.failed.append((MODERATION_TOPIC, {"item_id": 1, "task_id": 42}, "broker down"))
+    tracker.failed.append((DLQ_TOPIC, {"original_message": {}}, "broker down"))
+    pool = object()
+
+    with patch("main.enqueue_outbox", new_callable=AsyncMock, return_value=1) as mock_enqueue:
+        await _save_failed_deliveries(tracker, pool)
+
+    mock_enqueue.assert_called_once_with(pool, [(42, 1)])
+    assert tracker.stats()["awaiting_resend"] == 0
+
+
+@pytest.mark.asyncio
+async def test_producer_does_not_linger_by_default():
+    with patch("clients.kafka.AIOKafkaProducer") as mock_producer_class:
+        mock_producer_class.return_value.start = AsyncMock()
+        await create_kafka_producer()
+        await create_kafka_producer(5)
+
+    assert [call.kwargs["linger_ms"] for call in mock_producer_class.call_args_list] == [0, 5]
+
+
+def test_kafka_stats_disabled_in_wait_mode(client):
+    client.app.state.delivery_tracker = None
+
+    response = client.get("/stats/kafka")
+
+    assert response.status_code == 404
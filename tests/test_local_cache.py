@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from cache.local import LocalCache
+
+
+def test_get_returns_stored_value():
+    cache = LocalCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LocalCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entry_is_a_miss():
+    cache = LocalCache(maxsize=10, ttl=5)
+    with patch("cache.local.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("cache.local.time.monotonic", return_value=106.0):
+        assert cache.get("a") is None
+
+    assert len(cache) == 0
+    assert cache.stats()["expirations"] == 1
+
+
+def test_delete_counts_invalidations():
+    cache = LocalCache()
+    cache.set("a", 1)
+    cache.delete("a")
+    cache.delete("missing")
+
+    assert cache.get("a") is None
+    assert cache.stats()["invalidations"] == 1
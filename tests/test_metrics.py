@@ -0,0 +1,109 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from db.connection import DB_POOL_ACQUIRE_SECONDS, InstrumentedPool
+from metrics.registry import Registry, timed
+
+
+def test_counter_and_gauge_render():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    inflight = registry.gauge("inflight", "In flight")
+
+    requests.labels("/predict").inc()
+    requests.labels("/predict").inc(2)
+    requests.labels('say "hi"').inc()
+    inflight.labels().set(3)
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/predict"} 3.0' in text
+    assert 'requests_total{route="say \\"hi\\""} 1.0' in text
+    assert "inflight 3.0" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    child = latency.labels()
+    for value in (0.05, 0.5, 0.7, 5.0):
+        child.observe(value)
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+    assert "latency_seconds_sum 6.25" in text
+
+
+def test_labels_are_validated():
+    registry = Registry()
+    family = registry.counter("errors_total", "Errors", ("kind",))
+
+    with pytest.raises(ValueError):
+        family.labels()
+    with pytest.raises(ValueError):
+        registry.counter("errors_total", "Errors again")
+    assert family.labels(1) is family.labels("1")
+
+
+@pytest.mark.asyncio
+async def test_timed_records_under_function_name():
+    registry = Registry()
+    family = registry.histogram("query_seconds", "Query", ("function",))
+
+    @timed(family)
+    async def get_thing(value):
+        return value * 2
+
+    assert await get_thing(21) == 42
+    assert family.labels("get_thing").count == 1
+
+
+@pytest.mark.asyncio
+async def test_instrumented_pool_times_acquire_and_delegates():
+    conn = AsyncMock()
+    raw_pool = MagicMock()
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    raw_pool.acquire = acquire
+    raw_pool.get_size.return_value = 10
+    pool = InstrumentedPool(raw_pool)
+    acquire_seconds = DB_POOL_ACQUIRE_SECONDS.labels()
+    before = acquire_seconds.count
+
+    async with pool.acquire() as acquired:
+        assert acquired is conn
+
+    assert acquire_seconds.count == before + 1
+    assert pool.get_size() == 10
+
+
+def test_metrics_endpoint_exposes_stage_timings(client):
+    client.post(
+        "/predict",
+        json={
+            "seller_id": 1,
+            "is_verified_seller": False,
+            "item_id": 100,
+            "name": "Test Item",
+            "description": "Short",
+            "category": 5,
+            "images_qty": 0,
+        },
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'api_stage_seconds_count{endpoint="predict",stage="inference"}' in response.text
+    assert "# TYPE db_query_seconds histogram" in response.text
+    assert "# TYPE cache_requests_total counter" in response.text
+    assert "# TYPE kafka_send_seconds histogram" in response.text
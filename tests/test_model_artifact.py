@@ -0,0 +1,110 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from ml.executor import InferenceExecutor
+from ml.model import (
+    ARTIFACT_HEADER,
+    LinearScorer,
+    export_model_artifact,
+    load_model,
+    model_fingerprint,
+    train_model,
+)
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+@pytest.fixture
+def artifact(model, tmp_path):
+    path = str(tmp_path / "model_artifact")
+    export_model_artifact(model, path)
+    return path
+
+
+def test_artifact_matches_sklearn(model, artifact):
+    scorer = load_model(artifact)
+    features = np.random.default_rng(0).random((32, 4))
+
+    assert isinstance(scorer, LinearScorer)
+    np.testing.assert_allclose(scorer.predict_proba(features), model.predict_proba(features))
+    assert model_fingerprint(scorer) == model_fingerprint(model)
+
+
+def test_artifact_weights_are_memory_mapped(artifact):
+    scorer = load_model(artifact)
+
+    assert isinstance(scorer.coef_.base, np.memmap)
+    assert not scorer.coef_.flags.writeable
+
+
+def test_export_replaces_existing_artifact(model, artifact):
+    export_model_artifact(LinearScorer(model.coef_ * 2, model.intercept_, model.classes_), artifact)
+
+    np.testing.assert_allclose(load_model(artifact).coef_, model.coef_ * 2)
+    assert os.path.islink(artifact)
+    assert not any(entry.endswith(".tmp") for entry in os.listdir(os.path.dirname(artifact)))
+
+
+def test_export_switches_versions_atomically_and_keeps_previous(model, artifact):
+    first = os.path.realpath(artifact)
+    loaded = load_model(artifact)
+
+    export_model_artifact(LinearScorer(model.coef_ * 2, model.intercept_, model.classes_), artifact)
+    second = os.path.realpath(artifact)
+    export_model_artifact(LinearScorer(model.coef_ * 3, model.intercept_, model.classes_), artifact)
+
+    assert len({first, second, os.path.realpath(artifact)}) == 3
+    assert not os.path.exists(first)
+    assert os.path.isdir(second)
+    np.testing.assert_allclose(loaded.coef_, model.coef_)
+    np.testing.assert_allclose(load_model(artifact).coef_, model.coef_ * 3)
+
+
+def test_export_replaces_plain_directory_artifact(model, tmp_path):
+    path = str(tmp_path / "model_artifact")
+    os.makedirs(path)
+
+    export_model_artifact(model, path)
+
+    assert os.path.islink(path)
+    np.testing.assert_allclose(load_model(path).coef_, model.coef_)
+
+
+def test_export_keeps_unrelated_sibling_directories(model, artifact):
+    backup = f"{artifact}.bak"
+    os.makedirs(backup)
+
+    export_model_artifact(LinearScorer(model.coef_ * 2, model.intercept_, model.classes_), artifact)
+    export_model_artifact(LinearScorer(model.coef_ * 3, model.intercept_, model.classes_), artifact)
+
+    assert os.path.isdir(backup)
+
+
+def test_unknown_artifact_version_rejected(artifact):
+    header_path = os.path.join(artifact, ARTIFACT_HEADER)
+    with open(header_path) as f:
+        header = json.load(f)
+    header["version"] = 99
+    with open(header_path, "w") as f:
+        json.dump(header, f)
+
+    with pytest.raises(ValueError, match="Unsupported"):
+        load_model(artifact)
+
+
+@pytest.mark.asyncio
+async def test_process_executor_loads_artifact(model, artifact):
+    features = np.random.default_rng(1).random((4, 4))
+    executor = InferenceExecutor("process", max_workers=1, model_path=artifact, scorer="numpy")
+    try:
+        probabilities = await executor.predict_proba(None, features)
+    finally:
+        executor.shutdown()
+
+    np.testing.assert_allclose(probabilities, model.predict_proba(features)[:, 1])
@@ -0,0 +1,133 @@
+import os
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from main import _swap_model, app
+from ml.executor import InferenceExecutor, _process_initargs
+from ml.model import LinearScorer, export_model_artifact, load_model, model_fingerprint, save_model, train_model
+from ml.reload import CANARY_FEATURES, ModelHandle, ModelWatcher, local_model_version, validate_model
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+def _shifted(model, factor):
+    return LinearScorer(model.coef_ * factor, model.intercept_, model.classes_)
+
+
+def test_validate_model_accepts_trained_model(model):
+    validate_model(model)
+
+
+def test_validate_model_rejects_nan_probabilities():
+    broken = MagicMock()
+    broken.predict_proba.return_value = np.full((CANARY_FEATURES.shape[0], 2), np.nan)
+
+    with pytest.raises(ValueError, match="non-finite"):
+        validate_model(broken)
+
+
+def test_local_version_changes_when_model_rewritten(model, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_model(model, path)
+    before = local_model_version(path, version_file=None)
+
+    save_model(_shifted(model, 2), path)
+    os.utime(path, ns=(1, 1))
+
+    assert local_model_version(path, version_file=None) != before
+    assert local_model_version(str(tmp_path / "missing.pkl"), version_file=None) is None
+
+
+def test_version_file_takes_precedence(tmp_path):
+    version_file = tmp_path / "VERSION"
+    version_file.write_text("7\n")
+
+    assert local_model_version("model.pkl", version_file=str(version_file)) == "7"
+
+
+@pytest.mark.asyncio
+async def test_watcher_swaps_on_new_version(model):
+    handle = ModelHandle(model, "1")
+    versions = iter(["1", "2"])
+    new_model = _shifted(model, 2)
+    watcher = ModelWatcher(lambda: next(versions), lambda: new_model, handle.swap, version="1")
+
+    assert await watcher.check() is False
+    assert await watcher.check() is True
+
+    assert handle.current is new_model
+    assert handle.version == "2"
+    stats = watcher.stats()
+    assert stats["swaps"] == 1
+    assert stats["last_swap_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_watcher_rejects_invalid_model_once(model):
+    handle = ModelHandle(model, "1")
+    broken = MagicMock()
+    broken.predict_proba.return_value = np.zeros((1, 3))
+    load = MagicMock(return_value=broken)
+    watcher = ModelWatcher(lambda: "2", load, handle.swap, version="1")
+
+    assert await watcher.check() is False
+    assert await watcher.check() is False
+
+    assert handle.current is model
+    load.assert_called_once()
+    assert watcher.stats()["failures"] == 1
+
+
+@pytest.fixture
+def app_state(client):
+    names = ("model", "model_version", "redis_client", "cache_namespace", "executor")
+    saved = {name: getattr(app.state, name) for name in names}
+    yield app.state
+    for name, value in saved.items():
+        setattr(app.state, name, value)
+
+
+@pytest.mark.asyncio
+async def test_process_executor_serves_the_swapped_model(model, tmp_path):
+    path = str(tmp_path / "model.pkl")
+    save_model(model, path)
+    new_model = _shifted(model, 3)
+    executor = InferenceExecutor("process", max_workers=1, model_path=path, scorer="numpy")
+    try:
+        executor.reload(new_model)
+        probabilities = await executor.predict_proba(None, CANARY_FEATURES)
+        assert executor._pool._mp_context.get_start_method() == "spawn"
+    finally:
+        executor.shutdown()
+
+    np.testing.assert_allclose(probabilities, new_model.predict_proba(CANARY_FEATURES)[:, 1])
+
+
+def test_process_initargs_pin_the_validated_model(model, tmp_path):
+    path = str(tmp_path / "model_artifact")
+    export_model_artifact(model, path)
+    loaded = load_model(path)
+
+    assert _process_initargs(path, "numpy", loaded) == (os.path.realpath(path), "numpy", None)
+    assert _process_initargs("model.pkl", "sklearn", model) == ("model.pkl", "sklearn", model)
+    assert _process_initargs("model.pkl", "sklearn") == ("model.pkl", "sklearn", None)
+
+
+def test_app_swaps_model_and_cache_namespace(client, app_state, model):
+    app_state.redis_client = None
+    new_model = _shifted(model, 3)
+    watcher = ModelWatcher(
+        lambda: "next", lambda: new_model, lambda m, v: _swap_model(app, m, v), version="current",
+    )
+
+    assert client.portal.call(watcher.check) is True
+
+    assert app.state.model is new_model
+    response = client.get("/stats/model")
+    assert response.json()["version"] == "next"
+    assert response.json()["fingerprint"] == model_fingerprint(new_model)
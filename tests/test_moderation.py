@@ -4,9 +4,12 @@ from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 
 from db.repositories.moderation import (
+    copy_moderation_results,
     create_moderation_task,
     get_moderation_result,
+    get_pending_tasks,
     update_moderation_result,
+    update_moderation_results,
 )
 
 
@@ -68,11 +71,67 @@ async def test_get_moderation_result_not_found(mock_pool):
 @pytest.mark.asyncio
 async def test_update_moderation_result(mock_pool):
     pool, conn = mock_pool
+    conn.fetch.return_value = [{"id": 1}]
 
-    await update_moderation_result(pool, 1, "completed", is_violation=True, probability=0.9)
+    assert await update_moderation_result(pool, 1, "completed", is_violation=True, probability=0.9) == [1]
 
-    conn.execute.assert_called_once()
-    args = conn.execute.call_args[0]
+    conn.fetch.assert_called_once()
+    args = conn.fetch.call_args[0]
     assert args[1] == "completed"
     assert args[2] is True
     assert args[3] == 0.9
+    assert "pg_notify" in args[0]
+
+
+@pytest.mark.asyncio
+async def test_get_pending_tasks(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [{"item_id": 10, "id": 4}, {"item_id": 10, "id": 1}, {"item_id": 11, "id": 3}]
+
+    result = await get_pending_tasks(pool, [10, 11, 12])
+
+    assert result == {10: [4, 1], 11: [3]}
+    assert conn.fetch.call_args[0][1] == [10, 11, 12]
+
+
+@pytest.mark.asyncio
+async def test_update_moderation_results(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [{"id": 2}]
+
+    updated = await update_moderation_results(pool, [
+        (1, "completed", True, 0.9, None),
+        (2, "failed", None, None, "Advertisement not found"),
+    ])
+
+    assert updated == [2]
+    conn.fetch.assert_called_once()
+    args = conn.fetch.call_args[0]
+    assert args[1] == [1, 2]
+    assert args[2] == ["completed", "failed"]
+    assert args[3] == [True, None]
+    assert args[5] == [None, "Advertisement not found"]
+    assert "pg_notify" in args[0]
+
+
+@pytest.mark.asyncio
+async def test_update_moderation_results_empty(mock_pool):
+    pool, conn = mock_pool
+
+    assert await update_moderation_results(pool, []) == []
+
+    conn.fetch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_copy_moderation_results(mock_pool):
+    pool, conn = mock_pool
+    records = [(10, "completed", True, 0.9, datetime.now(timezone.utc))]
+
+    await copy_moderation_results(pool, records)
+
+    conn.copy_records_to_table.assert_called_once()
+    args, kwargs = conn.copy_records_to_table.call_args
+    assert args[0] == "moderation_results"
+    assert kwargs["records"] == records
+    assert kwargs["columns"][0] == "item_id"
@@ -0,0 +1,153 @@
+import fnmatch
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+
+from cache.codecs import decode_value
+from cache.namespaces import (
+    ACTIVE_NAMESPACE_KEY,
+    reclaim_namespace,
+    switch_namespace,
+    warm_namespace,
+)
+from cache.predictions import _cache_key
+from ml.executor import InferenceExecutor
+from ml.model import LinearScorer, model_fingerprint, train_model
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            self.client.data[key] = value
+
+
+class FakeRedis:
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def unlink(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+
+def _ads(item_ids):
+    return {
+        item_id: {
+            "id": item_id, "is_verified_seller": False, "images_qty": 0,
+            "description": "Short", "category": 5,
+        }
+        for item_id in item_ids
+    }
+
+
+def test_cache_key_includes_namespace():
+    assert _cache_key(42, "abc") == "prediction:abc:42"
+
+
+def test_model_fingerprint_tracks_weights():
+    model = train_model()
+
+    assert model_fingerprint(model) == model_fingerprint(train_model())
+    assert model_fingerprint(LinearScorer.from_model(model)) == model_fingerprint(model)
+
+    model.coef_ = model.coef_ + 1e-9
+    assert model_fingerprint(model) != model_fingerprint(train_model())
+
+
+@pytest.mark.asyncio
+async def test_warm_namespace_rescores_hot_keys_with_new_model():
+    client = FakeRedis({_cache_key(i, "old"): b"stale" for i in (1, 2, 3)})
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.3, 0.7], [0.4, 0.6]])
+
+    async def get_advertisements(pool, item_ids):
+        return _ads([i for i in item_ids if i != 3])
+
+    with patch("cache.namespaces.get_advertisements", side_effect=get_advertisements):
+        warmed = await warm_namespace(client, None, model, InferenceExecutor(), "old", "new")
+
+    assert warmed == 2
+    assert decode_value(client.data[_cache_key(1, "new")])["probability"] == pytest.approx(0.7)
+    assert _cache_key(3, "new") not in client.data
+
+
+@pytest.mark.asyncio
+async def test_reclaim_namespace_unlinks_only_that_namespace():
+    client = FakeRedis({
+        _cache_key(1, "old"): b"x",
+        _cache_key(2, "old"): b"x",
+        _cache_key(1, "new"): b"x",
+    })
+
+    reclaimed = await reclaim_namespace(client, "old", chunk_size=1, pause=0)
+
+    assert reclaimed == 2
+    assert list(client.data) == [_cache_key(1, "new")]
+
+
+@pytest.mark.asyncio
+async def test_switch_namespace_warms_then_activates():
+    client = FakeRedis({ACTIVE_NAMESPACE_KEY: b"old", _cache_key(1, "old"): b"stale"})
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.3, 0.7]])
+    state = SimpleNamespace(
+        redis_client=client, db_pool=object(), model=model, executor=InferenceExecutor(),
+        cache_namespace="new", fallback_namespace=None,
+    )
+
+    fallback_during_warm = []
+
+    async def get_advertisements(pool, item_ids):
+        fallback_during_warm.append(state.fallback_namespace)
+        return _ads(item_ids)
+
+    with patch("cache.namespaces.get_advertisements", side_effect=get_advertisements):
+        await switch_namespace(state)
+
+    assert fallback_during_warm == ["old"]
+    assert state.fallback_namespace is None
+    assert client.data[ACTIVE_NAMESPACE_KEY] == "new"
+    assert _cache_key(1, "new") in client.data
+    assert _cache_key(1, "old") in client.data
+
+
+@pytest.mark.asyncio
+async def test_switch_namespace_reclaims_previous_only_when_asked():
+    client = FakeRedis({ACTIVE_NAMESPACE_KEY: b"old", _cache_key(1, "old"): b"stale"})
+    state = SimpleNamespace(
+        redis_client=client, db_pool=None, model=None, executor=None,
+        cache_namespace="new", fallback_namespace=None,
+    )
+
+    await switch_namespace(state, reclaim=True)
+
+    assert client.data[ACTIVE_NAMESPACE_KEY] == "new"
+    assert _cache_key(1, "old") not in client.data
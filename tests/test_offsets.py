@@ -0,0 +1,174 @@
+import asyncio
+from collections import namedtuple
+
+import pytest
+from aiokafka import TopicPartition
+from unittest.mock import patch
+
+from workers.moderation_worker import _consume_concurrent
+from workers.offsets import OffsetTracker
+
+Message = namedtuple("Message", ["topic", "partition", "offset", "value"])
+
+TP0 = TopicPartition("moderation", 0)
+TP1 = TopicPartition("moderation", 1)
+
+
+class InMemoryConsumer:
+    def __init__(self, messages):
+        self.messages = messages
+        self.commits = []
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for msg in self.messages:
+            yield msg
+
+    async def commit(self, offsets):
+        self.commits.append(dict(offsets))
+
+
+def test_tracker_commits_only_contiguous_offsets():
+    tracker = OffsetTracker()
+    for offset in range(10, 14):
+        tracker.track(TP0, offset)
+
+    tracker.complete(TP0, 11)
+    tracker.complete(TP0, 12)
+    assert tracker.committable() == {TP0: 10}
+
+    tracker.complete(TP0, 10)
+    assert tracker.committable() == {TP0: 13}
+
+    tracker.mark_committed({TP0: 13})
+    assert tracker.committable() == {}
+
+    tracker.complete(TP0, 13)
+    assert tracker.committable() == {TP0: 14}
+
+
+def test_tracker_partitions_are_independent():
+    tracker = OffsetTracker()
+    tracker.track(TP0, 0)
+    tracker.track(TP1, 5)
+    tracker.track(TP1, 6)
+
+    tracker.complete(TP1, 6)
+    tracker.complete(TP0, 0)
+
+    assert tracker.committable() == {TP0: 1, TP1: 5}
+
+    tracker.forget([TP1])
+    assert tracker.committable() == {TP0: 1}
+
+
+def test_tracker_ignores_completions_for_revoked_partitions():
+    tracker = OffsetTracker()
+    tracker.track(TP0, 0)
+    tracker.forget([TP0])
+
+    tracker.complete(TP0, 0)
+    assert tracker.committable() == {}
+
+    tracker.track(TP0, 5)
+    tracker.complete(TP0, 0)
+    tracker.complete(TP0, 5)
+    assert tracker.committable() == {TP0: 6}
+
+
+@pytest.mark.asyncio
+async def test_consume_concurrent_processes_in_parallel_and_commits_in_order():
+    messages = [
+        Message("moderation", i % 2, i // 2, {"item_id": i})
+        for i in range(8)
+    ]
+    consumer = InMemoryConsumer(messages)
+
+    active = 0
+    peak = 0
+    finished = []
+
+    async def fake_process(value, *args, **kwargs):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01 * (8 - value["item_id"]))
+        active -= 1
+        finished.append(value["item_id"])
+
+    with patch("workers.moderation_worker._handle_message", side_effect=fake_process):
+        await _consume_concurrent(
+            consumer, None, None, None, None,
+            concurrency=4, commit_interval=0.005,
+        )
+
+    assert peak == 4
+    assert sorted(finished) == list(range(8))
+    assert finished != list(range(8))
+    assert consumer.commits[-1] == {TP0: 4, TP1: 4}
+
+    last = {TP0: -1, TP1: -1}
+    for commit in consumer.commits:
+        for tp, offset in commit.items():
+            assert offset > last[tp]
+            last[tp] = offset
+
+
+@pytest.mark.asyncio
+async def test_consume_concurrent_survives_revoke_with_messages_in_flight():
+    tracker = OffsetTracker()
+    revoked = asyncio.Event()
+
+    class RevokingConsumer(InMemoryConsumer):
+        async def _iterate(self):
+            for msg in self.messages:
+                yield msg
+                if msg.offset == 1:
+                    tracker.forget([TP0])
+                    revoked.set()
+
+    consumer = RevokingConsumer([Message("moderation", 0, offset, {"item_id": offset}) for offset in range(4)])
+    handled = []
+
+    async def fake_process(value, *args, **kwargs):
+        if value["item_id"] < 2:
+            await revoked.wait()
+        handled.append(value["item_id"])
+
+    with patch("workers.moderation_worker._handle_message", side_effect=fake_process):
+        await asyncio.wait_for(
+            _consume_concurrent(
+                consumer, None, None, None, None, tracker,
+                concurrency=2, commit_interval=0.005,
+            ),
+            timeout=1,
+        )
+
+    assert sorted(handled) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_consume_concurrent_stops_without_committing_failed_message():
+    consumer = InMemoryConsumer([Message("moderation", 0, offset, {"item_id": offset}) for offset in range(6)])
+    handled = []
+
+    async def fake_process(value, *args, **kwargs):
+        if value["item_id"] == 2:
+            raise RuntimeError("kafka down")
+        handled.append(value["item_id"])
+
+    with patch("workers.moderation_worker._handle_message", side_effect=fake_process):
+        with pytest.raises(RuntimeError, match="kafka down"):
+            await asyncio.wait_for(
+                _consume_concurrent(
+                    consumer, None, None, None, None,
+                    concurrency=1, commit_interval=0.005,
+                ),
+                timeout=1,
+            )
+
+    assert 5 not in handled
+    assert all(commit[TP0] <= 2 for commit in consumer.commits)
+    assert consumer.commits[-1] == {TP0: 2}
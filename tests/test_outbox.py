@@ -0,0 +1,129 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from clients.kafka import MODERATION_TOPIC
+from db.repositories.outbox import create_moderation_task_with_outbox, drain_outbox_batch, enqueue_outbox
+from main import app
+from workers.outbox_relay import publish_batch
+
+
+@pytest.fixture
+def mock_pool():
+    conn = AsyncMock()
+    pool = MagicMock()
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    pool.acquire = acquire
+    conn.transaction = transaction
+    return pool, conn
+
+
+@pytest.mark.asyncio
+async def test_task_and_outbox_row_written_together(mock_pool):
+    pool, conn = mock_pool
+    conn.fetchrow.return_value = {"id": 42, "item_id": 1, "status": "pending"}
+
+    task = await create_moderation_task_with_outbox(pool, 1)
+
+    assert task["id"] == 42
+    query, task_id, item_id = conn.execute.call_args[0]
+    assert "moderation_outbox" in query
+    assert (task_id, item_id) == (42, 1)
+
+
+@pytest.mark.asyncio
+async def test_enqueue_outbox_skips_deleted_tasks(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [{"id": 7}]
+
+    assert await enqueue_outbox(pool, [(42, 1), (43, 2)]) == 1
+    query, task_ids, item_ids = conn.fetch.call_args[0]
+    assert "JOIN moderation_results" in query
+    assert (task_ids, item_ids) == ([42, 43], [1, 2])
+
+
+@pytest.mark.asyncio
+async def test_drain_publishes_then_deletes(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [
+        {"id": 1, "task_id": 10, "item_id": 100},
+        {"id": 2, "task_id": 11, "item_id": 101},
+    ]
+    publish = AsyncMock()
+
+    relayed = await drain_outbox_batch(pool, publish, 500)
+
+    assert relayed == 2
+    assert "SKIP LOCKED" in conn.fetch.call_args[0][0]
+    publish.assert_called_once()
+    assert conn.execute.call_args[0][1] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_drain_keeps_rows_when_publish_fails(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = [{"id": 1, "task_id": 10, "item_id": 100}]
+
+    with pytest.raises(RuntimeError):
+        await drain_outbox_batch(pool, AsyncMock(side_effect=RuntimeError("broker down")), 500)
+
+    conn.execute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_drain_empty_outbox(mock_pool):
+    pool, conn = mock_pool
+    conn.fetch.return_value = []
+    publish = AsyncMock()
+
+    assert await drain_outbox_batch(pool, publish, 500) == 0
+    publish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_waits_for_every_delivery():
+    loop = asyncio.get_running_loop()
+    futures = [loop.create_future(), loop.create_future()]
+    for future in futures:
+        future.set_result(None)
+    producer = MagicMock()
+    producer.send = AsyncMock(side_effect=futures)
+
+    await publish_batch(producer, [{"item_id": 100, "task_id": 10}, {"item_id": 101, "task_id": 11}])
+
+    assert producer.send.call_count == 2
+    topic, message = producer.send.call_args[0]
+    assert topic == MODERATION_TOPIC
+    assert message["task_id"] == 11
+
+
+def test_async_predict_with_outbox_skips_kafka(client):
+    app.state.db_pool = AsyncMock()
+    app.state.kafka_producer = None
+    mock_ad = {"id": 1, "is_verified_seller": False}
+    mock_task = {"id": 42, "item_id": 1, "status": "pending"}
+
+    with (
+        patch("routers.users.get_advertisement", new_callable=AsyncMock, return_value=mock_ad),
+        patch(
+            "routers.users.create_moderation_task_with_outbox",
+            new_callable=AsyncMock, return_value=mock_task,
+        ) as mock_create,
+        patch("routers.users.send_moderation_request", new_callable=AsyncMock) as mock_send,
+    ):
+        response = client.post("/async_predict?item_id=1")
+
+    assert response.status_code == 200
+    assert response.json()["task_id"] == 42
+    mock_create.assert_called_once_with(app.state.db_pool, 1)
+    mock_send.assert_not_called()
@@ -0,0 +1,80 @@
+import numpy as np
+
+from main import app
+from ml.features import extract_features, extract_features_batch
+
+
+def _item(item_id, is_verified_seller, description, images_qty):
+    return {
+        "seller_id": 1,
+        "is_verified_seller": is_verified_seller,
+        "item_id": item_id,
+        "name": "Test Item",
+        "description": description,
+        "category": 5,
+        "images_qty": images_qty,
+    }
+
+
+def test_extract_features_batch_matches_single():
+    rows = [
+        (False, 0, "Short", 5),
+        (True, 10, "This is a very long description " * 20, 3),
+        (True, 3, "Medium description", 99),
+    ]
+
+    batch = extract_features_batch(*zip(*rows))
+
+    assert batch.shape == (3, 4)
+    for i, row in enumerate(rows):
+        np.testing.assert_array_equal(batch[i], extract_features(*row)[0])
+
+
+def test_extract_features_batch_empty():
+    assert extract_features_batch([], [], [], []).shape == (0, 4)
+
+
+def test_predict_batch_preserves_order(client):
+    items = [
+        _item(1, False, "Short", 0),
+        _item(2, True, "This is a very long description " * 20, 10),
+        _item(3, False, "Short", 0),
+    ]
+
+    response = client.post("/predict_batch", json=items)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 3
+    assert data[1]["is_violation"] is False
+    assert data[0] == data[2]
+
+    for item, result in zip(items, data):
+        single = client.post("/predict", json=item).json()
+        assert result["probability"] == single["probability"]
+        assert result["is_violation"] == single["is_violation"]
+
+
+def test_predict_batch_empty(client):
+    response = client.post("/predict_batch", json=[])
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_predict_batch_validation_error(client):
+    items = [_item(1, False, "Short", 0), _item(-1, False, "Short", 0)]
+
+    response = client.post("/predict_batch", json=items)
+
+    assert response.status_code == 422
+
+
+def test_predict_batch_model_unavailable(client):
+    original_model = app.state.model
+    app.state.model = None
+    try:
+        response = client.post("/predict_batch", json=[_item(1, False, "Short", 0)])
+        assert response.status_code == 503
+    finally:
+        app.state.model = original_model
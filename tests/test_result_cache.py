@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from cache.local import LocalCache
+from cache.predictions import INVALIDATION_CHANNEL
+from cache.results import delete_cached_results, get_cached_result, result_key, set_cached_results
+from main import app
+from workers.moderation_worker import process_message
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value))
+
+    async def execute(self):
+        for key, value in self.commands:
+            self.client.data[key] = value
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.published = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+COMPLETED = {"id": 42, "item_id": 1, "status": "completed", "is_violation": True, "probability": 0.87}
+
+
+@pytest.mark.asyncio
+async def test_terminal_results_round_trip():
+    client = FakeRedis()
+
+    await set_cached_results(client, [COMPLETED])
+    cached = await get_cached_result(client, 42)
+
+    assert cached == {"id": 42, "status": "completed", "is_violation": True, "probability": 0.87}
+
+
+@pytest.mark.asyncio
+async def test_pending_results_are_not_cached():
+    client = FakeRedis()
+
+    await set_cached_results(client, [{**COMPLETED, "status": "pending"}])
+
+    assert client.data == {}
+
+
+@pytest.mark.asyncio
+async def test_local_tier_served_before_redis():
+    client = FakeRedis()
+    local = LocalCache()
+    await set_cached_results(client, [COMPLETED], local)
+    client.data.clear()
+
+    assert (await get_cached_result(client, 42, local))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_delete_publishes_invalidation():
+    client = FakeRedis()
+    local = LocalCache()
+    await set_cached_results(client, [COMPLETED], local)
+
+    await delete_cached_results(client, [42], local)
+
+    assert await get_cached_result(client, 42, local) is None
+    assert client.published == [(INVALIDATION_CHANNEL, result_key(42))]
+
+
+@pytest.mark.asyncio
+async def test_worker_caches_completed_result():
+    client = FakeRedis()
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    ad = {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}
+
+    with (
+        patch("workers.moderation_worker.get_advertisement", new_callable=AsyncMock, return_value=ad),
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock, return_value=[42]),
+    ):
+        await process_message({"item_id": 1, "task_id": 42}, AsyncMock(), model, AsyncMock(), redis_client=client)
+
+    cached = await get_cached_result(client, 42)
+    assert cached["status"] == "completed"
+    assert cached["probability"] == pytest.approx(0.8)
+
+
+@pytest.mark.asyncio
+async def test_worker_does_not_cache_result_for_deleted_task():
+    client = FakeRedis()
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    ad = {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}
+
+    with (
+        patch("workers.moderation_worker.get_advertisement", new_callable=AsyncMock, return_value=ad),
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock, return_value=[]),
+    ):
+        await process_message({"item_id": 1, "task_id": 42}, AsyncMock(), model, AsyncMock(), redis_client=client)
+
+    assert await get_cached_result(client, 42) is None
+
+
+def test_endpoint_reads_through_cache(client):
+    app.state.db_pool = AsyncMock()
+    app.state.redis_client = FakeRedis()
+    app.state.result_notifier = None
+
+    with patch(
+        "routers.users.get_moderation_result", new_callable=AsyncMock, return_value=COMPLETED,
+    ) as mock_get:
+        first = client.get("/moderation_result/42")
+        second = client.get("/moderation_result/42")
+
+    assert first.json() == second.json()
+    assert second.json()["probability"] == 0.87
+    mock_get.assert_called_once()
+
+
+def test_close_invalidates_cached_results(client):
+    app.state.db_pool = AsyncMock()
+    app.state.redis_client = AsyncMock()
+    ad = {"id": 1, "is_verified_seller": False}
+
+    with (
+        patch("routers.users.get_advertisement", new_callable=AsyncMock, return_value=ad),
+        patch("routers.users.delete_moderation_results_for_item", new_callable=AsyncMock, return_value=[42, 43]),
+        patch("routers.users.close_advertisement", new_callable=AsyncMock),
+        patch("routers.users.delete_cached_prediction", new_callable=AsyncMock),
+        patch("routers.users.delete_cached_results", new_callable=AsyncMock) as mock_delete,
+    ):
+        response = client.post("/close?item_id=1")
+
+    assert response.status_code == 200
+    mock_delete.assert_called_once_with(app.state.redis_client, [42, 43], app.state.local_cache)
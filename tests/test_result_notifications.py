@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from db.notifications import ResultNotifier
+from main import app
+
+PENDING = {"id": 42, "item_id": 1, "status": "pending", "is_violation": None, "probability": None}
+COMPLETED_PAYLOAD = json.dumps({"id": 42, "status": "completed", "is_violation": True, "probability": 0.87})
+
+
+def _notify_soon(notifier, payload=COMPLETED_PAYLOAD):
+    async def fetch(pool, task_id):
+        asyncio.get_running_loop().call_later(0.01, notifier._on_notify, None, 0, "moderation_results", payload)
+        return PENDING
+    return fetch
+
+
+@pytest.fixture
+def notifier(client):
+    app.state.db_pool = AsyncMock()
+    app.state.redis_client = None
+    notifier = ResultNotifier(MagicMock())
+    app.state.result_notifier = notifier
+    yield notifier
+    app.state.result_notifier = None
+
+
+@pytest.mark.asyncio
+async def test_notification_fans_out_to_every_waiter():
+    notifier = ResultNotifier(MagicMock())
+    first, second = notifier.register(42), notifier.register(42)
+    other = notifier.register(7)
+
+    notifier._on_notify(None, 0, "moderation_results", COMPLETED_PAYLOAD)
+
+    assert first.result()["status"] == "completed"
+    assert second.result()["probability"] == 0.87
+    assert not other.done()
+    stats = notifier.stats()
+    assert stats["delivered"] == 2
+    assert stats["waiting_tasks"] == 1
+
+
+def _listener_conn():
+    conn = AsyncMock()
+    conn.add_termination_listener = MagicMock()
+    conn.remove_termination_listener = MagicMock()
+    conn.is_closed = MagicMock(return_value=False)
+    return conn
+
+
+@pytest.mark.asyncio
+async def test_start_listens_on_one_connection():
+    conn = _listener_conn()
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value=conn)
+    pool.release = AsyncMock()
+    notifier = ResultNotifier(pool)
+
+    await notifier.start()
+    assert notifier.stats()["listening"] is True
+    waiter = notifier.register(1)
+    await notifier.stop()
+
+    conn.add_listener.assert_called_once_with("moderation_results", notifier._on_notify)
+    conn.add_termination_listener.assert_called_once_with(notifier._on_terminate)
+    pool.release.assert_called_once_with(conn)
+    assert waiter.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_lost_connection_reconnects_and_resolves_missed_results():
+    lost, fresh = _listener_conn(), _listener_conn()
+    fresh.fetch.return_value = [{"id": 42, "status": "completed", "is_violation": True, "probability": 0.87}]
+    pool = MagicMock()
+    pool.acquire = AsyncMock(side_effect=[lost, OSError("connection refused"), fresh])
+    pool.release = AsyncMock()
+    notifier = ResultNotifier(pool)
+    await notifier.start()
+    waiter = notifier.register(42)
+
+    lost.is_closed.return_value = True
+    assert notifier.stats()["listening"] is False
+
+    with patch("db.notifications.RECONNECT_INITIAL_BACKOFF_SECONDS", 0):
+        notifier._on_terminate(lost)
+        await notifier._reconnect_task
+
+    pool.release.assert_called_once_with(lost)
+    fresh.add_listener.assert_called_once_with("moderation_results", notifier._on_notify)
+    assert fresh.fetch.call_args[0][1] == [42]
+    assert waiter.result()["status"] == "completed"
+    stats = notifier.stats()
+    assert stats["listening"] is True
+    assert stats["reconnects"] == 1
+    await notifier.stop()
+
+
+def test_long_poll_returns_on_notification(client, notifier):
+    with patch("routers.users.get_moderation_result", side_effect=_notify_soon(notifier)) as mock_get:
+        response = client.get("/moderation_result/42?wait=5")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["is_violation"] is True
+    mock_get.assert_called_once()
+    assert notifier.stats()["waiters"] == 0
+
+
+def test_long_poll_times_out_with_current_state(client, notifier):
+    with patch("routers.users.get_moderation_result", new_callable=AsyncMock, return_value=PENDING):
+        response = client.get("/moderation_result/42?wait=0.05")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+    assert notifier.stats()["waiters"] == 0
+
+
+def test_long_poll_wait_is_bounded(client, notifier):
+    response = client.get("/moderation_result/42?wait=3600")
+    assert response.status_code == 422
+
+
+def test_stream_emits_status_then_result(client, notifier):
+    with patch("routers.users.get_moderation_result", side_effect=_notify_soon(notifier)):
+        response = client.get("/moderation_result/42/stream")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [line for line in response.text.splitlines() if line.startswith("event:")]
+    assert events == ["event: status", "event: result"]
+    assert '"status":"completed"' in response.text
+
+
+def test_stream_not_found(client, notifier):
+    with patch("routers.users.get_moderation_result", new_callable=AsyncMock, return_value=None):
+        response = client.get("/moderation_result/999/stream")
+
+    assert response.status_code == 404
+    assert notifier.stats()["waiters"] == 0
@@ -0,0 +1,139 @@
+import time
+from collections import namedtuple
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from workers.moderation_worker import _consume_retries, _handle_message
+from workers.retry import (
+    MAX_RETRIES,
+    NOT_BEFORE_HEADER,
+    RETRY_COUNT_HEADER,
+    RETRY_TOPICS,
+    read_retry_headers,
+    retry_delay,
+    retry_topic,
+    schedule_retry,
+)
+
+Message = namedtuple("Message", ["value", "headers", "topic"], defaults=[retry_topic(1)])
+
+
+def test_retry_topics_are_tiered_with_exponential_backoff():
+    assert RETRY_TOPICS == [retry_topic(n) for n in range(1, MAX_RETRIES)]
+    assert retry_delay(2) == retry_delay(1) * 2
+
+
+def test_read_retry_headers_defaults():
+    assert read_retry_headers(None) == (0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_schedule_retry_parks_message_with_headers():
+    producer = AsyncMock()
+    before = time.time()
+
+    await schedule_retry(producer, {"item_id": 1}, 1, "boom")
+
+    producer.send_and_wait.assert_called_once()
+    topic, value = producer.send_and_wait.call_args[0]
+    assert topic == retry_topic(1)
+    assert value == {"item_id": 1}
+    retry_count, not_before = read_retry_headers(producer.send_and_wait.call_args[1]["headers"])
+    assert retry_count == 1
+    assert not_before >= before + retry_delay(1) - 0.01
+
+
+@pytest.mark.asyncio
+async def test_failed_message_is_scheduled_for_retry_without_sleeping():
+    producer = AsyncMock()
+    with (
+        patch("workers.moderation_worker.process_message", new_callable=AsyncMock, side_effect=RuntimeError("db down")),
+        patch("workers.moderation_worker.schedule_retry", new_callable=AsyncMock) as mock_retry,
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock) as mock_dlq,
+        patch("workers.moderation_worker.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+    ):
+        await _handle_message({"item_id": 1}, AsyncMock(), MagicMock(), producer, None)
+
+    mock_retry.assert_called_once_with(producer, {"item_id": 1}, 1, "db down")
+    mock_dlq.assert_not_called()
+    mock_sleep.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_exhausted_message_goes_to_dlq():
+    pool = AsyncMock()
+    pool.fetch.return_value = [{"id": 42}]
+    with (
+        patch("workers.moderation_worker.process_message", new_callable=AsyncMock, side_effect=RuntimeError("db down")),
+        patch("workers.moderation_worker.schedule_retry", new_callable=AsyncMock) as mock_retry,
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock) as mock_update,
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock) as mock_dlq,
+    ):
+        await _handle_message({"item_id": 1}, pool, MagicMock(), AsyncMock(), None, MAX_RETRIES - 1)
+
+    mock_retry.assert_not_called()
+    assert mock_update.call_args[0][1:3] == (42, "failed")
+    mock_dlq.assert_called_once()
+    assert mock_dlq.call_args[0][3] == MAX_RETRIES
+
+
+@pytest.mark.asyncio
+async def test_retry_consumer_waits_until_due():
+    headers = [
+        (RETRY_COUNT_HEADER, b"1"),
+        (NOT_BEFORE_HEADER, f"{time.time() + 0.05:.3f}".encode()),
+    ]
+
+    events = []
+
+    class RetryConsumer:
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            yield Message({"item_id": 1}, headers)
+
+        async def commit(self):
+            events.append("commit")
+
+    started = time.monotonic()
+    with patch(
+        "workers.moderation_worker._handle_message", new_callable=AsyncMock,
+        side_effect=lambda *args: events.append("handle"),
+    ) as mock_handle:
+        await _consume_retries(RetryConsumer(), None, None, None, None)
+
+    assert time.monotonic() - started >= 0.03
+    assert mock_handle.call_args[0][5] == 1
+    assert events == ["handle", "commit"]
+
+
+@pytest.mark.asyncio
+async def test_retry_consumer_retries_same_message_when_handler_fails():
+    headers = [(RETRY_COUNT_HEADER, b"1"), (NOT_BEFORE_HEADER, b"0")]
+    events = []
+
+    class RetryConsumer:
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            yield Message({"item_id": 1}, headers)
+
+        async def commit(self):
+            events.append("commit")
+
+    def handle(*args):
+        events.append("handle")
+        if len(events) < 3:
+            raise RuntimeError("kafka down")
+
+    with (
+        patch("workers.moderation_worker._handle_message", new_callable=AsyncMock, side_effect=handle),
+        patch("workers.moderation_worker.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+    ):
+        await _consume_retries(RetryConsumer(), None, None, None, None)
+
+    assert events == ["handle", "handle", "handle", "commit"]
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.5, 1.0]
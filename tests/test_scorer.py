@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from ml.features import extract_features, extract_features_batch
+from ml.model import LinearScorer, train_model
+
+
+@pytest.fixture(scope="module")
+def model():
+    return train_model()
+
+
+def test_scorer_matches_sklearn_batch(model):
+    rng = np.random.default_rng(0)
+    n = 500
+    features = extract_features_batch(
+        rng.integers(0, 2, n).astype(bool),
+        rng.integers(0, 11, n),
+        ["x" * k for k in rng.integers(1, 1500, n)],
+        rng.integers(0, 100, n),
+    )
+
+    scorer = LinearScorer.from_model(model)
+
+    np.testing.assert_array_equal(scorer.predict_proba(features), model.predict_proba(features))
+
+
+def test_scorer_matches_sklearn_single(model):
+    features = extract_features(False, 0, "Short", 5)
+
+    scorer = LinearScorer.from_model(model)
+
+    np.testing.assert_array_equal(scorer.predict_proba(features), model.predict_proba(features))
+
+
+def test_scorer_rejects_multiclass():
+    X = np.random.default_rng(0).random((30, 4))
+    y = np.arange(30) % 3
+    model = LogisticRegression().fit(X, y)
+
+    with pytest.raises(ValueError):
+        LinearScorer.from_model(model)
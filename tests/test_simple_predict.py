@@ -1,3 +1,4 @@
+import time
 from unittest.mock import AsyncMock, patch
 
 from main import app
@@ -62,6 +63,31 @@ def test_simple_predict_cache_hit(client):
     assert data["probability"] == 0.9
 
 
+def test_simple_predict_cache_hit_refreshes_early(client):
+    cached = {"is_violation": True, "probability": 0.9, "delta": 0.01, "expiry": 0}
+    mock_ad = {
+        "id": 1, "seller_id": 1, "name": "Test",
+        "description": "Short", "category": 5, "images_qty": 0,
+        "is_verified_seller": False,
+    }
+    _setup_mocks()
+    with (
+        patch("routers.users.get_cached_prediction", new_callable=AsyncMock, return_value=cached),
+        patch("routers.users.get_advertisement", new_callable=AsyncMock, return_value=mock_ad),
+        patch("routers.users.set_cached_prediction", new_callable=AsyncMock) as mock_set,
+    ):
+        response = client.post("/simple_predict?item_id=1")
+        for _ in range(100):
+            if mock_set.called:
+                break
+            time.sleep(0.01)
+
+    assert response.status_code == 200
+    assert response.json() == {"is_violation": True, "probability": 0.9}
+    mock_set.assert_called_once()
+    assert mock_set.call_args[1]["delta"] > 0
+
+
 def test_simple_predict_not_found(client):
     _setup_mocks()
     with (
@@ -77,3 +103,15 @@ def test_simple_predict_not_found(client):
 def test_simple_predict_invalid_item_id(client):
     response = client.post("/simple_predict?item_id=-1")
     assert response.status_code == 422
+
+
+def test_cache_stats_endpoint(client):
+    _setup_mocks()
+    app.state.redis_client.info.return_value = {"evicted_keys": 0, "expired_keys": 3}
+
+    response = client.get("/stats/cache")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "hit_ratio" in data["local"]
+    assert data["redis"]["expired_keys"] == 3
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from cache.singleflight import SingleFlight, compute_with_lock
+from main import app
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    results = await asyncio.gather(*(flight.do(1, compute) for _ in range(10)))
+
+    assert results == [1] * 10
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 9}
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_key_is_released():
+    flight = SingleFlight()
+    compute = AsyncMock(side_effect=ValueError("boom"))
+
+    results = await asyncio.gather(flight.do(1, compute), flight.do(1, compute), return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    compute.assert_called_once()
+
+    compute.side_effect = None
+    compute.return_value = 5
+    assert await flight.do(1, compute) == 5
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_computation():
+    flight = SingleFlight()
+    done = asyncio.Event()
+
+    async def compute():
+        await done.wait()
+        return 1
+
+    leader = asyncio.create_task(flight.do(1, compute))
+    follower = asyncio.create_task(flight.do(1, compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    done.set()
+
+    assert await follower == 1
+
+
+@pytest.mark.asyncio
+async def test_lock_holder_computes():
+    client = FakeRedis()
+    compute = AsyncMock(return_value="value")
+
+    result = await compute_with_lock(client, "lock:1", compute, AsyncMock(return_value=None))
+
+    assert result == "value"
+    assert "lock:1" not in client.data
+
+
+@pytest.mark.asyncio
+async def test_waiter_reads_value_written_by_lock_holder():
+    client = FakeRedis()
+    client.data["lock:1"] = "other-replica"
+    compute = AsyncMock(return_value="computed")
+    get_cached = AsyncMock(side_effect=[None, "cached"])
+
+    result = await compute_with_lock(client, "lock:1", compute, get_cached, poll_interval=0.001)
+
+    assert result == "cached"
+    compute.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_waiter_takes_over_when_lock_holder_dies():
+    client = FakeRedis()
+    client.data["lock:1"] = "other-replica"
+    compute = AsyncMock(return_value="computed")
+
+    async def lock_expires():
+        await asyncio.sleep(0.01)
+        del client.data["lock:1"]
+
+    expiry = asyncio.create_task(lock_expires())
+    result = await compute_with_lock(
+        client, "lock:1", compute, AsyncMock(return_value=None), poll_interval=0.001,
+    )
+    await expiry
+
+    assert result == "computed"
+    compute.assert_called_once()
+
+
+def test_simple_predict_coalesces_concurrent_misses(client):
+    app.state.db_pool = AsyncMock()
+    app.state.redis_client = AsyncMock()
+    mock_ad = {
+        "id": 1, "seller_id": 1, "name": "Test",
+        "description": "Short", "category": 5, "images_qty": 0,
+        "is_verified_seller": False,
+    }
+
+    async def slow_get_advertisement(pool, item_id):
+        await asyncio.sleep(0.05)
+        return mock_ad
+
+    with (
+        patch("routers.users.get_cached_prediction", new_callable=AsyncMock, return_value=None),
+        patch("routers.users.get_advertisement", side_effect=slow_get_advertisement) as mock_get,
+        patch("routers.users.set_cached_prediction", new_callable=AsyncMock),
+    ):
+        async def burst():
+            from httpx import ASGITransport, AsyncClient
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+                return await asyncio.gather(*(ac.post("/simple_predict?item_id=1") for _ in range(5)))
+
+        responses = client.portal.call(burst)
+
+    assert all(r.status_code == 200 for r in responses)
+    assert mock_get.call_count == 1
@@ -0,0 +1,99 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from main import app
+from startup import StartupReport
+
+
+@pytest.mark.asyncio
+async def test_optional_phase_timeout_returns_none():
+    report = StartupReport()
+
+    result = await report.run("kafka", asyncio.sleep(10), timeout=0.01)
+
+    assert result is None
+    assert report.phases["kafka"]["status"] == "timeout"
+    assert not report.succeeded("kafka")
+
+
+@pytest.mark.asyncio
+async def test_required_phase_failure_raises():
+    async def broken():
+        raise ValueError("bad artifact")
+
+    report = StartupReport()
+
+    with pytest.raises(ValueError):
+        await report.run("model", broken(), required=True)
+    assert report.phases["model"]["error"] == "bad artifact"
+
+
+@pytest.mark.asyncio
+async def test_phases_run_concurrently():
+    report = StartupReport()
+
+    started = asyncio.get_running_loop().time()
+    await asyncio.gather(*(report.run(name, asyncio.sleep(0.05, result=name)) for name in ("a", "b", "c")))
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 0.12
+    report.finish()
+    assert report.as_dict()["total_ms"] >= max(phase["ms"] for phase in report.phases.values())
+
+
+def test_startup_report_endpoint(client):
+    response = client.get("/stats/startup")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_ms"] > 0
+    assert data["phases"]["model"]["status"] == "ok"
+    assert {"postgres", "kafka", "redis", "executor"} <= set(data["phases"])
+
+
+def test_startup_requires_trained_model():
+    with patch("main.MODEL_PATH", "missing-model.pkl"), pytest.raises(RuntimeError, match="ml.train"):
+        with TestClient(app):
+            pass
+
+
+def test_unreachable_redis_keeps_lazy_client():
+    redis_client = MagicMock()
+    redis_client.ping = AsyncMock(side_effect=ConnectionError("refused"))
+    redis_client.aclose = AsyncMock()
+
+    with (
+        patch("main.create_redis_client", new_callable=AsyncMock, return_value=redis_client),
+        TestClient(app) as client,
+    ):
+        assert client.app.state.redis_client is redis_client
+        assert client.app.state.startup_report.phases["redis"]["status"] == "failed"
+
+
+def test_failed_model_load_closes_started_clients():
+    pool, producer, redis_client = object(), AsyncMock(), AsyncMock()
+
+    with (
+        patch("main._load_versioned_model", side_effect=ValueError("bad artifact")),
+        patch("main.create_pool", new_callable=AsyncMock, return_value=pool),
+        patch("main.close_pool", new_callable=AsyncMock) as mock_close_pool,
+        patch("main.create_kafka_producer", new_callable=AsyncMock, return_value=producer),
+        patch("main.create_redis_client", new_callable=AsyncMock, return_value=redis_client),
+        pytest.raises(ValueError, match="bad artifact"),
+    ):
+        with TestClient(app):
+            pass
+
+    mock_close_pool.assert_called_once_with(pool)
+    producer.stop.assert_called_once()
+    redis_client.aclose.assert_called_once()
+
+
+def test_importing_app_does_not_import_mlflow():
+    code = "import sys, main; sys.exit('mlflow' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 0
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from cache.warmup import WARMUP_CHECKPOINT_TTL, checkpoint_key, warm_cache, warm_cache_once, warmup_lock_key
+from db.repositories.advertisements import iter_open_advertisements
+from ml.executor import InferenceExecutor
+
+
+def _ad(item_id):
+    return {
+        "id": item_id, "is_verified_seller": False, "images_qty": 0,
+        "description": "Short", "category": 5,
+    }
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.predict_proba.side_effect = lambda features: np.tile([0.3, 0.7], (features.shape[0], 1))
+    return model
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_scores_chunks_and_checkpoints(mock_model):
+    client = AsyncMock()
+    client.get.return_value = None
+
+    async def iter_ads(pool, start_after, chunk_size):
+        assert start_after == 0
+        yield [_ad(1), _ad(2)]
+        yield [_ad(5)]
+
+    with (
+        patch("cache.warmup.iter_open_advertisements", side_effect=iter_ads),
+        patch("cache.warmup.set_cached_predictions", new_callable=AsyncMock) as mock_set,
+    ):
+        stats = await warm_cache(None, client, mock_model, InferenceExecutor(), namespace="ns", chunk_size=2)
+
+    assert stats["items"] == 3
+    assert stats["last_item_id"] == 5
+    assert mock_model.predict_proba.call_count == 2
+    assert mock_set.call_count == 2
+    assert mock_set.call_args_list[0][0][1] == [(1, True, pytest.approx(0.7)), (2, True, pytest.approx(0.7))]
+    assert mock_set.call_args_list[0][1]["namespace"] == "ns"
+    client.set.assert_called_with(checkpoint_key("ns"), 5, ex=WARMUP_CHECKPOINT_TTL)
+    client.delete.assert_called_once_with(checkpoint_key("ns"))
+
+
+@pytest.mark.asyncio
+async def test_interrupted_warm_cache_keeps_checkpoint(mock_model):
+    client = AsyncMock()
+    client.get.return_value = None
+
+    async def iter_ads(pool, start_after, chunk_size):
+        yield [_ad(1)]
+        raise ConnectionError("db gone")
+
+    with (
+        patch("cache.warmup.iter_open_advertisements", side_effect=iter_ads),
+        patch("cache.warmup.set_cached_predictions", new_callable=AsyncMock),
+        pytest.raises(ConnectionError),
+    ):
+        await warm_cache(None, client, mock_model, InferenceExecutor(), namespace="ns")
+
+    client.set.assert_called_with(checkpoint_key("ns"), 1, ex=WARMUP_CHECKPOINT_TTL)
+    client.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_once_runs_on_a_single_replica(mock_model):
+    client = AsyncMock()
+    client.set.side_effect = [True, False]
+
+    with patch("cache.warmup.warm_cache", new_callable=AsyncMock, return_value={"items": 3}) as mock_warm:
+        first = await warm_cache_once(None, client, mock_model, InferenceExecutor(), namespace="ns")
+        second = await warm_cache_once(None, client, mock_model, InferenceExecutor(), namespace="ns")
+
+    assert first == {"items": 3}
+    assert second is None
+    mock_warm.assert_called_once()
+    assert client.set.call_args_list[0][0][0] == warmup_lock_key("ns")
+    assert client.set.call_args_list[0][1]["nx"] is True
+    client.eval.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_once_releases_lock_on_failure(mock_model):
+    client = AsyncMock()
+    client.set.return_value = True
+
+    with (
+        patch("cache.warmup.warm_cache", new_callable=AsyncMock, side_effect=ConnectionError("db gone")),
+        pytest.raises(ConnectionError),
+    ):
+        await warm_cache_once(None, client, mock_model, InferenceExecutor(), namespace="ns")
+
+    client.eval.assert_called_once()
+    assert client.eval.call_args[0][2] == warmup_lock_key("ns")
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_resumes_from_checkpoint(mock_model):
+    client = AsyncMock()
+    client.get.return_value = b"42"
+    seen = []
+
+    async def iter_ads(pool, start_after, chunk_size):
+        seen.append(start_after)
+        return
+        yield
+
+    with patch("cache.warmup.iter_open_advertisements", side_effect=iter_ads):
+        stats = await warm_cache(None, client, mock_model, InferenceExecutor(), namespace="ns")
+
+    assert seen == [42]
+    assert stats["items"] == 0
+    assert stats["last_item_id"] == 42
+
+
+@pytest.mark.asyncio
+async def test_iter_open_advertisements_yields_bounded_chunks():
+    rows = [_ad(i) for i in range(1, 6)]
+
+    async def cursor(query, start_after, prefetch):
+        for row in rows:
+            yield row
+
+    @asynccontextmanager
+    async def transaction():
+        yield
+
+    conn = MagicMock()
+    conn.cursor = cursor
+    conn.transaction = transaction
+    pool = MagicMock()
+
+    @asynccontextmanager
+    async def acquire():
+        yield conn
+
+    pool.acquire = acquire
+
+    chunks = [chunk async for chunk in iter_open_advertisements(pool, 0, chunk_size=2)]
+
+    assert [[ad["id"] for ad in chunk] for chunk in chunks] == [[1, 2], [3, 4], [5]]
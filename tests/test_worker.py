@@ -1,7 +1,8 @@
+import numpy as np
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from workers.moderation_worker import process_message
+from workers.moderation_worker import process_batch, process_message
 
 
 @pytest.fixture
@@ -30,7 +31,6 @@ async def test_process_message_success(mock_pool, mock_model, mock_producer):
         "description": "Short", "category": 5,
     }
 
-    import numpy as np
     mock_model.predict_proba.return_value = np.array([[0.3, 0.7]])
 
     message = {"item_id": 1, "timestamp": "2026-01-01T00:00:00Z"}
@@ -48,6 +48,27 @@ async def test_process_message_success(mock_pool, mock_model, mock_producer):
     assert call_args[1]["probability"] == pytest.approx(0.7)
 
 
+@pytest.mark.asyncio
+async def test_process_message_uses_task_id_from_message(mock_pool, mock_model, mock_producer):
+    mock_ad = {
+        "is_verified_seller": False, "images_qty": 0,
+        "description": "Short", "category": 5,
+    }
+
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7]])
+
+    message = {"schema_version": 2, "item_id": 1, "task_id": 42, "timestamp": "2026-01-01T00:00:00Z"}
+
+    with (
+        patch("workers.moderation_worker.get_advertisement", new_callable=AsyncMock, return_value=mock_ad),
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock) as mock_update,
+    ):
+        await process_message(message, mock_pool, mock_model, mock_producer)
+
+    mock_pool.fetch.assert_not_called()
+    assert mock_update.call_args[0][1] == 42
+
+
 @pytest.mark.asyncio
 async def test_process_message_ad_not_found(mock_pool, mock_model, mock_producer):
     mock_pool.fetch.return_value = [{"id": 42}]
@@ -73,3 +94,129 @@ async def test_process_message_no_pending_task(mock_pool, mock_model, mock_produ
     message = {"item_id": 1, "timestamp": "2026-01-01T00:00:00Z"}
 
     await process_message(message, mock_pool, mock_model, mock_producer)
+
+
+@pytest.mark.asyncio
+async def test_process_batch_scores_in_one_call(mock_pool, mock_model, mock_producer):
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7], [0.9, 0.1]])
+
+    ads = {
+        1: {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5},
+        2: {"is_verified_seller": True, "images_qty": 10, "description": "Long " * 50, "category": 3},
+    }
+    messages = [{"item_id": 1}, {"item_id": 2}, {"item_id": 3}, {"item_id": 4}]
+
+    with (
+        patch("workers.moderation_worker.get_pending_tasks", new_callable=AsyncMock,
+              return_value={1: [11], 2: [12], 3: [13]}),
+        patch("workers.moderation_worker.get_advertisements", new_callable=AsyncMock, return_value=ads),
+        patch("workers.moderation_worker.update_moderation_results", new_callable=AsyncMock) as mock_update,
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock) as mock_dlq,
+    ):
+        await process_batch(messages, mock_pool, mock_model, mock_producer)
+
+    mock_model.predict_proba.assert_called_once()
+    assert mock_model.predict_proba.call_args[0][0].shape == (2, 4)
+
+    mock_update.assert_called_once()
+    results = sorted(mock_update.call_args[0][1])
+    assert results[0] == (11, "completed", True, pytest.approx(0.7), None)
+    assert results[1] == (12, "completed", False, pytest.approx(0.1), None)
+    assert results[2] == (13, "failed", None, None, "Advertisement not found")
+
+    mock_dlq.assert_called_once()
+    assert mock_dlq.call_args[0][1] == {"item_id": 3}
+
+
+@pytest.mark.asyncio
+async def test_process_batch_deduplicates_items(mock_pool, mock_model, mock_producer):
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7]])
+
+    ads = {1: {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}}
+
+    with (
+        patch("workers.moderation_worker.get_pending_tasks", new_callable=AsyncMock, return_value={1: [11]}),
+        patch("workers.moderation_worker.get_advertisements", new_callable=AsyncMock, return_value=ads),
+        patch("workers.moderation_worker.update_moderation_results", new_callable=AsyncMock) as mock_update,
+    ):
+        await process_batch([{"item_id": 1}, {"item_id": 1}], mock_pool, mock_model, mock_producer)
+
+    assert len(mock_update.call_args[0][1]) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_batch_skips_lookup_for_messages_with_task_id(mock_pool, mock_model, mock_producer):
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7], [0.9, 0.1]])
+
+    ads = {
+        1: {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5},
+        2: {"is_verified_seller": True, "images_qty": 10, "description": "Long " * 50, "category": 3},
+    }
+    messages = [{"item_id": 1, "task_id": 11}, {"item_id": 2}]
+
+    with (
+        patch("workers.moderation_worker.get_pending_tasks", new_callable=AsyncMock,
+              return_value={2: [12]}) as mock_pending,
+        patch("workers.moderation_worker.get_advertisements", new_callable=AsyncMock, return_value=ads),
+        patch("workers.moderation_worker.update_moderation_results", new_callable=AsyncMock) as mock_update,
+    ):
+        await process_batch(messages, mock_pool, mock_model, mock_producer)
+
+    assert mock_pending.call_args[0][1] == [2]
+    assert sorted(r[0] for r in mock_update.call_args[0][1]) == [11, 12]
+
+
+@pytest.mark.asyncio
+async def test_process_batch_resolves_one_pending_task_per_legacy_message(mock_pool, mock_model, mock_producer):
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7]] * 3)
+
+    ads = {1: {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}}
+    messages = [{"item_id": 1, "task_id": 13}, {"item_id": 1}, {"item_id": 1}]
+
+    with (
+        patch("workers.moderation_worker.get_pending_tasks", new_callable=AsyncMock,
+              return_value={1: [13, 12, 11]}),
+        patch("workers.moderation_worker.get_advertisements", new_callable=AsyncMock, return_value=ads),
+        patch("workers.moderation_worker.update_moderation_results", new_callable=AsyncMock) as mock_update,
+    ):
+        await process_batch(messages, mock_pool, mock_model, mock_producer)
+
+    assert sorted(r[0] for r in mock_update.call_args[0][1]) == [11, 12, 13]
+
+
+@pytest.mark.asyncio
+async def test_process_message_rejects_unknown_schema_version(mock_pool, mock_model, mock_producer):
+    message = {"schema_version": 99, "item_id": 1, "task_id": 42}
+
+    with (
+        patch("workers.moderation_worker.get_advertisement", new_callable=AsyncMock) as mock_get,
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock) as mock_update,
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock) as mock_dlq,
+    ):
+        await process_message(message, mock_pool, mock_model, mock_producer)
+
+    mock_get.assert_not_called()
+    mock_update.assert_not_called()
+    assert mock_dlq.call_args[0][1:] == (message, "Unsupported schema_version 99")
+
+
+@pytest.mark.asyncio
+async def test_process_batch_routes_unknown_schema_version_to_dlq(mock_pool, mock_model, mock_producer):
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7]])
+
+    ads = {1: {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}}
+    unknown = {"schema_version": 3, "item_id": 1, "task_id": 12}
+
+    with (
+        patch("workers.moderation_worker.get_advertisements", new_callable=AsyncMock, return_value=ads),
+        patch("workers.moderation_worker.update_moderation_results", new_callable=AsyncMock) as mock_update,
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock) as mock_dlq,
+    ):
+        await process_batch(
+            [{"schema_version": 2, "item_id": 1, "task_id": 11}, unknown],
+            mock_pool, mock_model, mock_producer,
+        )
+
+    assert [r[0] for r in mock_update.call_args[0][1]] == [11]
+    mock_dlq.assert_called_once()
+    assert mock_dlq.call_args[0][1] == unknown
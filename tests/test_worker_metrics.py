@@ -0,0 +1,138 @@
+import asyncio
+
+import numpy as np
+import pytest
+from aiokafka import TopicPartition
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from metrics.server import start_metrics_server
+from workers.metrics import (
+    CONSUMER_LAG,
+    WORKER_DLQ,
+    WORKER_MESSAGES,
+    WORKER_RETRIES,
+    WORKER_STAGE_SECONDS,
+    report_stats,
+    update_consumer_lag,
+)
+from workers.moderation_worker import MAX_RETRIES, _handle_message, process_message, run_worker
+
+
+def _consumer(partitions):
+    consumer = MagicMock()
+    consumer.assignment.return_value = set(partitions)
+    consumer.highwater.side_effect = lambda tp: partitions[tp][0]
+    consumer.position = AsyncMock(side_effect=lambda tp: partitions[tp][1])
+    return consumer
+
+
+@pytest.mark.asyncio
+async def test_consumer_lag_per_partition():
+    consumer = _consumer({
+        TopicPartition("moderation", 0): (120, 100),
+        TopicPartition("moderation", 1): (50, 50),
+        TopicPartition("moderation", 2): (None, 0),
+    })
+
+    assert await update_consumer_lag(consumer) == 20
+    assert CONSUMER_LAG.labels("moderation", 0).value == 20
+    assert CONSUMER_LAG.labels("moderation", 1).value == 0
+    assert ("moderation", "2") not in CONSUMER_LAG.children()
+
+
+@pytest.mark.asyncio
+async def test_report_stats_drops_revoked_partitions():
+    CONSUMER_LAG.labels("moderation", 7).set(5)
+    consumer = _consumer({TopicPartition("moderation", 0): (10, 4)})
+
+    task = asyncio.create_task(report_stats([consumer], interval=0.01))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    assert ("moderation", "7") not in CONSUMER_LAG.children()
+    assert CONSUMER_LAG.labels("moderation", 0).value == 6
+
+
+@pytest.mark.asyncio
+async def test_process_message_records_stages_and_outcome():
+    model = MagicMock()
+    model.predict_proba.return_value = np.array([[0.2, 0.8]])
+    ad = {"is_verified_seller": False, "images_qty": 0, "description": "Short", "category": 5}
+    completed = WORKER_MESSAGES.labels("completed")
+    inference = WORKER_STAGE_SECONDS.labels("message", "inference")
+    before = completed.value, inference.count
+
+    with (
+        patch("workers.moderation_worker.get_advertisement", new_callable=AsyncMock, return_value=ad),
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock),
+    ):
+        await process_message({"item_id": 1, "task_id": 42}, AsyncMock(), model, AsyncMock())
+
+    assert completed.value == before[0] + 1
+    assert inference.count == before[1] + 1
+    assert WORKER_STAGE_SECONDS.labels("message", "update").count >= 1
+
+
+@pytest.mark.asyncio
+async def test_retries_and_dlq_are_counted():
+    retries = WORKER_RETRIES.labels()
+    dlq = WORKER_DLQ.labels("retries_exhausted")
+    before = retries.value, dlq.value
+
+    with (
+        patch("workers.moderation_worker.process_message", new_callable=AsyncMock, side_effect=RuntimeError("db down")),
+        patch("workers.moderation_worker.schedule_retry", new_callable=AsyncMock),
+        patch("workers.moderation_worker.update_moderation_result", new_callable=AsyncMock),
+        patch("workers.moderation_worker.send_to_dlq", new_callable=AsyncMock),
+    ):
+        await _handle_message({"item_id": 1, "task_id": 42}, AsyncMock(), MagicMock(), AsyncMock(), None)
+        await _handle_message({"item_id": 1, "task_id": 42}, AsyncMock(), MagicMock(), AsyncMock(), None, MAX_RETRIES - 1)
+
+    assert retries.value == before[0] + 1
+    assert dlq.value == before[1] + 1
+
+
+async def _get(port: int, path: str) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+@pytest.mark.asyncio
+async def test_metrics_server_serves_registry():
+    server = await start_metrics_server("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        metrics = await _get(port, "/metrics")
+        missing = await _get(port, "/other")
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    assert metrics.startswith(b"HTTP/1.1 200 OK")
+    assert b"# TYPE worker_messages_total counter" in metrics
+    assert b"# TYPE worker_consumer_lag gauge" in metrics
+    assert b"# TYPE worker_batch_messages histogram" in metrics
+    assert missing.startswith(b"HTTP/1.1 404")
+
+
+@pytest.mark.asyncio
+async def test_metrics_port_in_use_fails_before_resources_are_opened():
+    with (
+        patch("workers.moderation_worker.WORKER_METRICS_PORT", 9464),
+        patch(
+            "workers.moderation_worker.start_metrics_server", new_callable=AsyncMock,
+            side_effect=OSError("address already in use"),
+        ),
+        patch("workers.moderation_worker.create_pool", new_callable=AsyncMock) as mock_pool,
+        patch("workers.moderation_worker._create_consumer") as mock_consumer,
+        pytest.raises(OSError),
+    ):
+        await run_worker()
+
+    mock_pool.assert_not_called()
+    mock_consumer.assert_not_called()
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+from db.connection import close_pool, create_pool
+from db.repositories.advertisements import get_advertisement_id_range, get_advertisements_page
+from db.repositories.moderation import copy_moderation_results
+from ml.features import extract_features_from_ads
+from ml.model import LinearScorer, load_model
+
+logger = logging.getLogger(__name__)
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "5000"))
+BULK_LOG_EVERY_SECONDS = 5
+
+
+def split_id_range(min_id: int, max_id: int, parts: int) -> list[tuple[int, int]]:
+    start_after = min_id - 1
+    total = max_id - start_after
+    parts = max(1, min(parts, total))
+    step, remainder = divmod(total, parts)
+
+    ranges = []
+    for i in range(parts):
+        end_id = start_after + step + (1 if i < remainder else 0)
+        ranges.append((start_after, end_id))
+        start_after = end_id
+    return ranges
+
+
+async def score_range(
+    pool,
+    model,
+    start_after: int,
+    end_id: int,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> dict:
+    started = time.perf_counter()
+    last_report = started
+    items = 0
+    last_id = start_after
+
+    while True:
+        ads = await get_advertisements_page(pool, last_id, end_id, chunk_size)
+        if not ads:
+            break
+
+        probabilities = model.predict_proba(extract_features_from_ads(ads))[:, 1]
+        processed_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        await copy_moderation_results(pool, [
+            (ad["id"], "completed", probability >= 0.5, probability, processed_at)
+            for ad, probability in zip(ads, probabilities.tolist())
+        ])
+
+        items += len(ads)
+        last_id = ads[-1]["id"]
+
+        now = time.perf_counter()
+        if now - last_report >= BULK_LOG_EVERY_SECONDS:
+            logger.info(
+                f"Range ({start_after}, {end_id}]: {items} items, last_id={last_id}, "
+                f"{items / (now - started):.0f} items/s"
+            )
+            last_report = now
+
+    elapsed = time.perf_counter() - started
+    return {
+        "start_after": start_after,
+        "end_id": end_id,
+        "items": items,
+        "last_id": last_id,
+        "seconds": elapsed,
+    }
+
+
+def _load_scorer(model_path: str, scorer: str):
+    model = load_model(model_path)
+    return LinearScorer.from_model(model) if scorer == "numpy" else model
+
+
+async def _score_range_with_pool(model_path: str, scorer: str, start_after: int, end_id: int, chunk_size: int) -> dict:
+    model = _load_scorer(model_path, scorer)
+    pool = await create_pool()
+    try:
+        return await score_range(pool, model, start_after, end_id, chunk_size)
+    finally:
+        await close_pool(pool)
+
+
+def _run_range(args: tuple[str, str, int, int, int]) -> dict:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    return asyncio.run(_score_range_with_pool(*args))
+
+
+async def _resolve_range(args: argparse.Namespace) -> tuple[int, int] | None:
+    if args.start_after is not None and args.end_id is not None:
+        return args.start_after + 1, args.end_id
+
+    pool = await create_pool()
+    try:
+        id_range = await get_advertisement_id_range(pool)
+    finally:
+        await close_pool(pool)
+    if id_range is None:
+        return None
+
+    min_id, max_id = id_range
+    if args.start_after is not None:
+        min_id = args.start_after + 1
+    if args.end_id is not None:
+        max_id = args.end_id
+    return min_id, max_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score advertisements into moderation_results")
+    parser.add_argument("--model-path", default="model.pkl")
+    parser.add_argument("--scorer", choices=["sklearn", "numpy"], default="numpy")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    parser.add_argument("--start-after", type=int, default=None, help="only ids greater than this")
+    parser.add_argument("--end-id", type=int, default=None, help="only ids up to and including this")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    id_range = asyncio.run(_resolve_range(args))
+    if id_range is None or id_range[0] > id_range[1]:
+        logger.info("No advertisements to score")
+        return
+
+    ranges = split_id_range(*id_range, args.processes)
+    jobs = [(args.model_path, args.scorer, start_after, end_id, args.chunk_size) for start_after, end_id in ranges]
+
+    started = time.perf_counter()
+    if len(jobs) == 1:
+        results = [_run_range(jobs[0])]
+    else:
+        with ProcessPoolExecutor(len(jobs), mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(_run_range, jobs))
+    elapsed = time.perf_counter() - started
+
+    items = sum(result["items"] for result in results)
+    for result in results:
+        logger.info(
+            f"Range ({result['start_after']}, {result['end_id']}]: {result['items']} items "
+            f"in {result['seconds']:.1f}s"
+        )
+    logger.info(
+        f"Scored {items} advertisements with {len(jobs)} processes in {elapsed:.1f}s "
+        f"({items / elapsed if elapsed else 0:.0f} items/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
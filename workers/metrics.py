@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import os
+import time
+
+from aiokafka import AIOKafkaConsumer
+
+from metrics.registry import REGISTRY, MetricFamily
+
+logger = logging.getLogger(__name__)
+
+WORKER_METRICS_HOST = os.getenv("WORKER_METRICS_HOST", "0.0.0.0")
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+WORKER_STATS_INTERVAL = float(os.getenv("WORKER_STATS_INTERVAL", "30"))
+
+WORKER_MESSAGES = REGISTRY.counter(
+    "worker_messages_total", "Moderation messages handled, by outcome", ("outcome",),
+)
+WORKER_RETRIES = REGISTRY.counter("worker_retries_total", "Messages re-published to a retry topic")
+WORKER_DLQ = REGISTRY.counter("worker_dlq_total", "Messages sent to the dead-letter topic", ("reason",))
+WORKER_STAGE_SECONDS = REGISTRY.histogram(
+    "worker_stage_seconds", "Latency of each moderation processing stage", ("mode", "stage"),
+)
+WORKER_BATCH_MESSAGES = REGISTRY.histogram(
+    "worker_batch_messages", "Messages per processed batch", buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+CONSUMER_LAG = REGISTRY.gauge(
+    "worker_consumer_lag", "Messages between the consumer position and the high watermark", ("topic", "partition"),
+)
+
+
+def total(family: MetricFamily) -> float:
+    return sum(child.value for child in family.children().values())
+
+
+async def update_consumer_lag(consumer: AIOKafkaConsumer) -> int:
+    lag_total = 0
+    for tp in consumer.assignment():
+        highwater = consumer.highwater(tp)
+        if highwater is None:
+            continue
+        try:
+            position = await consumer.position(tp)
+        except Exception as e:
+            logger.debug(f"Position unavailable for {tp}: {e}")
+            continue
+        lag = max(highwater - position, 0)
+        CONSUMER_LAG.labels(tp.topic, tp.partition).set(lag)
+        lag_total += lag
+    return lag_total
+
+
+async def report_stats(consumers: list[AIOKafkaConsumer], interval: float = WORKER_STATS_INTERVAL) -> None:
+    last_count = total(WORKER_MESSAGES)
+    last_time = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+
+        assigned = set()
+        lag = 0
+        for consumer in consumers:
+            lag += await update_consumer_lag(consumer)
+            assigned.update((tp.topic, str(tp.partition)) for tp in consumer.assignment())
+        for topic, partition in CONSUMER_LAG.children():
+            if (topic, partition) not in assigned:
+                CONSUMER_LAG.remove(topic, partition)
+
+        count = total(WORKER_MESSAGES)
+        now = time.monotonic()
+        rate = (count - last_count) / (now - last_time)
+        last_count, last_time = count, now
+
+        logger.info(
+            f"Worker stats: {rate:.1f} msg/s, lag={lag}, "
+            f"retries={total(WORKER_RETRIES):.0f}, dlq={total(WORKER_DLQ):.0f}"
+        )
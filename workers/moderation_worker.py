@@ -1,21 +1,94 @@
 import asyncio
 import json
 import logging
+import os
+import time
 
-from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, ConsumerRebalanceListener, TopicPartition
 
-from clients.kafka import KAFKA_BOOTSTRAP, MODERATION_TOPIC, send_to_dlq, create_kafka_producer
+from cache.results import set_cached_results
+from clients.kafka import (
+    KAFKA_BOOTSTRAP,
+    MODERATION_TOPIC,
+    SUPPORTED_SCHEMA_VERSIONS,
+    create_kafka_producer,
+    send_to_dlq,
+)
+from clients.redis import create_redis_client
 from db.connection import create_pool, close_pool
-from db.repositories.advertisements import get_advertisement
-from db.repositories.moderation import update_moderation_result
-from ml.features import extract_features
+from db.repositories.advertisements import get_advertisement, get_advertisements
+from db.repositories.moderation import get_pending_tasks, update_moderation_result, update_moderation_results
+from ml.executor import INFERENCE_MODE, InferenceExecutor
+from ml.features import extract_features, extract_features_from_ads
 from ml.model import load_model
+from ml.reload import MODEL_RELOAD_INTERVAL, ModelHandle, ModelWatcher, local_model_version
+from metrics.server import start_metrics_server
+from workers.metrics import (
+    WORKER_BATCH_MESSAGES,
+    WORKER_DLQ,
+    WORKER_MESSAGES,
+    WORKER_METRICS_HOST,
+    WORKER_METRICS_PORT,
+    WORKER_RETRIES,
+    WORKER_STAGE_SECONDS,
+    report_stats,
+)
+from workers.offsets import OffsetTracker
+from workers.retry import MAX_RETRIES, RETRY_TOPICS, read_retry_headers, schedule_retry
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
-MAX_RETRIES = 3
-RETRY_DELAY_SECONDS = 5
+WORKER_MODE = os.getenv("WORKER_MODE", "serial").lower()
+WORKER_BATCH_SIZE = int(os.getenv("WORKER_BATCH_SIZE", "500"))
+WORKER_BATCH_TIMEOUT_MS = int(os.getenv("WORKER_BATCH_TIMEOUT_MS", "100"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "16"))
+COMMIT_INTERVAL_SECONDS = float(os.getenv("COMMIT_INTERVAL_SECONDS", "1"))
+RETRY_GROUP_PREFIX = "moderation-workers-retry"
+RETRY_HANDLER_INITIAL_BACKOFF_SECONDS = 0.5
+RETRY_HANDLER_MAX_BACKOFF_SECONDS = 30.0
+WORKER_MODEL_PATH = os.getenv("MODEL_PATH", "model.pkl")
+
+_inline_executor = InferenceExecutor("inline")
+
+_message_pending_lookup = WORKER_STAGE_SECONDS.labels("message", "pending_lookup")
+_message_ad_fetch = WORKER_STAGE_SECONDS.labels("message", "ad_fetch")
+_message_inference = WORKER_STAGE_SECONDS.labels("message", "inference")
+_message_update = WORKER_STAGE_SECONDS.labels("message", "update")
+_batch_pending_lookup = WORKER_STAGE_SECONDS.labels("batch", "pending_lookup")
+_batch_ad_fetch = WORKER_STAGE_SECONDS.labels("batch", "ad_fetch")
+_batch_inference = WORKER_STAGE_SECONDS.labels("batch", "inference")
+_batch_update = WORKER_STAGE_SECONDS.labels("batch", "update")
+_batch_messages = WORKER_BATCH_MESSAGES.labels()
+_completed = WORKER_MESSAGES.labels("completed")
+_failed = WORKER_MESSAGES.labels("failed")
+_skipped = WORKER_MESSAGES.labels("skipped")
+_errors = WORKER_MESSAGES.labels("error")
+_rejected = WORKER_MESSAGES.labels("rejected")
+_dlq_not_found = WORKER_DLQ.labels("not_found")
+_dlq_retries_exhausted = WORKER_DLQ.labels("retries_exhausted")
+_dlq_unsupported_schema = WORKER_DLQ.labels("unsupported_schema")
+_retries = WORKER_RETRIES.labels()
+
+
+async def _find_pending_task(pool, item_id: int) -> int | None:
+    results = await pool.fetch(
+        "SELECT id FROM moderation_results WHERE item_id = $1 AND status = 'pending' ORDER BY id DESC LIMIT 1",
+        item_id,
+    )
+    return results[0]["id"] if results else None
+
+
+def _is_supported(message_value: dict) -> bool:
+    return message_value.get("schema_version", 1) in SUPPORTED_SCHEMA_VERSIONS
+
+
+async def _reject_unsupported(producer: AIOKafkaProducer, message_value: dict) -> None:
+    error = f"Unsupported schema_version {message_value.get('schema_version')}"
+    logger.warning(f"{error} for item_id={message_value.get('item_id')}, sending to DLQ")
+    await send_to_dlq(producer, message_value, error)
+    _rejected.inc()
+    _dlq_unsupported_schema.inc()
 
 
 async def process_message(
@@ -23,23 +96,36 @@ async def process_message(
     pool,
     model,
     producer: AIOKafkaProducer,
+    executor: InferenceExecutor | None = None,
+    redis_client=None,
 ) -> None:
+    executor = executor or _inline_executor
+    if not _is_supported(message_value):
+        await _reject_unsupported(producer, message_value)
+        return
     item_id = message_value["item_id"]
 
-    results = await pool.fetch(
-        "SELECT id FROM moderation_results WHERE item_id = $1 AND status = 'pending' ORDER BY id DESC LIMIT 1",
-        item_id,
-    )
-    if not results:
+    task_id = message_value.get("task_id")
+    if task_id is None:
+        started = time.perf_counter()
+        task_id = await _find_pending_task(pool, item_id)
+        _message_pending_lookup.observe(time.perf_counter() - started)
+    if task_id is None:
         logger.warning(f"No pending task for item_id={item_id}")
+        _skipped.inc()
         return
 
-    task_id = results[0]["id"]
-
+    started = time.perf_counter()
     ad = await get_advertisement(pool, item_id)
+    fetched = time.perf_counter()
+    _message_ad_fetch.observe(fetched - started)
     if ad is None:
-        await update_moderation_result(pool, task_id, "failed", error_message="Advertisement not found")
+        updated = await update_moderation_result(pool, task_id, "failed", error_message="Advertisement not found")
+        _message_update.observe(time.perf_counter() - fetched)
+        _failed.inc()
+        await _cache_results(redis_client, [(task_id, "failed", None, None, "Advertisement not found")], updated)
         await send_to_dlq(producer, message_value, "Advertisement not found")
+        _dlq_not_found.inc()
         return
 
     features = extract_features(
@@ -48,61 +134,380 @@ async def process_message(
         ad["description"],
         ad["category"],
     )
-
-    probability = float(model.predict_proba(features)[0][1])
+    probability = float((await executor.predict_proba(model, features))[0])
+    scored = time.perf_counter()
+    _message_inference.observe(scored - fetched)
     is_violation = probability >= 0.5
 
-    await update_moderation_result(
+    updated = await update_moderation_result(
         pool, task_id, "completed",
         is_violation=is_violation,
         probability=probability,
     )
+    _message_update.observe(time.perf_counter() - scored)
+    _completed.inc()
+    await _cache_results(redis_client, [(task_id, "completed", is_violation, probability, None)], updated)
     logger.info(f"Processed item_id={item_id} task_id={task_id} violation={is_violation}")
 
 
-async def run_worker():
-    model = load_model()
-    pool = await create_pool()
-    producer = await create_kafka_producer()
+def _claim_pending_task(task_ids: list[int], reserved: set[int]) -> int | None:
+    while task_ids:
+        task_id = task_ids.pop(0)
+        if task_id not in reserved:
+            return task_id
+    return None
+
 
-    consumer = AIOKafkaConsumer(
-        MODERATION_TOPIC,
+async def process_batch(
+    message_values: list[dict],
+    pool,
+    model,
+    producer: AIOKafkaProducer,
+    executor: InferenceExecutor | None = None,
+    redis_client=None,
+) -> None:
+    executor = executor or _inline_executor
+
+    _batch_messages.observe(len(message_values))
+    for value in message_values:
+        if not _is_supported(value):
+            await _reject_unsupported(producer, value)
+    message_values = [value for value in message_values if _is_supported(value)]
+    legacy_items = {value["item_id"] for value in message_values if value.get("task_id") is None}
+    pending = {}
+    started = time.perf_counter()
+    if legacy_items:
+        pending = await get_pending_tasks(pool, list(legacy_items))
+        looked_up = time.perf_counter()
+        _batch_pending_lookup.observe(looked_up - started)
+        started = looked_up
+    ads = await get_advertisements(pool, list({value["item_id"] for value in message_values}))
+    _batch_ad_fetch.observe(time.perf_counter() - started)
+
+    results = []
+    missing = []
+    scored = []
+    explicit_tasks = {value["task_id"] for value in message_values if value.get("task_id") is not None}
+    claimed = set()
+    for value in message_values:
+        item_id = value["item_id"]
+        task_id = value.get("task_id")
+        if task_id is None:
+            task_id = _claim_pending_task(pending.get(item_id, []), explicit_tasks)
+        if task_id is None:
+            logger.warning(f"No pending task for item_id={item_id}")
+            continue
+        if task_id in claimed:
+            continue
+        claimed.add(task_id)
+
+        ad = ads.get(item_id)
+        if ad is None:
+            results.append((task_id, "failed", None, None, "Advertisement not found"))
+            missing.append(value)
+        else:
+            scored.append((task_id, ad))
+
+    if scored:
+        started = time.perf_counter()
+        features = extract_features_from_ads([ad for _, ad in scored])
+        probabilities = await executor.predict_proba(model, features)
+        _batch_inference.observe(time.perf_counter() - started)
+        for (task_id, _), probability in zip(scored, probabilities.tolist()):
+            results.append((task_id, "completed", probability >= 0.5, probability, None))
+
+    started = time.perf_counter()
+    updated = await update_moderation_results(pool, results)
+    _batch_update.observe(time.perf_counter() - started)
+    _completed.inc(len(scored))
+    _failed.inc(len(missing))
+    _skipped.inc(len(message_values) - len(scored) - len(missing))
+    await _cache_results(redis_client, results, updated)
+
+    for value in missing:
+        await send_to_dlq(producer, value, "Advertisement not found")
+        _dlq_not_found.inc()
+
+    logger.info(f"Processed batch of {len(message_values)} messages, {len(scored)} scored")
+
+
+async def _cache_results(
+    redis_client,
+    results: list[tuple[int, str, bool | None, float | None, str | None]],
+    updated_ids: list[int],
+) -> None:
+    if redis_client is None:
+        return
+    updated_ids = set(updated_ids)
+    results = [result for result in results if result[0] in updated_ids]
+    if not results:
+        return
+    try:
+        await set_cached_results(redis_client, [
+            {"id": task_id, "status": status, "is_violation": is_violation, "probability": probability}
+            for task_id, status, is_violation, probability, _ in results
+        ])
+    except Exception as e:
+        logger.warning(f"Caching {len(results)} moderation results failed: {e}")
+
+
+async def _mark_failed(pool, message_value: dict, error: str, redis_client=None) -> None:
+    task_id = message_value.get("task_id")
+    if task_id is None:
+        task_id = await _find_pending_task(pool, message_value.get("item_id"))
+    if task_id is not None:
+        updated = await update_moderation_result(pool, task_id, "failed", error_message=error)
+        await _cache_results(redis_client, [(task_id, "failed", None, None, error)], updated)
+
+
+async def _handle_message(
+    message_value: dict,
+    pool,
+    model,
+    producer: AIOKafkaProducer,
+    executor: InferenceExecutor,
+    retry_count: int = 0,
+    redis_client=None,
+) -> None:
+    try:
+        await process_message(message_value, pool, model, producer, executor, redis_client)
+    except Exception as e:
+        retry_count += 1
+        logger.error(f"Error processing message (attempt {retry_count}): {e}")
+        _errors.inc()
+        if retry_count < MAX_RETRIES:
+            await schedule_retry(producer, message_value, retry_count, str(e))
+            _retries.inc()
+        else:
+            await _mark_failed(pool, message_value, str(e), redis_client)
+            await send_to_dlq(producer, message_value, str(e), retry_count)
+            _dlq_retries_exhausted.inc()
+
+
+async def _consume_serial(consumer: AIOKafkaConsumer, pool, model, producer, executor, redis_client=None) -> None:
+    async for msg in consumer:
+        await _handle_message(msg.value, pool, model, producer, executor, redis_client=redis_client)
+
+
+async def _consume_retries(consumer: AIOKafkaConsumer, pool, model, producer, executor, redis_client=None) -> None:
+    async for msg in consumer:
+        retry_count, not_before = read_retry_headers(msg.headers)
+        delay = not_before - time.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        backoff = RETRY_HANDLER_INITIAL_BACKOFF_SECONDS
+        while True:
+            try:
+                await _handle_message(msg.value, pool, model, producer, executor, retry_count, redis_client)
+                break
+            except Exception as e:
+                logger.error(f"Retry handling failed for {msg.topic}, retrying in {backoff}s: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, RETRY_HANDLER_MAX_BACKOFF_SECONDS)
+        await consumer.commit()
+
+
+async def _consume_batches(consumer: AIOKafkaConsumer, pool, model, producer, executor, redis_client=None) -> None:
+    while True:
+        batches = await consumer.getmany(
+            timeout_ms=WORKER_BATCH_TIMEOUT_MS,
+            max_records=WORKER_BATCH_SIZE,
+        )
+        messages = [msg for partition_messages in batches.values() for msg in partition_messages]
+        if not messages:
+            continue
+
+        try:
+            await process_batch([msg.value for msg in messages], pool, model, producer, executor, redis_client)
+        except Exception as e:
+            logger.error(f"Batch of {len(messages)} messages failed, falling back to single messages: {e}")
+            for msg in messages:
+                await _handle_message(msg.value, pool, model, producer, executor, redis_client=redis_client)
+
+        await consumer.commit()
+
+
+async def _commit_offsets(consumer: AIOKafkaConsumer, tracker: OffsetTracker) -> None:
+    offsets = tracker.committable()
+    if offsets:
+        await consumer.commit(offsets)
+        tracker.mark_committed(offsets)
+
+
+async def _commit_periodically(consumer: AIOKafkaConsumer, tracker: OffsetTracker, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await _commit_offsets(consumer, tracker)
+        except Exception as e:
+            logger.error(f"Offset commit failed: {e}")
+
+
+class _CommitOnRevoke(ConsumerRebalanceListener):
+    def __init__(self, tracker: OffsetTracker):
+        self.consumer: AIOKafkaConsumer | None = None
+        self.tracker = tracker
+
+    async def on_partitions_revoked(self, revoked):
+        if self.consumer is not None:
+            try:
+                await _commit_offsets(self.consumer, self.tracker)
+            except Exception as e:
+                logger.error(f"Offset commit on revoke failed: {e}")
+        self.tracker.forget(revoked)
+
+    async def on_partitions_assigned(self, assigned):
+        pass
+
+
+async def _consume_concurrent(
+    consumer: AIOKafkaConsumer,
+    pool,
+    model,
+    producer,
+    executor,
+    tracker: OffsetTracker | None = None,
+    concurrency: int = WORKER_CONCURRENCY,
+    commit_interval: float = COMMIT_INTERVAL_SECONDS,
+    redis_client=None,
+) -> None:
+    tracker = tracker or OffsetTracker()
+    semaphore = asyncio.Semaphore(concurrency)
+    in_flight: set[asyncio.Task] = set()
+    failures: list[BaseException] = []
+    consuming = asyncio.current_task()
+    stopping = False
+
+    async def handle(msg, tp: TopicPartition) -> None:
+        try:
+            await _handle_message(msg.value, pool, model, producer, executor, redis_client=redis_client)
+        finally:
+            semaphore.release()
+        tracker.complete(tp, msg.offset)
+
+    def on_done(task: asyncio.Task) -> None:
+        in_flight.discard(task)
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.error(f"Message handling failed, stopping consumer: {task.exception()}")
+        failures.append(task.exception())
+        if not stopping and len(failures) == 1:
+            consuming.cancel()
+
+    committer = asyncio.create_task(_commit_periodically(consumer, tracker, commit_interval))
+    try:
+        async for msg in consumer:
+            await semaphore.acquire()
+            tp = TopicPartition(msg.topic, msg.partition)
+            tracker.track(tp, msg.offset)
+            task = asyncio.create_task(handle(msg, tp))
+            in_flight.add(task)
+            task.add_done_callback(on_done)
+    except asyncio.CancelledError:
+        if not failures:
+            raise
+    finally:
+        stopping = True
+        committer.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        await _commit_offsets(consumer, tracker)
+    if failures:
+        raise failures[0]
+
+
+def _create_consumer(group_id: str, enable_auto_commit: bool = True) -> AIOKafkaConsumer:
+    return AIOKafkaConsumer(
         bootstrap_servers=KAFKA_BOOTSTRAP,
         value_deserializer=lambda v: json.loads(v.decode("utf-8")),
-        group_id="moderation-workers",
+        group_id=group_id,
         auto_offset_reset="earliest",
+        enable_auto_commit=enable_auto_commit,
     )
+
+
+def _swap_worker_model(model: ModelHandle, executor: InferenceExecutor, new_model, version: str) -> None:
+    executor.reload(new_model)
+    model.swap(new_model, version)
+
+
+async def run_worker():
+    metrics_server = None
+    if WORKER_METRICS_PORT > 0:
+        metrics_server = await start_metrics_server(WORKER_METRICS_HOST, WORKER_METRICS_PORT)
+        logger.info(f"Serving worker metrics on {WORKER_METRICS_HOST}:{WORKER_METRICS_PORT}")
+
+    version = local_model_version(WORKER_MODEL_PATH)
+    model = ModelHandle(load_model(WORKER_MODEL_PATH), version)
+    pool = await create_pool()
+    producer = await create_kafka_producer()
+    executor = InferenceExecutor(INFERENCE_MODE, model_path=WORKER_MODEL_PATH, model=model.current)
+
+    reload_task = None
+    if MODEL_RELOAD_INTERVAL > 0:
+        watcher = ModelWatcher(
+            lambda: local_model_version(WORKER_MODEL_PATH),
+            lambda: load_model(WORKER_MODEL_PATH),
+            lambda new_model, new_version: _swap_worker_model(model, executor, new_model, new_version),
+            version=version,
+        )
+        reload_task = asyncio.create_task(watcher.run())
+
+    try:
+        redis_client = await create_redis_client()
+    except Exception as e:
+        logger.warning(f"Redis client creation failed, results will not be cached: {e}")
+        redis_client = None
+
+    tracker = OffsetTracker()
+    rebalance_listener = _CommitOnRevoke(tracker)
+
+    consumer = _create_consumer("moderation-workers", enable_auto_commit=WORKER_MODE == "serial")
+    consumer.subscribe([MODERATION_TOPIC], listener=rebalance_listener)
+    rebalance_listener.consumer = consumer
     await consumer.start()
-    logger.info("Worker started, consuming messages...")
+
+    retry_consumers = []
+    for tier, topic in enumerate(RETRY_TOPICS, start=1):
+        retry_consumer = _create_consumer(f"{RETRY_GROUP_PREFIX}-{tier}", enable_auto_commit=False)
+        retry_consumer.subscribe([topic])
+        await retry_consumer.start()
+        retry_consumers.append(retry_consumer)
+    retry_tasks = [
+        asyncio.create_task(_consume_retries(retry_consumer, pool, model, producer, executor, redis_client))
+        for retry_consumer in retry_consumers
+    ]
+
+    stats_task = asyncio.create_task(report_stats([consumer, *retry_consumers]))
+    logger.info(f"Worker started in {WORKER_MODE} mode, consuming messages...")
 
     try:
-        async for msg in consumer:
-            retry_count = 0
-            while retry_count < MAX_RETRIES:
-                try:
-                    await process_message(msg.value, pool, model, producer)
-                    break
-                except Exception as e:
-                    retry_count += 1
-                    logger.error(f"Error processing message (attempt {retry_count}): {e}")
-                    if retry_count < MAX_RETRIES:
-                        await asyncio.sleep(RETRY_DELAY_SECONDS)
-                    else:
-                        item_id = msg.value.get("item_id")
-                        results = await pool.fetch(
-                            "SELECT id FROM moderation_results WHERE item_id = $1 AND status = 'pending' ORDER BY id DESC LIMIT 1",
-                            item_id,
-                        )
-                        if results:
-                            await update_moderation_result(
-                                pool, results[0]["id"], "failed",
-                                error_message=str(e),
-                            )
-                        await send_to_dlq(producer, msg.value, str(e), retry_count)
+        if WORKER_MODE == "batch":
+            await _consume_batches(consumer, pool, model, producer, executor, redis_client)
+        elif WORKER_MODE == "concurrent":
+            await _consume_concurrent(consumer, pool, model, producer, executor, tracker, redis_client=redis_client)
+        else:
+            await _consume_serial(consumer, pool, model, producer, executor, redis_client)
     finally:
+        stats_task.cancel()
+        await asyncio.gather(stats_task, return_exceptions=True)
+        if metrics_server is not None:
+            metrics_server.close()
+            await metrics_server.wait_closed()
+        if reload_task is not None:
+            reload_task.cancel()
+            await asyncio.gather(reload_task, return_exceptions=True)
+        for task in retry_tasks:
+            task.cancel()
+        await asyncio.gather(*retry_tasks, return_exceptions=True)
+        for retry_consumer in retry_consumers:
+            await retry_consumer.stop()
         await consumer.stop()
         await producer.stop()
         await close_pool(pool)
+        if redis_client is not None:
+            await redis_client.aclose()
+        executor.shutdown()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+from aiokafka import TopicPartition
+
+
+class OffsetTracker:
+    def __init__(self):
+        self._next: dict[TopicPartition, int] = {}
+        self._done: dict[TopicPartition, set[int]] = {}
+        self._committed: dict[TopicPartition, int] = {}
+
+    def track(self, tp: TopicPartition, offset: int) -> None:
+        if tp not in self._next:
+            self._next[tp] = offset
+            self._done[tp] = set()
+
+    def complete(self, tp: TopicPartition, offset: int) -> None:
+        next_offset = self._next.get(tp)
+        if next_offset is None or offset < next_offset:
+            return
+        done = self._done[tp]
+        done.add(offset)
+        while next_offset in done:
+            done.remove(next_offset)
+            next_offset += 1
+        self._next[tp] = next_offset
+
+    def committable(self) -> dict[TopicPartition, int]:
+        return {
+            tp: next_offset
+            for tp, next_offset in self._next.items()
+            if next_offset > self._committed.get(tp, -1)
+        }
+
+    def mark_committed(self, offsets: dict[TopicPartition, int]) -> None:
+        self._committed.update(offsets)
+
+    def forget(self, partitions) -> None:
+        for tp in partitions:
+            self._next.pop(tp, None)
+            self._done.pop(tp, None)
+            self._committed.pop(tp, None)
@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import os
+
+from aiokafka import AIOKafkaProducer
+
+from clients.kafka import KAFKA_LINGER_MS, MODERATION_TOPIC, create_kafka_producer, moderation_message
+from db.connection import create_pool, close_pool
+from db.repositories.outbox import drain_outbox_batch
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL_MS = int(os.getenv("OUTBOX_POLL_INTERVAL_MS", "200"))
+MAX_RELAY_BACKOFF_SECONDS = 30
+
+
+async def publish_batch(producer: AIOKafkaProducer, rows: list[dict]) -> None:
+    futures = [
+        await producer.send(MODERATION_TOPIC, moderation_message(row["item_id"], row["task_id"]))
+        for row in rows
+    ]
+    await asyncio.gather(*futures)
+
+
+async def relay_outbox(
+    pool,
+    producer: AIOKafkaProducer,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+    poll_interval_ms: int = OUTBOX_POLL_INTERVAL_MS,
+) -> None:
+    poll_interval = poll_interval_ms / 1000
+    backoff = poll_interval
+    while True:
+        try:
+            relayed = await drain_outbox_batch(
+                pool, lambda rows: publish_batch(producer, rows), batch_size,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Outbox relay failed, retrying in {backoff:.1f}s: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RELAY_BACKOFF_SECONDS)
+            continue
+
+        backoff = poll_interval
+        if relayed:
+            logger.info(f"Relayed {relayed} outbox messages")
+        if relayed < batch_size:
+            await asyncio.sleep(poll_interval)
+
+
+async def run_relay():
+    pool = await create_pool()
+    producer = await create_kafka_producer(KAFKA_LINGER_MS)
+    logger.info("Outbox relay started")
+    try:
+        await relay_outbox(pool, producer)
+    finally:
+        await producer.stop()
+        await close_pool(pool)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_relay())
@@ -0,0 +1,46 @@
+import os
+import time
+
+from aiokafka import AIOKafkaProducer
+
+from clients.kafka import RETRY_TOPIC_PREFIX, send_to_retry
+
+MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
+RETRY_DELAY_SECONDS = float(os.getenv("RETRY_DELAY_SECONDS", "5"))
+
+RETRY_COUNT_HEADER = "retry_count"
+NOT_BEFORE_HEADER = "retry_not_before"
+ERROR_HEADER = "last_error"
+
+
+def retry_topic(retry_count: int) -> str:
+    return f"{RETRY_TOPIC_PREFIX}_{retry_count}"
+
+
+def retry_delay(retry_count: int) -> float:
+    return RETRY_DELAY_SECONDS * 2 ** (retry_count - 1)
+
+
+RETRY_TOPICS = [retry_topic(n) for n in range(1, MAX_RETRIES)]
+
+
+def read_retry_headers(headers) -> tuple[int, float]:
+    values = dict(headers or ())
+    retry_count = int(values.get(RETRY_COUNT_HEADER, b"0"))
+    not_before = float(values.get(NOT_BEFORE_HEADER, b"0"))
+    return retry_count, not_before
+
+
+async def schedule_retry(
+    producer: AIOKafkaProducer,
+    message_value: dict,
+    retry_count: int,
+    error: str,
+) -> None:
+    not_before = time.time() + retry_delay(retry_count)
+    headers = [
+        (RETRY_COUNT_HEADER, str(retry_count).encode()),
+        (NOT_BEFORE_HEADER, f"{not_before:.3f}".encode()),
+        (ERROR_HEADER, error[:500].encode()),
+    ]
+    await send_to_retry(producer, retry_topic(retry_count), message_value, headers)